@@ -1,11 +1,15 @@
 import customtkinter as ctk
 from tkinter import messagebox, ttk, filedialog
 import tkinter as tk
+from expense_charts import BarChart, PieChart
 from expense_logic import ExpenseLogic
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from expense_pager import TreePager
+from expense_stats import stats, ROWS_SCANNED, BYTES_READ, BYTES_WRITTEN
+from expense_worker import BackgroundWorker
 import datetime
 import calendar
+import threading
+import time
 
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
@@ -14,7 +18,18 @@ class ExpenseTrackerApp(ctk.CTk):
     def __init__(self):
         super().__init__()
         
-        self.logic = ExpenseLogic()
+        # Migration waits for the worker, so the window paints first
+        self.logic = ExpenseLogic(migrate=False)
+        # Every logic call goes through the worker so file scans never block the UI
+        self.worker = BackgroundWorker(self, on_busy=self.set_loading)
+        self._painted = threading.Event()
+        # Writes made by the call running on the worker, as (removed, added) rows
+        self._changes = None
+        self.logic.add_change_listener(self.record_change)
+        # Running [total, count] behind each list's total label
+        self.list_totals = {"view_expenses": None, "current": None}
+        # TreePagers of the list frames built so far
+        self.pagers = []
         
         self.title("💰 Expense Tracker Pro")
         self.geometry("1200x750")
@@ -37,13 +52,27 @@ class ExpenseTrackerApp(ctk.CTk):
         self.create_sidebar()
         self.create_main_frames()
         
+        # Start-up work is queued ahead of every other call, but held until the
+        # first paint so parsing the ledger doesn't compete with building the window
+        self.worker.submit(None, self.start_up)
         self.show_frame("dashboard")
         
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        # Idle, then one more trip round the event loop: the window is on screen
+        self.after_idle(lambda: self.after(0, self._painted.set))
+
+    def start_up(self):
+        """Worker side: once the window has painted, migrate and warm the caches."""
+        self._painted.wait()
+        self.logic.warm_up()
 
     def on_closing(self):
         """Handle window close event."""
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
+            # Let queued saves finish; logic.close() then flushes the monthly backups
+            self._painted.set()
+            self.worker.shutdown()
+            self.logic.close()
             self.quit()
             self.destroy()
 
@@ -51,7 +80,7 @@ class ExpenseTrackerApp(ctk.CTk):
         """Create the sidebar navigation."""
         self.sidebar_frame = ctk.CTkFrame(self, width=220, corner_radius=0)
         self.sidebar_frame.grid(row=0, column=0, sticky="nsew")
-        self.sidebar_frame.grid_rowconfigure(8, weight=1)
+        self.sidebar_frame.grid_rowconfigure(9, weight=1)
         
         # Logo/Title
         self.logo_label = ctk.CTkLabel(
@@ -70,6 +99,7 @@ class ExpenseTrackerApp(ctk.CTk):
             ("view_expenses", "📋 All Expenses", 3),
             ("current", "📅 This Month", 4),
             ("monthly", "📈 Compare Months", 5),
+            ("diagnostics", "🩺 Diagnostics", 6),
         ]
         
         for key, text, row in nav_items:
@@ -95,11 +125,21 @@ class ExpenseTrackerApp(ctk.CTk):
             fg_color="#6c757d",
             hover_color="#5a6268"
         )
-        self.export_btn.grid(row=6, column=0, padx=20, pady=8)
+        self.export_btn.grid(row=7, column=0, padx=20, pady=8)
         
         # Separator
         separator = ctk.CTkFrame(self.sidebar_frame, height=2, fg_color="gray30")
-        separator.grid(row=7, column=0, padx=20, pady=20, sticky="ew")
+        separator.grid(row=8, column=0, padx=20, pady=20, sticky="ew")
+        
+        # Loading indicator, shown while the worker is busy
+        self.loading_label = ctk.CTkLabel(
+            self.sidebar_frame,
+            text="⏳ Loading...",
+            font=ctk.CTkFont(size=12),
+            text_color="gray60"
+        )
+        self.loading_label.grid(row=9, column=0, padx=20, pady=10, sticky="s")
+        self.loading_label.grid_remove()
         
         # Appearance Mode
         self.appearance_mode_label = ctk.CTkLabel(
@@ -108,7 +148,7 @@ class ExpenseTrackerApp(ctk.CTk):
             anchor="w",
             font=ctk.CTkFont(size=12)
         )
-        self.appearance_mode_label.grid(row=9, column=0, padx=20, pady=(10, 0))
+        self.appearance_mode_label.grid(row=10, column=0, padx=20, pady=(10, 0))
         
         self.appearance_mode_optionemenu = ctk.CTkOptionMenu(
             self.sidebar_frame,
@@ -116,7 +156,7 @@ class ExpenseTrackerApp(ctk.CTk):
             command=self.change_appearance_mode_event,
             width=180
         )
-        self.appearance_mode_optionemenu.grid(row=10, column=0, padx=20, pady=(5, 10))
+        self.appearance_mode_optionemenu.grid(row=11, column=0, padx=20, pady=(5, 10))
         self.appearance_mode_optionemenu.set("Dark")
         
         # UI Scaling
@@ -126,7 +166,7 @@ class ExpenseTrackerApp(ctk.CTk):
             anchor="w",
             font=ctk.CTkFont(size=12)
         )
-        self.scaling_label.grid(row=11, column=0, padx=20, pady=(10, 0))
+        self.scaling_label.grid(row=12, column=0, padx=20, pady=(10, 0))
         
         self.scaling_optionemenu = ctk.CTkOptionMenu(
             self.sidebar_frame,
@@ -134,11 +174,11 @@ class ExpenseTrackerApp(ctk.CTk):
             command=self.change_scaling_event,
             width=180
         )
-        self.scaling_optionemenu.grid(row=12, column=0, padx=20, pady=(5, 20))
+        self.scaling_optionemenu.grid(row=13, column=0, padx=20, pady=(5, 20))
         self.scaling_optionemenu.set("100%")
 
     def create_main_frames(self):
-        """Create all main content frames."""
+        """Create the main content frames; each is filled in when first shown."""
         # Dashboard Frame
         self.dashboard_frame = ctk.CTkScrollableFrame(
             self, 
@@ -152,7 +192,6 @@ class ExpenseTrackerApp(ctk.CTk):
             corner_radius=0, 
             fg_color="transparent"
         )
-        self.setup_add_expense_ui()
         
         # View Expenses Frame
         self.view_expenses_frame = ctk.CTkFrame(
@@ -160,7 +199,6 @@ class ExpenseTrackerApp(ctk.CTk):
             corner_radius=0, 
             fg_color="transparent"
         )
-        self.setup_view_expenses_ui()
 
         # Current Month Frame
         self.current_frame = ctk.CTkFrame(
@@ -168,7 +206,6 @@ class ExpenseTrackerApp(ctk.CTk):
             corner_radius=0, 
             fg_color="transparent"
         )
-        self.setup_current_month_ui()
 
         # Monthly Comparison Frame
         self.monthly_frame = ctk.CTkScrollableFrame(
@@ -176,16 +213,131 @@ class ExpenseTrackerApp(ctk.CTk):
             corner_radius=0, 
             fg_color="transparent"
         )
-        self.setup_monthly_ui()
+
+        # Diagnostics Frame
+        self.diagnostics_frame = ctk.CTkFrame(
+            self, 
+            corner_radius=0, 
+            fg_color="transparent"
+        )
+
+        # Any list frame may be built first, so the shared style is set up front
+        self.setup_tree_style()
+
+        self.frame_setups = {
+            "dashboard": self.setup_dashboard_ui,
+            "add_expense": self.setup_add_expense_ui,
+            "view_expenses": self.setup_view_expenses_ui,
+            "current": self.setup_current_month_ui,
+            "monthly": self.setup_monthly_ui,
+            "diagnostics": self.setup_diagnostics_ui,
+        }
+        self.built_frames = set()
+
+    def setup_tree_style(self):
+        """Dark Treeview style shared by every list."""
+        style = ttk.Style()
+        style.theme_use("default")
+        style.configure(
+            "Treeview",
+            background="#2a2d2e",
+            foreground="white",
+            rowheight=35,
+            fieldbackground="#343638",
+            bordercolor="#343638",
+            borderwidth=0,
+            font=('Segoe UI', 11)
+        )
+        style.map('Treeview', background=[('selected', '#1f6aa5')])
+        style.configure("Treeview.Heading",
+                       background="#1f6aa5",
+                       foreground="white",
+                       relief="flat",
+                       font=('Segoe UI', 12, 'bold'))
+        style.map("Treeview.Heading",
+                 background=[('active', '#1a5a8f')])
+
+    def set_loading(self, busy):
+        """Show or hide the sidebar loading indicator."""
+        if busy:
+            self.loading_label.grid()
+        else:
+            self.loading_label.grid_remove()
+
+    def run_in_background(self, channel, fn, *args, on_done=None):
+        """
+        Run a logic call on the worker; errors are shown in a dialog.
+        Saves and deletes it makes are applied to the lists before on_done.
+        """
+        def call():
+            changes = self._changes = []
+            try:
+                return fn(*args), changes
+            finally:
+                self._changes = None
+
+        # Submit-to-render latency, under the channel or the call's name
+        label = f"Worker.{channel or getattr(fn, '__name__', 'call')}"
+        submitted = time.perf_counter()
+
+        def done(result):
+            value, changes = result
+            stats.record(label, time.perf_counter() - submitted)
+            for removed, added in changes:
+                self.apply_change(removed, added)
+            if on_done:
+                on_done(value)
+
+        return self.worker.submit(
+            channel, call, on_done=done,
+            on_error=lambda e: messagebox.showerror("Error", str(e))
+        )
+
+    def record_change(self, removed, added):
+        """Change listener; runs on the worker thread, so only records."""
+        if self._changes is not None:
+            self._changes.append((list(removed), list(added)))
+
+    def apply_change(self, removed, added):
+        """Patch both lists and their totals with a save, delete or update."""
+        old = [self.tree_values(exp) for exp in removed]
+        new = [self.tree_values(exp) for exp in added]
+        for pager in self.pagers:
+            pager.apply(old, new)
+        for name, accepts in (("view_expenses", None), ("current", self.in_current_month)):
+            totals = self.list_totals[name]
+            if totals is None:
+                continue
+            for rows, sign in ((removed, -1), (added, 1)):
+                for exp in rows:
+                    if accepts and not accepts(self.tree_values(exp)):
+                        continue
+                    try:
+                        totals[0] += sign * float(exp["Amount"])
+                    except (TypeError, ValueError):
+                        continue
+                    totals[1] += sign
+        self.show_list_totals()
 
     def show_frame(self, name):
         """Show the specified frame and hide others."""
+        # Loads still pending for other frames are no longer wanted
+        for key in self.nav_buttons:
+            if key != name:
+                self.worker.cancel(key)
+        
+        # Frames are built the first time they are shown
+        if name not in self.built_frames:
+            self.built_frames.add(name)
+            self.frame_setups[name]()
+        
         # Hide all frames
         self.dashboard_frame.grid_forget()
         self.add_expense_frame.grid_forget()
         self.view_expenses_frame.grid_forget()
         self.current_frame.grid_forget()
         self.monthly_frame.grid_forget()
+        self.diagnostics_frame.grid_forget()
         
         # Update button states
         for key, btn in self.nav_buttons.items():
@@ -209,6 +361,9 @@ class ExpenseTrackerApp(ctk.CTk):
         elif name == "monthly":
             self.monthly_frame.grid(row=0, column=1, sticky="nsew", padx=20, pady=20)
             self.update_monthly_view()
+        elif name == "diagnostics":
+            self.diagnostics_frame.grid(row=0, column=1, sticky="nsew", padx=20, pady=20)
+            self.refresh_diagnostics()
 
     # --- Add Expense UI ---
     def setup_add_expense_ui(self):
@@ -374,7 +529,17 @@ class ExpenseTrackerApp(ctk.CTk):
             messagebox.showerror("Error", "All fields are required!")
             return
         
-        success, msg = self.logic.save_expense(desc, amount, cat, date)
+        # Disabled until the save lands, so a double click can't save twice
+        self.add_btn.configure(state="disabled")
+        self.run_in_background(
+            None, self.logic.save_expense, desc, amount, cat, date,
+            on_done=self._on_expense_saved
+        )
+
+    def _on_expense_saved(self, result):
+        """Report a finished save."""
+        success, msg = result
+        self.add_btn.configure(state="normal")
         
         if success:
             messagebox.showinfo("Success", msg)
@@ -429,28 +594,6 @@ class ExpenseTrackerApp(ctk.CTk):
         tree_frame = ctk.CTkFrame(self.view_expenses_frame, fg_color="gray20", corner_radius=15)
         tree_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
         
-        # Configure style
-        style = ttk.Style()
-        style.theme_use("default")
-        style.configure(
-            "Treeview",
-            background="#2a2d2e",
-            foreground="white",
-            rowheight=35,
-            fieldbackground="#343638",
-            bordercolor="#343638",
-            borderwidth=0,
-            font=('Segoe UI', 11)
-        )
-        style.map('Treeview', background=[('selected', '#1f6aa5')])
-        style.configure("Treeview.Heading",
-                       background="#1f6aa5",
-                       foreground="white",
-                       relief="flat",
-                       font=('Segoe UI', 12, 'bold'))
-        style.map("Treeview.Heading",
-                 background=[('active', '#1a5a8f')])
-        
         # Scrollbars
         tree_scroll_y = ttk.Scrollbar(tree_frame, orient="vertical")
         tree_scroll_y.pack(side="right", fill="y", padx=(0, 10), pady=10)
@@ -458,18 +601,22 @@ class ExpenseTrackerApp(ctk.CTk):
         tree_scroll_x = ttk.Scrollbar(tree_frame, orient="horizontal")
         tree_scroll_x.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
         
-        # Treeview
+        # Treeview (only the rows in view are inserted; the pager drives the scrollbar)
         self.tree = ttk.Treeview(
             tree_frame,
             columns=("ID", "Description", "Category", "Amount", "Date"),
             show="headings",
-            yscrollcommand=tree_scroll_y.set,
             xscrollcommand=tree_scroll_x.set,
             selectmode="browse"
         )
         
-        tree_scroll_y.config(command=self.tree.yview)
         tree_scroll_x.config(command=self.tree.xview)
+        self.tree_pager = TreePager(
+            self.tree, tree_scroll_y, self.load_tree_page,
+            lambda fn, *args, on_done: self.run_in_background("view_expenses", fn, *args, on_done=on_done),
+            sort_key=lambda values: int(values[0])
+        )
+        self.pagers.append(self.tree_pager)
         
         # Column headings
         self.tree.heading("ID", text="ID")
@@ -495,27 +642,51 @@ class ExpenseTrackerApp(ctk.CTk):
         )
         self.total_expenses_label.pack(pady=(0, 20))
 
+    def tree_values(self, exp):
+        """Treeview values for an expense row."""
+        try:
+            amount = f"${float(exp['Amount']):.2f}"
+        except (TypeError, ValueError):
+            amount = exp["Amount"]
+        return (
+            str(exp["Id"]),
+            exp["Description"],
+            exp["Expense_Type"],
+            amount,
+            exp["Date"]
+        )
+
+    def load_tree_page(self, offset, limit, date_from=None, date_to=None):
+        """Worker side: the matching row count and one page of treeview rows."""
+        rows = [
+            self.tree_values(exp)
+            for exp in self.logic.iter_expenses(date_from, date_to, offset=offset, limit=limit)
+        ]
+        return self.logic.count_expenses(date_from, date_to), rows
+
     def refresh_expense_list(self):
         """Refresh the expense list in the treeview."""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Load and display expenses
-        expenses = self.logic.load_expenses()
-        total = 0
-        
-        for exp in expenses:
-            self.tree.insert("", "end", values=(
-                exp["Id"],
-                exp["Description"],
-                exp["Expense_Type"],
-                f"${float(exp['Amount']):.2f}",
-                exp["Date"]
-            ))
-            total += float(exp["Amount"])
-        
-        self.total_expenses_label.configure(text=f"Total: ${total:.2f} ({len(expenses)} expenses)")
+        self.tree_pager.refresh()
+        # The total comes from the running aggregates, not from summing rows
+        self.run_in_background("view_expenses_total", self.logic.get_all_time_summary,
+                               on_done=self._show_expense_total)
+
+    def _show_expense_total(self, summary):
+        """Show the all-time total under the All Expenses list."""
+        self.list_totals["view_expenses"] = [summary["total_amount"], summary["count"]] if summary else [0.0, 0]
+        self.show_list_totals()
+
+    def show_list_totals(self):
+        """Render both list total labels from their running totals."""
+        totals = self.list_totals["view_expenses"]
+        if totals is not None:
+            self.total_expenses_label.configure(text=f"Total: ${totals[0]:.2f} ({totals[1]} expenses)")
+        totals = self.list_totals["current"]
+        if totals is not None:
+            month_name = calendar.month_name[datetime.date.today().month]
+            self.current_total_label.configure(
+                text=f"{month_name} Total: ${totals[0]:.2f} ({totals[1]} expenses)"
+            )
 
     def delete_selected_action(self):
         """Delete the selected expense."""
@@ -532,15 +703,21 @@ class ExpenseTrackerApp(ctk.CTk):
         if confirm:
             item = self.tree.item(selected[0])
             exp_id = item['values'][0]
-            success, msg = self.logic.delete_expense(exp_id)
-            
-            if success:
-                messagebox.showinfo("Success", msg)
-                self.refresh_expense_list()
-                if self.dashboard_frame.winfo_ismapped():
-                    self.update_dashboard()
-            else:
-                messagebox.showerror("Error", msg)
+            self.run_in_background(
+                None, self.logic.delete_expense, exp_id,
+                on_done=self._on_expense_deleted
+            )
+
+    def _on_expense_deleted(self, result):
+        """Report a finished delete (the lists were already patched)."""
+        success, msg = result
+        
+        if success:
+            messagebox.showinfo("Success", msg)
+            if self.dashboard_frame.winfo_ismapped():
+                self.update_dashboard()
+        else:
+            messagebox.showerror("Error", msg)
 
     # --- Current Month UI ---
     def setup_current_month_ui(self):
@@ -576,16 +753,22 @@ class ExpenseTrackerApp(ctk.CTk):
         tree_scroll_y2 = ttk.Scrollbar(tree_frame, orient="vertical")
         tree_scroll_y2.pack(side="right", fill="y", padx=(0, 10), pady=10)
         
-        # Treeview
+        # Treeview (paged like the All Expenses list)
         self.tree_current = ttk.Treeview(
             tree_frame,
             columns=("ID", "Description", "Category", "Amount", "Date"),
             show="headings",
-            yscrollcommand=tree_scroll_y2.set,
             selectmode="browse"
         )
         
-        tree_scroll_y2.config(command=self.tree_current.yview)
+        self.current_pager = TreePager(
+            self.tree_current, tree_scroll_y2,
+            lambda offset, limit: self.load_tree_page(offset, limit, *self.current_month_range()),
+            lambda fn, *args, on_done: self.run_in_background("current", fn, *args, on_done=on_done),
+            sort_key=lambda values: (values[4], int(values[0])),
+            accepts=self.in_current_month
+        )
+        self.pagers.append(self.current_pager)
         
         # Column headings
         self.tree_current.heading("ID", text="ID")
@@ -614,30 +797,29 @@ class ExpenseTrackerApp(ctk.CTk):
         )
         self.current_total_label.pack(pady=20)
 
+    def current_month_range(self):
+        """First and last day of the current month."""
+        today = datetime.date.today()
+        first = today.replace(day=1)
+        last = today.replace(day=calendar.monthrange(today.year, today.month)[1])
+        return first, last
+
+    def in_current_month(self, values):
+        """Whether treeview values belong in the This Month list."""
+        first, last = self.current_month_range()
+        date = str(values[4])
+        return first.isoformat() <= date <= last.isoformat() and self.logic.validate_date(date)[0]
+
     def refresh_current_list(self):
         """Refresh current month's expense list."""
-        # Clear existing items
-        for item in self.tree_current.get_children():
-            self.tree_current.delete(item)
-        
-        # Load and display current month expenses
-        expenses = self.logic.load_current_month_expenses()
-        total = 0
-        
-        for exp in expenses:
-            self.tree_current.insert("", "end", values=(
-                exp["Id"],
-                exp["Description"],
-                exp["Expense_Type"],
-                f"${float(exp['Amount']):.2f}",
-                exp["Date"]
-            ))
-            total += float(exp["Amount"])
-        
-        month_name = calendar.month_name[datetime.date.today().month]
-        self.current_total_label.configure(
-            text=f"{month_name} Total: ${total:.2f} ({len(expenses)} expenses)"
-        )
+        self.current_pager.refresh()
+        self.run_in_background("current_total", self.logic.get_summary_data,
+                               on_done=self._show_current_total)
+
+    def _show_current_total(self, summary):
+        """Show this month's total under the This Month list."""
+        self.list_totals["current"] = [summary["total_amount"], summary["count"]] if summary else [0.0, 0]
+        self.show_list_totals()
 
     # --- Monthly Comparison UI ---
     def setup_monthly_ui(self):
@@ -728,23 +910,68 @@ class ExpenseTrackerApp(ctk.CTk):
         
         chart_title = ctk.CTkLabel(
             chart_container,
-            text="Monthly Totals (All Time)",
+            text="Monthly Totals (Last 12 Months)",
             font=ctk.CTkFont(size=18, weight="bold")
         )
         chart_title.pack(pady=(20, 10))
         
         self.monthly_chart_frame = ctk.CTkFrame(chart_container, fg_color="transparent")
         self.monthly_chart_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        
+        # Chart is built when there is first something to plot
+        self.monthly_chart = None
+        self.monthly_no_data_lbl = ctk.CTkLabel(
+            self.monthly_chart_frame,
+            text="No data available yet\nStart adding expenses to see monthly trends!",
+            font=ctk.CTkFont(size=16),
+            text_color="gray60"
+        )
+        # Last result shown, so an unchanged refresh is skipped
+        self.monthly_shown = None
+
+    def create_chart(self, master, figsize):
+        """A dark figure's axes and Tk canvas; matplotlib is imported on first use."""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize, dpi=100)
+        fig.patch.set_facecolor('#2a2d2e')
+        ax = fig.add_subplot(111)
+        ax.set_facecolor('#2a2d2e')
+        return ax, FigureCanvasTkAgg(fig, master=master)
+
+    def create_monthly_chart(self):
+        """Build the monthly bar chart once; refreshes only update its bars."""
+        ax, self.monthly_canvas = self.create_chart(self.monthly_chart_frame, (10, 4))
+        
+        ax.tick_params(axis='x', colors='white', rotation=45, labelsize=10)
+        ax.tick_params(axis='y', colors='white', labelsize=10)
+        ax.set_ylabel('Amount ($)', color='white', fontsize=11)
+        ax.grid(axis='y', alpha=0.3, linestyle='--', linewidth=0.5)
+        
+        # Remove top and right spines
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['left'].set_color('white')
+        ax.spines['bottom'].set_color('white')
+        
+        self.monthly_chart = BarChart(ax, value_labels=True, alpha=0.8, edgecolor='white', linewidth=0.5)
 
     def update_monthly_view(self):
         """Update the monthly comparison view."""
-        # Clear chart area
-        for widget in self.monthly_chart_frame.winfo_children():
-            widget.destroy()
+        self.run_in_background("monthly", self.load_monthly_data, on_done=self._show_monthly_view)
+
+    def load_monthly_data(self):
+        """Worker side: month-over-month comparison and the last 12 monthly totals."""
+        return self.logic.compare_months_master(), self.logic.get_monthly_totals(months=12)
+
+    def _show_monthly_view(self, result):
+        """Update the comparison stats and monthly chart in place."""
+        if result == self.monthly_shown:
+            return
+        self.monthly_shown = result
+        comp, window = result
 
-        # Get comparison data
-        comp = self.logic.compare_months_master()
-        
         # Update stats
         self.monthly_total_lbl.configure(text=f"${comp['current_total']:.2f}")
         
@@ -772,110 +999,92 @@ class ExpenseTrackerApp(ctk.CTk):
             self.monthly_prev_lbl.configure(text="No data")
             self.monthly_change_lbl.configure(text="N/A", text_color="gray60")
 
-        # Create chart
-        monthly_totals = self.logic.get_all_monthly_totals_from_master()
-        
-        if monthly_totals:
-            # Sort months chronologically
-            month_map = {name: i for i, name in enumerate(calendar.month_name) if name}
-            sorted_months = sorted([m for m in monthly_totals.keys()], key=lambda x: month_map.get(x, 0))
-            totals = [monthly_totals[m] for m in sorted_months]
-            
-            # Create figure
-            fig = Figure(figsize=(10, 4), dpi=100)
-            fig.patch.set_facecolor('#2a2d2e')
-            ax = fig.add_subplot(111)
-            ax.set_facecolor('#2a2d2e')
+        # Update chart
+        if any(total for _, total in window):
+            if self.monthly_chart is None:
+                self.create_monthly_chart()
+            labels = [f"{calendar.month_abbr[m]} {y}" for (y, m), _ in window]
+            totals = [total for _, total in window]
             
             # Highlight current month
-            current = calendar.month_name[datetime.date.today().month]
-            colors = [self.colors['warning'] if m == current else self.colors['primary'] for m in sorted_months]
-            
-            bars = ax.bar(sorted_months, totals, color=colors, alpha=0.8, edgecolor='white', linewidth=0.5)
-            
-            # Add value labels on bars
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'${height:.0f}',
-                       ha='center', va='bottom', color='white', fontsize=9)
+            today = datetime.date.today()
+            current = (today.year, today.month)
+            colors = [self.colors['warning'] if key == current else self.colors['primary'] for key, _ in window]
             
-            ax.tick_params(axis='x', colors='white', rotation=45, labelsize=10)
-            ax.tick_params(axis='y', colors='white', labelsize=10)
-            ax.set_ylabel('Amount ($)', color='white', fontsize=11)
-            ax.grid(axis='y', alpha=0.3, linestyle='--', linewidth=0.5)
-            
-            # Remove top and right spines
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['left'].set_color('white')
-            ax.spines['bottom'].set_color('white')
-            
-            fig.tight_layout()
-            
-            canvas = FigureCanvasTkAgg(fig, master=self.monthly_chart_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True)
+            self.monthly_chart.update(labels, totals, colors)
+            self.monthly_no_data_lbl.pack_forget()
+            self.monthly_canvas.get_tk_widget().pack(fill="both", expand=True)
+            self.monthly_canvas.draw_idle()
         else:
-            no_data_label = ctk.CTkLabel(
-                self.monthly_chart_frame,
-                text="No data available yet\nStart adding expenses to see monthly trends!",
-                font=ctk.CTkFont(size=16),
-                text_color="gray60"
-            )
-            no_data_label.pack(expand=True)
+            if self.monthly_chart is not None:
+                self.monthly_canvas.get_tk_widget().pack_forget()
+            self.monthly_no_data_lbl.pack(expand=True)
 
     # --- Dashboard UI ---
-    def update_dashboard(self):
-        """Update the dashboard view."""
-        # Clear existing widgets
-        for widget in self.dashboard_frame.winfo_children():
-            widget.destroy()
+    def setup_dashboard_ui(self):
+        """Setup the Dashboard interface; refreshes fill it in place."""
+        # Shown when there are no expenses this month
+        self.dashboard_empty = ctk.CTkFrame(self.dashboard_frame, fg_color="transparent")
+        
+        icon = ctk.CTkLabel(
+            self.dashboard_empty,
+            text="📊",
+            font=ctk.CTkFont(size=80)
+        )
+        icon.pack(pady=20)
+        
+        no_data_label = ctk.CTkLabel(
+            self.dashboard_empty,
+            text="No Expenses This Month",
+            font=ctk.CTkFont(size=24, weight="bold")
+        )
+        no_data_label.pack()
+        
+        hint_label = ctk.CTkLabel(
+            self.dashboard_empty,
+            text="Click 'Add Expense' to start tracking your spending",
+            font=ctk.CTkFont(size=14),
+            text_color="gray60"
+        )
+        hint_label.pack(pady=10)
+        
+        add_btn = ctk.CTkButton(
+            self.dashboard_empty,
+            text="➕ Add Your First Expense",
+            command=lambda: self.show_frame("add_expense"),
+            height=50,
+            font=ctk.CTkFont(size=16, weight="bold"),
+            fg_color=self.colors['success'],
+            hover_color="#228b22"
+        )
+        add_btn.pack(pady=20)
 
-        data = self.logic.get_summary_data()
+        # Shown above either of them while some expenses have unreadable dates
+        self.dashboard_notice = ctk.CTkFrame(self.dashboard_frame, fg_color="gray20", corner_radius=15)
         
-        if not data:
-            # No data available
-            empty_frame = ctk.CTkFrame(self.dashboard_frame, fg_color="transparent")
-            empty_frame.pack(expand=True)
-            
-            icon = ctk.CTkLabel(
-                empty_frame,
-                text="📊",
-                font=ctk.CTkFont(size=80)
-            )
-            icon.pack(pady=20)
-            
-            no_data_label = ctk.CTkLabel(
-                empty_frame,
-                text="No Expenses This Month",
-                font=ctk.CTkFont(size=24, weight="bold")
-            )
-            no_data_label.pack()
-            
-            hint_label = ctk.CTkLabel(
-                empty_frame,
-                text="Click 'Add Expense' to start tracking your spending",
-                font=ctk.CTkFont(size=14),
-                text_color="gray60"
-            )
-            hint_label.pack(pady=10)
-            
-            add_btn = ctk.CTkButton(
-                empty_frame,
-                text="➕ Add Your First Expense",
-                command=lambda: self.show_frame("add_expense"),
-                height=50,
-                font=ctk.CTkFont(size=16, weight="bold"),
-                fg_color=self.colors['success'],
-                hover_color="#228b22"
-            )
-            add_btn.pack(pady=20)
-            
-            return
+        self.dashboard_notice_lbl = ctk.CTkLabel(
+            self.dashboard_notice,
+            text="",
+            font=ctk.CTkFont(size=14),
+            text_color=self.colors['warning']
+        )
+        self.dashboard_notice_lbl.pack(side="left", padx=20, pady=15)
+        
+        notice_btn = ctk.CTkButton(
+            self.dashboard_notice,
+            text="🔍 Show",
+            command=self.show_invalid_dates,
+            width=100,
+            height=32,
+            fg_color=self.colors['warning'],
+            hover_color="#e06c00"
+        )
+        notice_btn.pack(side="right", padx=20, pady=15)
+
+        self.dashboard_content = ctk.CTkFrame(self.dashboard_frame, fg_color="transparent")
 
         # Header
-        header_frame = ctk.CTkFrame(self.dashboard_frame, fg_color="transparent")
+        header_frame = ctk.CTkFrame(self.dashboard_content, fg_color="transparent")
         header_frame.pack(fill="x", pady=(0, 20))
         
         title = ctk.CTkLabel(
@@ -885,17 +1094,16 @@ class ExpenseTrackerApp(ctk.CTk):
         )
         title.pack(side="left")
         
-        month_name = calendar.month_name[datetime.date.today().month]
-        month_label = ctk.CTkLabel(
+        self.dashboard_month_lbl = ctk.CTkLabel(
             header_frame,
-            text=f"{month_name} {datetime.date.today().year}",
+            text="",
             font=ctk.CTkFont(size=16),
             text_color="gray60"
         )
-        month_label.pack(side="left", padx=20)
+        self.dashboard_month_lbl.pack(side="left", padx=20)
 
         # Stats Cards
-        stats_frame = ctk.CTkFrame(self.dashboard_frame, fg_color="transparent")
+        stats_frame = ctk.CTkFrame(self.dashboard_content, fg_color="transparent")
         stats_frame.pack(fill="x", pady=20)
         
         # Total card
@@ -910,12 +1118,12 @@ class ExpenseTrackerApp(ctk.CTk):
         )
         total_title.pack(pady=(20, 5))
         
-        total_value = ctk.CTkLabel(
+        self.dashboard_total_lbl = ctk.CTkLabel(
             total_card,
-            text=f"${data['total_amount']:.2f}",
+            text="$0.00",
             font=ctk.CTkFont(size=32, weight="bold")
         )
-        total_value.pack(pady=(0, 20))
+        self.dashboard_total_lbl.pack(pady=(0, 20))
         
         # Count card
         count_card = ctk.CTkFrame(stats_frame, fg_color="gray20", corner_radius=15)
@@ -929,12 +1137,12 @@ class ExpenseTrackerApp(ctk.CTk):
         )
         count_title.pack(pady=(20, 5))
         
-        count_value = ctk.CTkLabel(
+        self.dashboard_count_lbl = ctk.CTkLabel(
             count_card,
-            text=str(data['count']),
+            text="0",
             font=ctk.CTkFont(size=32, weight="bold")
         )
-        count_value.pack(pady=(0, 20))
+        self.dashboard_count_lbl.pack(pady=(0, 20))
         
         # Average card
         avg_card = ctk.CTkFrame(stats_frame, fg_color="gray20", corner_radius=15)
@@ -948,109 +1156,323 @@ class ExpenseTrackerApp(ctk.CTk):
         )
         avg_title.pack(pady=(20, 5))
         
-        avg_value = ctk.CTkLabel(
+        self.dashboard_avg_lbl = ctk.CTkLabel(
             avg_card,
-            text=f"${data['average']:.2f}",
+            text="$0.00",
             font=ctk.CTkFont(size=32, weight="bold")
         )
-        avg_value.pack(pady=(0, 20))
+        self.dashboard_avg_lbl.pack(pady=(0, 20))
 
         # Charts Container
-        charts_container = ctk.CTkFrame(self.dashboard_frame, fg_color="transparent")
+        charts_container = ctk.CTkFrame(self.dashboard_content, fg_color="transparent")
         charts_container.pack(fill="both", expand=True, pady=20)
         
         # Category Pie Chart
-        if data["expense_by_type"]:
-            pie_frame = ctk.CTkFrame(charts_container, fg_color="gray20", corner_radius=15)
-            pie_frame.pack(side="left", fill="both", expand=True, padx=(0, 10))
-            
-            pie_title = ctk.CTkLabel(
-                pie_frame,
-                text="Expenses by Category",
-                font=ctk.CTkFont(size=16, weight="bold")
-            )
-            pie_title.pack(pady=(15, 5))
-            
-            pie_chart_frame = ctk.CTkFrame(pie_frame, fg_color="transparent")
-            pie_chart_frame.pack(fill="both", expand=True, padx=10, pady=10)
-            
-            fig1 = Figure(figsize=(5, 4), dpi=100)
-            fig1.patch.set_facecolor('#2a2d2e')
-            ax1 = fig1.add_subplot(111)
-            ax1.set_facecolor('#2a2d2e')
-            
-            types = list(data["expense_by_type"].keys())
-            amounts = list(data["expense_by_type"].values())
-            
-            colors_pie = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', 
-                         '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
-            
-            wedges, texts, autotexts = ax1.pie(
-                amounts, 
-                labels=types, 
-                autopct='%1.1f%%', 
-                startangle=90,
-                colors=colors_pie[:len(amounts)],
-                textprops={'color': "white", 'fontsize': 10}
-            )
-            
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_weight('bold')
-            
-            canvas1 = FigureCanvasTkAgg(fig1, master=pie_chart_frame)
-            canvas1.draw()
-            canvas1.get_tk_widget().pack(fill="both", expand=True)
+        pie_frame = ctk.CTkFrame(charts_container, fg_color="gray20", corner_radius=15)
+        pie_frame.pack(side="left", fill="both", expand=True, padx=(0, 10))
+        
+        pie_title = ctk.CTkLabel(
+            pie_frame,
+            text="Expenses by Category",
+            font=ctk.CTkFont(size=16, weight="bold")
+        )
+        pie_title.pack(pady=(15, 5))
+        
+        self.pie_chart_frame = ctk.CTkFrame(pie_frame, fg_color="transparent")
+        self.pie_chart_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Daily Bar Chart
-        if data["expense_by_date"]:
-            bar_frame = ctk.CTkFrame(charts_container, fg_color="gray20", corner_radius=15)
-            bar_frame.pack(side="left", fill="both", expand=True)
-            
-            bar_title = ctk.CTkLabel(
-                bar_frame,
-                text="Daily Expenses",
-                font=ctk.CTkFont(size=16, weight="bold")
-            )
-            bar_title.pack(pady=(15, 5))
-            
-            bar_chart_frame = ctk.CTkFrame(bar_frame, fg_color="transparent")
-            bar_chart_frame.pack(fill="both", expand=True, padx=10, pady=10)
-            
-            fig2 = Figure(figsize=(5, 4), dpi=100)
-            fig2.patch.set_facecolor('#2a2d2e')
-            ax2 = fig2.add_subplot(111)
-            ax2.set_facecolor('#2a2d2e')
-            
-            dates = list(data["expense_by_date"].keys())
-            daily_amounts = list(data["expense_by_date"].values())
-            
-            # Sort by date
-            sorted_pairs = sorted(zip(dates, daily_amounts))
-            if sorted_pairs:
-                dates, daily_amounts = zip(*sorted_pairs)
-            
-            # Format dates for display (show only day)
-            display_dates = [d.split('-')[-1] for d in dates]
-            
-            bars = ax2.bar(display_dates, daily_amounts, color=self.colors['primary'], alpha=0.8)
-            
-            ax2.tick_params(axis='x', colors='white', rotation=45, labelsize=9)
-            ax2.tick_params(axis='y', colors='white', labelsize=9)
-            ax2.set_ylabel('Amount ($)', color='white', fontsize=10)
-            ax2.grid(axis='y', alpha=0.3, linestyle='--', linewidth=0.5)
-            
-            # Remove top and right spines
-            ax2.spines['top'].set_visible(False)
-            ax2.spines['right'].set_visible(False)
-            ax2.spines['left'].set_color('white')
-            ax2.spines['bottom'].set_color('white')
-            
-            fig2.tight_layout()
-            
-            canvas2 = FigureCanvasTkAgg(fig2, master=bar_chart_frame)
-            canvas2.draw()
-            canvas2.get_tk_widget().pack(fill="both", expand=True)
+        bar_frame = ctk.CTkFrame(charts_container, fg_color="gray20", corner_radius=15)
+        bar_frame.pack(side="left", fill="both", expand=True)
+        
+        bar_title = ctk.CTkLabel(
+            bar_frame,
+            text="Daily Expenses",
+            font=ctk.CTkFont(size=16, weight="bold")
+        )
+        bar_title.pack(pady=(15, 5))
+        
+        self.bar_chart_frame = ctk.CTkFrame(bar_frame, fg_color="transparent")
+        self.bar_chart_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Charts are built when there is first something to plot
+        self.pie_chart = None
+        self.daily_chart = None
+        # Last (month, summary) shown, so an unchanged refresh is skipped
+        self.dashboard_shown = None
+
+    def create_dashboard_charts(self):
+        """Build the pie and daily bar charts once; refreshes update them in place."""
+        ax1, self.pie_canvas = self.create_chart(self.pie_chart_frame, (5, 4))
+        
+        colors_pie = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', 
+                     '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+        
+        self.pie_chart = PieChart(ax1, colors_pie, textprops={'color': "white", 'fontsize': 10})
+        self.pie_canvas.get_tk_widget().pack(fill="both", expand=True)
+        
+        ax2, self.daily_canvas = self.create_chart(self.bar_chart_frame, (5, 4))
+        
+        ax2.tick_params(axis='x', colors='white', rotation=45, labelsize=9)
+        ax2.tick_params(axis='y', colors='white', labelsize=9)
+        ax2.set_ylabel('Amount ($)', color='white', fontsize=10)
+        ax2.grid(axis='y', alpha=0.3, linestyle='--', linewidth=0.5)
+        
+        # Remove top and right spines
+        ax2.spines['top'].set_visible(False)
+        ax2.spines['right'].set_visible(False)
+        ax2.spines['left'].set_color('white')
+        ax2.spines['bottom'].set_color('white')
+        
+        self.daily_chart = BarChart(ax2, alpha=0.8)
+        self.daily_canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def update_dashboard(self):
+        """Update the dashboard view."""
+        self.run_in_background("dashboard", self.load_dashboard, on_done=self._show_dashboard)
+
+    def load_dashboard(self):
+        """Worker side of update_dashboard: this month's summary and the unreadable-date count."""
+        return self.logic.get_summary_data(), self.logic.get_invalid_date_count()
+
+    def _show_dashboard(self, result):
+        """Update the dashboard from this month's summary, in place."""
+        data, invalid_dates = result
+        today = datetime.date.today()
+        shown = ((today.year, today.month), data, invalid_dates)
+        if shown == self.dashboard_shown:
+            return
+        self.dashboard_shown = shown
+
+        if not data:
+            # No data available
+            self.dashboard_content.pack_forget()
+            self.dashboard_empty.pack(expand=True)
+            self._show_invalid_notice(invalid_dates, self.dashboard_empty)
+            return
+
+        self.dashboard_empty.pack_forget()
+        self.dashboard_content.pack(fill="both", expand=True)
+        self._show_invalid_notice(invalid_dates, self.dashboard_content)
+
+        month_name = calendar.month_name[today.month]
+        self.dashboard_month_lbl.configure(text=f"{month_name} {today.year}")
+        self.dashboard_total_lbl.configure(text=f"${data['total_amount']:.2f}")
+        self.dashboard_count_lbl.configure(text=str(data['count']))
+        self.dashboard_avg_lbl.configure(text=f"${data['average']:.2f}")
+
+        if self.pie_chart is None:
+            self.create_dashboard_charts()
+
+        # A summary always has at least one category and one day
+        self.pie_chart.update(data["expense_by_type"])
+        self.pie_canvas.draw_idle()
+
+        # Sort by date, and show only the day
+        dates = sorted(data["expense_by_date"])
+        display_dates = [d.split('-')[-1] for d in dates]
+        daily_amounts = [data["expense_by_date"][d] for d in dates]
+        self.daily_chart.update(display_dates, daily_amounts, [self.colors['primary']] * len(dates))
+        self.daily_canvas.draw_idle()
+
+    def _show_invalid_notice(self, count, above):
+        """Show the unreadable-date notice above the visible dashboard frame, or hide it."""
+        if not count:
+            self.dashboard_notice.pack_forget()
+            return
+        if count == 1:
+            text = "⚠️ 1 expense has a date that can't be read and is left out of the monthly figures"
+        else:
+            text = f"⚠️ {count} expenses have dates that can't be read and are left out of the monthly figures"
+        self.dashboard_notice_lbl.configure(text=text)
+        self.dashboard_notice.pack(fill="x", pady=(0, 20), before=above)
+
+    def show_invalid_dates(self):
+        """List the expenses whose dates can't be read."""
+        self.run_in_background("invalid_dates", self.logic.get_invalid_date_expenses,
+                               on_done=self._show_invalid_dates)
+
+    def _show_invalid_dates(self, rows):
+        if not rows:
+            messagebox.showinfo("Unreadable Dates", "Every expense has a valid date")
+            return
+        lines = [f"#{r['Id']}  {r['Description']}  ${r['Amount']}  date: {r['Date']!r}" for r in rows[:20]]
+        if len(rows) > 20:
+            lines.append(f"... and {len(rows) - 20} more")
+        messagebox.showwarning(
+            "Unreadable Dates",
+            "These expenses need a date in YYYY-MM-DD form:\n\n" + "\n".join(lines)
+        )
+
+    # --- Diagnostics UI ---
+    def setup_diagnostics_ui(self):
+        """Setup the Diagnostics interface."""
+        # Header
+        header_frame = ctk.CTkFrame(self.diagnostics_frame, fg_color="transparent")
+        header_frame.pack(fill="x", pady=(0, 20), padx=20)
+        
+        title = ctk.CTkLabel(
+            header_frame,
+            text="🩺 Diagnostics",
+            font=ctk.CTkFont(size=28, weight="bold")
+        )
+        title.pack(side="left")
+        
+        # Buttons
+        btn_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
+        btn_frame.pack(side="right")
+        
+        export_btn = ctk.CTkButton(
+            btn_frame,
+            text="💾 Export JSON",
+            command=self.export_diagnostics,
+            width=130,
+            height=40,
+            fg_color="#6c757d",
+            hover_color="#5a6268"
+        )
+        export_btn.pack(side="right", padx=5)
+        
+        reset_btn = ctk.CTkButton(
+            btn_frame,
+            text="🧹 Reset",
+            command=self.reset_diagnostics,
+            width=100,
+            height=40,
+            fg_color=self.colors['warning'],
+            hover_color="#e06c00"
+        )
+        reset_btn.pack(side="right", padx=5)
+        
+        refresh_btn = ctk.CTkButton(
+            btn_frame,
+            text="🔄 Refresh",
+            command=self.refresh_diagnostics,
+            width=120,
+            height=40,
+            fg_color=self.colors['info'],
+            hover_color="#138496"
+        )
+        refresh_btn.pack(side="right", padx=5)
+        
+        # Collection switch and totals
+        stats_frame = ctk.CTkFrame(self.diagnostics_frame, fg_color="gray20", corner_radius=15)
+        stats_frame.pack(fill="x", padx=20, pady=(0, 20))
+        
+        self.stats_switch = ctk.CTkSwitch(
+            stats_frame,
+            text="Collect statistics",
+            command=self.toggle_stats,
+            font=ctk.CTkFont(size=14)
+        )
+        self.stats_switch.pack(side="left", padx=20, pady=20)
+        
+        self.stats_totals_label = ctk.CTkLabel(
+            stats_frame,
+            text="",
+            font=ctk.CTkFont(size=14),
+            text_color="gray70"
+        )
+        self.stats_totals_label.pack(side="right", padx=20, pady=20)
+        
+        # Treeview frame
+        tree_frame = ctk.CTkFrame(self.diagnostics_frame, fg_color="gray20", corner_radius=15)
+        tree_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        
+        tree_scroll_y3 = ttk.Scrollbar(tree_frame, orient="vertical")
+        tree_scroll_y3.pack(side="right", fill="y", padx=(0, 10), pady=10)
+        
+        columns = ("Method", "Calls", "Total", "Mean", "Max", "Rows", "Read", "Written")
+        self.tree_stats = ttk.Treeview(
+            tree_frame,
+            columns=columns,
+            show="headings",
+            selectmode="browse",
+            yscrollcommand=tree_scroll_y3.set
+        )
+        tree_scroll_y3.config(command=self.tree_stats.yview)
+        
+        headings = {
+            "Method": ("Method", 280, "w"),
+            "Calls": ("Calls", 70, "e"),
+            "Total": ("Total (ms)", 100, "e"),
+            "Mean": ("Mean (ms)", 100, "e"),
+            "Max": ("Max (ms)", 100, "e"),
+            "Rows": ("Rows", 100, "e"),
+            "Read": ("Read", 90, "e"),
+            "Written": ("Written", 90, "e"),
+        }
+        for column, (text, width, anchor) in headings.items():
+            self.tree_stats.heading(column, text=text)
+            self.tree_stats.column(column, width=width, anchor=anchor)
+        
+        self.tree_stats.pack(fill="both", expand=True, padx=10, pady=10)
+
+    def toggle_stats(self):
+        """Turn statistics collection on or off from the switch."""
+        if self.stats_switch.get():
+            stats.enable()
+        else:
+            stats.disable()
+        self.refresh_diagnostics()
+
+    def reset_diagnostics(self):
+        """Zero the counters."""
+        stats.reset()
+        self.refresh_diagnostics()
+
+    @staticmethod
+    def format_bytes(amount):
+        """Short human-readable byte count."""
+        for unit in ("B", "KB", "MB"):
+            if amount < 1024:
+                return f"{amount:.0f} {unit}" if unit == "B" else f"{amount:.1f} {unit}"
+            amount /= 1024
+        return f"{amount:.1f} GB"
+
+    def refresh_diagnostics(self):
+        """Fill the Diagnostics table from the current counters."""
+        snapshot = stats.snapshot()
+        if snapshot["enabled"]:
+            self.stats_switch.select()
+        else:
+            self.stats_switch.deselect()
+        
+        totals = snapshot["totals"]
+        state = "collecting" if snapshot["enabled"] else "off"
+        self.stats_totals_label.configure(
+            text=f"{state} · {totals[ROWS_SCANNED]:,} rows scanned · "
+                 f"{self.format_bytes(totals[BYTES_READ])} read · "
+                 f"{self.format_bytes(totals[BYTES_WRITTEN])} written"
+        )
+        
+        self.tree_stats.delete(*self.tree_stats.get_children())
+        for name, entry in snapshot["methods"].items():
+            self.tree_stats.insert("", "end", values=(
+                name,
+                entry["calls"],
+                f"{entry['total_s'] * 1000:.1f}",
+                f"{entry['mean_ms']:.2f}",
+                f"{entry['max_s'] * 1000:.1f}",
+                f"{entry[ROWS_SCANNED]:,}",
+                self.format_bytes(entry[BYTES_READ]),
+                self.format_bytes(entry[BYTES_WRITTEN]),
+            ))
+
+    def export_diagnostics(self):
+        """Save the counters as JSON."""
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            initialfile=f"expense_stats_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        
+        if filename:
+            success, msg = stats.export_json(filename)
+            if success:
+                messagebox.showinfo("Success", msg)
+            else:
+                messagebox.showerror("Error", msg)
 
     def export_data(self):
         """Export data to CSV file."""
@@ -1061,11 +1483,15 @@ class ExpenseTrackerApp(ctk.CTk):
         )
         
         if filename:
-            success, msg = self.logic.export_to_csv(filename)
-            if success:
-                messagebox.showinfo("Success", msg)
-            else:
-                messagebox.showerror("Error", msg)
+            self.run_in_background(None, self.logic.export_to_csv, filename, on_done=self._on_exported)
+
+    def _on_exported(self, result):
+        """Report a finished export."""
+        success, msg = result
+        if success:
+            messagebox.showinfo("Success", msg)
+        else:
+            messagebox.showerror("Error", msg)
 
     def change_appearance_mode_event(self, new_appearance_mode: str):
         """Change the appearance mode."""
@@ -1077,7 +1503,8 @@ class ExpenseTrackerApp(ctk.CTk):
             ("add_expense", self.add_expense_frame),
             ("view_expenses", self.view_expenses_frame),
             ("current", self.current_frame),
-            ("monthly", self.monthly_frame)
+            ("monthly", self.monthly_frame),
+            ("diagnostics", self.diagnostics_frame)
         ]:
             if frame.winfo_ismapped():
                 current_frame = name
@@ -1092,6 +1519,13 @@ class ExpenseTrackerApp(ctk.CTk):
         ctk.set_widget_scaling(new_scaling_float)
 
 
+# Redraws timed on the Diagnostics frame when statistics are collected
+stats.watch(ExpenseTrackerApp, [
+    "update_dashboard", "_show_dashboard", "update_monthly_view", "_show_monthly_view",
+    "refresh_expense_list", "refresh_current_list",
+], prefix="GUI")
+
+
 if __name__ == "__main__":
     app = ExpenseTrackerApp()
     app.mainloop()
@@ -0,0 +1,56 @@
+"""
+Micro-benchmark: strptime vs expense_dates.parse_day on a synthetic ledger.
+
+    python benchmarks/bench_dates.py [rows]
+
+Dates are drawn from ten years of days, so the memo table sees ~3.6k
+distinct strings, as a real ledger would.
+"""
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from expense_dates import parse_day  # noqa: E402
+
+
+def synthetic_dates(n, seed=42):
+    rng = random.Random(seed)
+    start = datetime.date(2016, 1, 1).toordinal()
+    days = [datetime.date.fromordinal(start + rng.randrange(3653)).isoformat() for _ in range(n)]
+    # A sprinkling of bad rows, which must be reported rather than dropped
+    for i in rng.sample(range(n), max(1, n // 10000)):
+        days[i] = "2026-13-45"
+    return days
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    dates = synthetic_dates(n)
+
+    t0 = time.perf_counter()
+    bad_strptime = 0
+    for d in dates:
+        try:
+            datetime.datetime.strptime(d, "%Y-%m-%d")
+        except ValueError:
+            bad_strptime += 1
+    strptime_s = time.perf_counter() - t0
+
+    parse_day.cache_clear()
+    t0 = time.perf_counter()
+    bad_fast = sum(1 for d in dates if not parse_day(d))
+    fast_s = time.perf_counter() - t0
+
+    assert bad_fast == bad_strptime
+    print(f"rows:       {n:,}  (invalid: {bad_fast})")
+    print(f"strptime:   {strptime_s:.3f}s  ({n / strptime_s:,.0f} rows/s)")
+    print(f"parse_day:  {fast_s:.3f}s  ({n / fast_s:,.0f} rows/s)")
+    print(f"speedup:    {strptime_s / fast_s:.1f}x  {parse_day.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
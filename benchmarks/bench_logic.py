@@ -0,0 +1,313 @@
+"""
+Latency and memory of every public ExpenseLogic call on synthetic ledgers.
+
+    python benchmarks/bench_logic.py [--sizes 1k,100k] [--json out.json]
+                                     [--baseline benchmarks/baseline.json]
+                                     [--save-baseline] [--threshold 0.25]
+                                     [--backend csv|partitioned|sqlite]
+
+For each size a ledger from ledger_gen.py is generated once into
+benchmarks/.data/ and copied into a scratch directory, and every case runs
+against that copy. Other backends are filled from it by the app's own
+first-run migration, and their results are keyed "<size> <backend>".
+Read cases come first, then writes, so saves, updates and
+deletes only touch a few rows of the ledger the reads saw.
+
+Each case is timed over up to --repeat calls, or as many as fit in
+--max-seconds, but never fewer than 3. Cases marked (cold) drop the caches
+before every call. Memory is the tracemalloc peak of one extra call, made
+separately so that tracing doesn't slow the timed calls.
+
+Results are printed and can be saved as JSON. Against a baseline, a case is
+flagged when its p50 is more than --threshold slower and at least
+--min-delta-ms slower in absolute terms. The script then exits with status 1.
+Baselines are machine-specific, so refresh them with --save-baseline on the
+machine that runs the comparison.
+"""
+import argparse
+import csv
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from expense_logic import ExpenseLogic  # noqa: E402
+from expense_storage import FIELDNAMES  # noqa: E402
+from ledger_gen import PROFILES, generate_rows, parse_size, size_name, write_ledger  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DATA_DIR = os.path.join(HERE, ".data")
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+CATEGORIES = [p[0] for p in PROFILES]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def pristine_ledger(rows, seed, end):
+    """Directory holding the generated ledger for these parameters, writing it on first use."""
+    directory = os.path.join(DATA_DIR, f"{size_name(rows)}-seed{seed}-{end.isoformat()}")
+    if not os.path.exists(os.path.join(directory, "all_expenses.csv")):
+        print(f"  generating {rows:,} rows into {directory} ...", flush=True)
+        tmp = directory + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        write_ledger(tmp, rows, seed, end)
+        os.replace(tmp, directory)
+    return directory
+
+
+class Case:
+    """One benchmarked call: fn(i) is timed; setup(i) and teardown(i) run untimed around it."""
+
+    def __init__(self, name, fn, setup=None, teardown=None):
+        self.name = name
+        self.fn = fn
+        self.setup = setup
+        self.teardown = teardown
+
+
+def read_cases(bench):
+    logic = bench.logic
+    today = datetime.date.today()
+    month_start = today.replace(day=1).isoformat()
+    ids = bench.rng.sample(range(1, bench.rows + 1), min(bench.rows, 10_000))
+    return [
+        Case("ExpenseLogic()", lambda i: ExpenseLogic(bench.backend).close()),
+        Case("load_expenses (cold)", lambda i: logic.load_expenses(), lambda i: logic.invalidate_cache()),
+        Case("load_expenses", lambda i: logic.load_expenses()),
+        Case("iter_expenses (month, 1 category)", lambda i: list(logic.iter_expenses(
+            date_from=month_start, types=[CATEGORIES[i % len(CATEGORIES)]]))),
+        Case("iter_expenses (page of 300)", lambda i: list(logic.iter_expenses(offset=i * 300 % bench.rows, limit=300))),
+        Case("count_expenses (min_amount)", lambda i: logic.count_expenses(min_amount=100)),
+        Case("get_expense", lambda i: logic.get_expense(ids[i % len(ids)])),
+        Case("load_current_month_expenses (cold)", lambda i: logic.load_current_month_expenses(),
+             lambda i: logic.invalidate_cache()),
+        Case("load_current_month_expenses", lambda i: logic.load_current_month_expenses()),
+        Case("query_range (90 days)", lambda i: logic.query_range(
+            (today - datetime.timedelta(days=90)).isoformat(), today.isoformat())),
+        Case("get_invalid_date_expenses", lambda i: logic.get_invalid_date_expenses()),
+        Case("get_summary_data (cold)", lambda i: logic.get_summary_data(), lambda i: logic.invalidate_cache()),
+        Case("get_summary_data", lambda i: logic.get_summary_data()),
+        Case("get_all_time_summary", lambda i: logic.get_all_time_summary()),
+        Case("get_all_monthly_totals_from_master", lambda i: logic.get_all_monthly_totals_from_master()),
+        Case("get_monthly_totals", lambda i: logic.get_monthly_totals()),
+        Case("compare_months_master", lambda i: logic.compare_months_master()),
+        Case("compare_year_over_year", lambda i: logic.compare_year_over_year()),
+        Case("export_to_csv", lambda i: logic.export_to_csv(os.path.join(bench.scratch, "export.csv"))),
+    ]
+
+
+def write_cases(bench):
+    logic = bench.logic
+    rng = bench.rng
+    today = datetime.date.today().isoformat()
+    # Distinct Ids so every delete and update finds its row
+    targets = rng.sample(range(1, bench.rows + 1), min(bench.rows, 2 * bench.max_calls + 2))
+    deletes, updates = targets[::2], targets[1::2]
+
+    def new_rows(i, n):
+        return [("Benchmark row", f"{rng.uniform(1, 200):.2f}", rng.choice(CATEGORIES), today) for _ in range(n)]
+
+    def write_statement(i):
+        # New rows each call, so the import isn't all duplicates after the first
+        with open(os.path.join(bench.scratch, "statement.csv"), "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(generate_rows(1000, seed=10_000 + i, end=datetime.date.today(), years=1))
+
+    def migrate_setup(i):
+        # A fresh directory holding only the monthly backups, as on the first run after upgrading
+        directory = os.path.join(bench.scratch, f"migrate-{i}")
+        os.makedirs(directory)
+        for name in os.listdir(bench.pristine):
+            if name != "all_expenses.csv":
+                shutil.copy(os.path.join(bench.pristine, name), directory)
+        os.chdir(directory)
+        bench.migrating = ExpenseLogic(bench.backend, migrate=False)
+
+    def migrate_teardown(i):
+        bench.migrating.close()
+        os.chdir(bench.workdir)
+        shutil.rmtree(os.path.join(bench.scratch, f"migrate-{i}"))
+
+    return [
+        Case("save_expense", lambda i: logic.save_expense(*new_rows(i, 1)[0])),
+        Case("save_expenses (100 rows)", lambda i: logic.save_expenses(new_rows(i, 100))),
+        Case("update_expense", lambda i: logic.update_expense(updates[i], {"Amount": f"{rng.uniform(1, 200):.2f}"})),
+        Case("delete_expense", lambda i: logic.delete_expense(deletes[i])),
+        Case("import_file (1k rows)", lambda i: logic.import_file(os.path.join(bench.scratch, "statement.csv")),
+             write_statement),
+        Case("migrate_if_needed", lambda i: bench.migrating.migrate_if_needed(), migrate_setup, migrate_teardown),
+    ]
+
+
+class Bench:
+    """Scratch copy of one ledger size and the ExpenseLogic under test."""
+
+    def __init__(self, rows, args):
+        self.rows = rows
+        self.backend = args.backend
+        self.max_calls = args.repeat
+        self.rng = random.Random(args.seed)
+        self.pristine = pristine_ledger(rows, args.seed, args.end)
+        self.scratch = tempfile.mkdtemp(prefix="expense-bench-")
+        self.workdir = os.path.join(self.scratch, "ledger")
+        shutil.copytree(self.pristine, self.workdir)
+        self.cwd = os.getcwd()
+        os.chdir(self.workdir)
+        self.logic = ExpenseLogic(self.backend)
+        self.migrating = None
+
+    def close(self):
+        self.logic.close()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+
+def run_case(case, repeat, max_seconds):
+    latencies = []
+    started = time.perf_counter()
+    i = 0
+    while i < repeat and (i < 3 or time.perf_counter() - started < max_seconds):
+        if case.setup:
+            case.setup(i)
+        gc.collect()
+        t0 = time.perf_counter()
+        case.fn(i)
+        latencies.append(time.perf_counter() - t0)
+        if case.teardown:
+            case.teardown(i)
+        i += 1
+    # One more call, traced, for memory
+    if case.setup:
+        case.setup(i)
+    gc.collect()
+    tracemalloc.start()
+    case.fn(i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if case.teardown:
+        case.teardown(i)
+
+    latencies.sort()
+    ms = [t * 1000 for t in latencies]
+    return {
+        "calls": len(ms),
+        "p50_ms": percentile(ms, 50),
+        "p90_ms": percentile(ms, 90),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": ms[-1],
+        "mean_ms": sum(ms) / len(ms),
+        "peak_kb": peak / 1024,
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """[(size, case, base_p50, p50)] for cases slower than the baseline allows."""
+    regressions = []
+    for size, cases in results.items():
+        for name, result in cases.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            p50, base_p50 = result["p50_ms"], base["p50_ms"]
+            if p50 > base_p50 * (1 + threshold) and p50 - base_p50 >= min_delta_ms:
+                regressions.append((size, name, base_p50, p50))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", default="1k,100k", help="comma-separated, e.g. 1k,100k,1m,10m")
+    parser.add_argument("--repeat", type=int, default=30, help="most timed calls per case")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="time budget per case")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--backend", choices=["csv", "partitioned", "sqlite"], default="csv")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end", type=datetime.date.fromisoformat, default=datetime.date.today(),
+                        help="last day of the generated ledgers (default: today)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes.split(","):
+        rows = parse_size(size)
+        name = size_name(rows) if args.backend == "csv" else f"{size_name(rows)} {args.backend}"
+        print(f"{name} rows", flush=True)
+        bench = Bench(rows, args)
+        try:
+            results[name] = {}
+            for case in read_cases(bench) + write_cases(bench):
+                if args.only and args.only not in case.name:
+                    continue
+                result = run_case(case, args.repeat, args.max_seconds)
+                results[name][case.name] = result
+                print(f"  {case.name:<38} p50 {result['p50_ms']:9.2f}  p90 {result['p90_ms']:9.2f}  "
+                      f"p99 {result['p99_ms']:9.2f} ms  peak {result['peak_kb']:10.0f} KB  "
+                      f"({result['calls']} calls)", flush=True)
+        finally:
+            bench.close()
+
+    report = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "backend": args.backend,
+            "end": args.end.isoformat(),
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with (run with --save-baseline to store one)")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if not regressions:
+        print(f"No regressions against {args.baseline}")
+        return
+    print(f"Regressions against {args.baseline} (p50 more than {args.threshold:.0%} slower):")
+    for size, name, base_p50, p50 in regressions:
+        print(f"  {size:>5} {name:<38} {base_p50:9.2f} -> {p50:9.2f} ms  ({p50 / base_p50 - 1:+.0%})")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
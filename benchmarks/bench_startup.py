@@ -0,0 +1,155 @@
+"""
+Start-up cost: module import times, ExpenseLogic construction, and time to
+first window.
+
+    python benchmarks/bench_startup.py [rows]
+
+Imports are measured with `python -X importtime` in a fresh interpreter per
+module, so nothing is already cached in sys.modules. The ledger part builds
+a synthetic all_expenses.csv of `rows` rows in a temporary directory and
+compares what the window waits for (ExpenseLogic(migrate=False)) with the
+work deferred to the worker (warm_up()). Time to first window needs
+customtkinter and a display; it is skipped otherwise.
+
+Target: the window is on screen within 500 ms of launch, and the app's own
+modules add under 50 ms of import time to it. See benchmarks/STARTUP.md.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from ledger_gen import write_ledger  # noqa: E402
+
+TARGET_FIRST_WINDOW_S = 0.5
+
+# What Expense_Tracker_GUI.py imports at load time, then what it defers
+EAGER = ["customtkinter", "expense_charts", "expense_logic", "expense_pager", "expense_stats",
+         "expense_worker"]
+OWN = "expense_charts, expense_logic, expense_pager, expense_stats, expense_worker"
+DEFERRED = ["numpy", "matplotlib.figure", "matplotlib.backends.backend_tkagg"]
+
+
+def import_times(module):
+    """[(self_us, cumulative_us, name), ...] from -X importtime, or None if the import fails."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def _depth(name):
+    return len(name) - len(name.lstrip())
+
+
+def report_imports(modules, top=5):
+    for module in modules:
+        rows = import_times(module)
+        if rows is None:
+            print(f"  {module:<36} not installed")
+            continue
+        # The module's own tree: the lines above it nested deeper than it is
+        # (-X importtime also lists what the interpreter imported for itself)
+        depth = _depth(rows[-1][2])
+        start = len(rows) - 1
+        while start > 0 and _depth(rows[start - 1][2]) > depth:
+            start -= 1
+        print(f"  {module:<36} {rows[-1][1] / 1000:8.1f} ms")
+        heaviest = sorted(rows[start:-1], key=lambda r: r[0], reverse=True)[:top]
+        for self_us, _, name in heaviest:
+            print(f"      {name.strip():<32} {self_us / 1000:8.1f} ms self")
+
+
+def time_logic(n):
+    from expense_logic import ExpenseLogic
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            write_ledger(".", n, monthly=False)
+            t0 = time.perf_counter()
+            logic = ExpenseLogic(migrate=False)
+            construct_s = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            logic.warm_up()
+            warm_s = time.perf_counter() - t0
+            logic.close()
+            # Second start: the offset index sidecar is loaded, not rebuilt
+            logic = ExpenseLogic(migrate=False)
+            t0 = time.perf_counter()
+            logic.warm_up()
+            rewarm_s = time.perf_counter() - t0
+            logic.close()
+        finally:
+            os.chdir(cwd)
+    print(f"  rows:                                {n:,}")
+    print(f"  ExpenseLogic(migrate=False):         {construct_s * 1000:8.1f} ms  (before first paint)")
+    print(f"  warm_up(), cold:                     {warm_s * 1000:8.1f} ms  (on the worker, after)")
+    print(f"  warm_up(), index sidecar present:    {rewarm_s * 1000:8.1f} ms")
+
+
+FIRST_WINDOW = """
+import time
+t0 = time.perf_counter()
+import Expense_Tracker_GUI
+app = Expense_Tracker_GUI.ExpenseTrackerApp()
+def painted():
+    print(time.perf_counter() - t0)
+    app._painted.set()
+    app.worker.shutdown()
+    app.destroy()
+app.after_idle(lambda: app.after(0, painted))
+app.mainloop()
+"""
+
+
+def time_first_window():
+    """Seconds from interpreter start-up to the first paint, or None if there is no GUI here."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        result = subprocess.run([sys.executable, "-c", FIRST_WINDOW], cwd=tmp, env=env,
+                                capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print("Imported before the window (cumulative, heaviest children):")
+    report_imports(EAGER)
+    # Imported one after another, each cumulative time leaves out what the earlier ones shared
+    own = sum(r[1] for r in import_times(OWN) if r[2].strip() in OWN.split(", "))
+    print(f"  {'the app modules together':<36} {own / 1000:8.1f} ms")
+    print("Deferred until first use:")
+    report_imports(DEFERRED, top=3)
+
+    print("Ledger:")
+    time_logic(n)
+
+    first_window = time_first_window()
+    if first_window is None:
+        print("Time to first window: skipped (needs customtkinter and a display)")
+    else:
+        verdict = "ok" if first_window <= TARGET_FIRST_WINDOW_S else "OVER TARGET"
+        print(f"Time to first window: {first_window * 1000:.0f} ms  "
+              f"(target {TARGET_FIRST_WINDOW_S * 1000:.0f} ms: {verdict})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Deterministic synthetic ledgers for benchmarks.
+
+    python benchmarks/ledger_gen.py SIZE DIR [--seed N] [--end YYYY-MM-DD] [--years N] [--no-monthly]
+
+SIZE is a row count such as 1000, 1k, 100k, 1m or 10m. Writes
+DIR/all_expenses.csv and, unless --no-monthly is given, the [Month].csv
+backups the app keeps next to it, so migrate_if_needed() has real input.
+The same size, seed, end date and span always give byte-identical files.
+
+Rows are spread over the years before --end (default: today, so summaries of
+"this month" have data), in date order with sequential Ids. Weekends and
+December are busier. Each category has its own share of rows, its own
+descriptions and a log-normal amount around its typical price.
+"""
+import argparse
+import calendar
+import csv
+import datetime
+import math
+import os
+import random
+
+FIELDNAMES = ["Id", "Description", "Expense_Type", "Amount", "Date"]
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# (category, share of rows, typical amount, spread, descriptions)
+PROFILES = [
+    ("Groceries", 24, 45.0, 0.6, ["Supermarket", "Farmers market", "Corner shop", "Bakery"]),
+    ("Food & Dining", 22, 18.0, 0.7, ["Coffee", "Lunch", "Takeaway", "Dinner out", "Pizza"]),
+    ("Transportation", 14, 12.0, 0.8, ["Bus fare", "Train ticket", "Fuel", "Taxi", "Parking"]),
+    ("Shopping", 10, 40.0, 1.0, ["Clothes", "Electronics", "Books", "Household"]),
+    ("Entertainment", 8, 25.0, 0.8, ["Cinema", "Concert", "Streaming", "Games"]),
+    ("Bills & Utilities", 7, 90.0, 0.5, ["Electricity", "Water", "Internet", "Phone", "Rent share"]),
+    ("Healthcare", 5, 35.0, 0.9, ["Pharmacy", "Doctor", "Dentist"]),
+    ("Education", 3, 60.0, 0.9, ["Course", "Textbook", "Workshop"]),
+    ("Travel", 3, 180.0, 1.0, ["Flight", "Hotel", "Car hire"]),
+    ("Other", 4, 20.0, 1.0, ["Gift", "Donation", "Misc"]),
+]
+
+
+def parse_size(text):
+    """Row count from 1000, "100k", "1m", "10M" and the like."""
+    text = text.strip().lower().replace("_", "")
+    if text in SIZES:
+        return SIZES[text]
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def size_name(rows):
+    """Short label for a row count: 1k, 100k, 1m, or the plain number."""
+    for name, n in SIZES.items():
+        if n == rows:
+            return name
+    return str(rows)
+
+
+def _day_weight(day):
+    weight = 1.3 if day.weekday() >= 5 else 1.0
+    return weight * 1.25 if day.month == 12 else weight
+
+
+def rows_per_day(n, end, years):
+    """(date, row count) for each day of the span, counts summing to exactly n."""
+    start = end - datetime.timedelta(days=round(365.25 * years) - 1)
+    days = [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+    weights = [_day_weight(d) for d in days]
+    total = sum(weights)
+    emitted, running = 0, 0.0
+    for day, weight in zip(days, weights):
+        running += weight
+        target = round(n * running / total)
+        yield day, target - emitted
+        emitted = target
+
+
+def generate_rows(n, seed=42, end=None, years=5):
+    """Yield n ledger rows (dicts of strings) in date order."""
+    rng = random.Random(seed)
+    end = end or datetime.date.today()
+    cum_weights = []
+    running = 0
+    for profile in PROFILES:
+        running += profile[1]
+        cum_weights.append(running)
+    exp_id = 0
+    for day, count in rows_per_day(n, end, years):
+        date_str = day.isoformat()
+        for category, _, typical, spread, descriptions in rng.choices(PROFILES, cum_weights=cum_weights, k=count):
+            exp_id += 1
+            amount = max(0.5, rng.lognormvariate(math.log(typical), spread))
+            yield {
+                "Id": str(exp_id),
+                "Description": rng.choice(descriptions),
+                "Expense_Type": category,
+                "Amount": f"{amount:.2f}",
+                "Date": date_str,
+            }
+
+
+def write_ledger(directory, n, seed=42, end=None, years=5, monthly=True):
+    """Write all_expenses.csv (and the monthly backups) into directory. Returns the master path."""
+    os.makedirs(directory, exist_ok=True)
+    master_path = os.path.join(directory, "all_expenses.csv")
+    month_files = {}
+    month_writers = {}
+    try:
+        with open(master_path, "w", newline="") as master:
+            writer = csv.DictWriter(master, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            for row in generate_rows(n, seed, end, years):
+                writer.writerow(row)
+                if monthly:
+                    month = int(row["Date"][5:7])
+                    month_writer = month_writers.get(month)
+                    if month_writer is None:
+                        path = os.path.join(directory, f"{calendar.month_name[month]}.csv")
+                        month_files[month] = open(path, "w", newline="")
+                        month_writer = month_writers[month] = csv.DictWriter(month_files[month], fieldnames=FIELDNAMES)
+                        month_writer.writeheader()
+                    month_writer.writerow(row)
+    finally:
+        for f in month_files.values():
+            f.close()
+    return master_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic ledger for benchmarks.")
+    parser.add_argument("size", type=parse_size, help="row count, e.g. 1k, 100k, 1m, 10m")
+    parser.add_argument("directory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end", type=datetime.date.fromisoformat, help="last day (default: today)")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--no-monthly", action="store_true", help="skip the [Month].csv backups")
+    args = parser.parse_args()
+    path = write_ledger(args.directory, args.size, args.seed, args.end, args.years, not args.no_monthly)
+    print(f"Wrote {args.size:,} rows to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Lets pytest import the app modules from the repository root
@@ -0,0 +1,124 @@
+from expense_dates import month_key
+
+
+def _bump(buckets, key, amount, count):
+    """Add amount/count to buckets[key] = [sum, count], dropping it when empty."""
+    bucket = buckets.get(key)
+    if bucket is None:
+        bucket = buckets[key] = [0.0, 0]
+    bucket[0] += amount
+    bucket[1] += count
+    if bucket[1] <= 0:
+        del buckets[key]
+
+
+class LedgerAggregates:
+    """
+    Running totals for the whole ledger: overall, per category, and per
+    (year, month) with that month's per-category and per-day breakdown.
+    Built once from grouped totals and then kept current with add/remove,
+    so dashboard summaries don't rescan the ledger.
+    """
+
+    def __init__(self):
+        self.total = [0.0, 0]
+        self.by_type = {}
+        # (year, month) -> {"total": [sum, count], "by_type": {...}, "by_date": {...}}
+        self.months = {}
+        # Rows whose date doesn't parse: they count towards all-time totals only
+        self.undated = [0.0, 0]
+
+    @classmethod
+    def from_groups(cls, groups):
+        """Build from (date, expense_type, amount_sum, count) tuples."""
+        agg = cls()
+        for date_str, exp_type, amount, count in groups:
+            agg.add(date_str, exp_type, amount, count)
+        return agg
+
+    @classmethod
+    def from_month_totals(cls, totals):
+        """
+        Build from {(year, month): (amount_sum, count)} alone, e.g. a partition
+        manifest. Only the month totals are filled in: enough for
+        monthly_totals(), month_total() and month_window().
+        """
+        agg = cls()
+        for key, (amount, count) in totals.items():
+            agg.months[key] = {"total": [amount, count], "by_type": {}, "by_date": {}}
+        return agg
+
+    def add(self, date_str, exp_type, amount, count=1):
+        """Account for count rows totalling amount; negative values remove them."""
+        self.total[0] += amount
+        self.total[1] += count
+        _bump(self.by_type, exp_type, amount, count)
+        key = month_key(date_str)
+        if key is None:
+            self.undated[0] += amount
+            self.undated[1] += count
+            return
+        month = self.months.get(key)
+        if month is None:
+            month = self.months[key] = {"total": [0.0, 0], "by_type": {}, "by_date": {}}
+        month["total"][0] += amount
+        month["total"][1] += count
+        _bump(month["by_type"], exp_type, amount, count)
+        _bump(month["by_date"], date_str, amount, count)
+        if month["total"][1] <= 0:
+            del self.months[key]
+
+    def add_row(self, row, sign=1):
+        """Apply one ledger row; sign=-1 takes it back out."""
+        try:
+            amount = float(row["Amount"])
+        except (KeyError, TypeError, ValueError):
+            return
+        self.add(row["Date"], row["Expense_Type"], sign * amount, sign)
+
+    def remove_row(self, row):
+        self.add_row(row, sign=-1)
+
+    def summary(self, year=None, month=None):
+        """
+        Totals for one month, or for all time when year/month are None.
+        Returns a dict with total_amount, count, expense_by_type and
+        expense_by_date (month only), or None if there is nothing to report.
+        """
+        if year is None:
+            if self.total[1] <= 0:
+                return None
+            return {
+                "total_amount": self.total[0],
+                "count": self.total[1],
+                "expense_by_type": {k: v[0] for k, v in self.by_type.items()},
+                "invalid_date_count": self.undated[1],
+            }
+        data = self.months.get((year, month))
+        if data is None:
+            return None
+        return {
+            "total_amount": data["total"][0],
+            "count": data["total"][1],
+            "expense_by_type": {k: v[0] for k, v in data["by_type"].items()},
+            "expense_by_date": {k: v[0] for k, v in data["by_date"].items()},
+        }
+
+    def monthly_totals(self):
+        """Totals keyed by (year, month), oldest first."""
+        return {key: data["total"][0] for key, data in sorted(self.months.items())}
+
+    def month_total(self, year, month):
+        """Total for one month, or None if nothing is recorded in it."""
+        data = self.months.get((year, month))
+        return data["total"][0] if data else None
+
+    def month_window(self, end_year, end_month, count):
+        """[((year, month), total), ...] for the count months ending at end_year/end_month, oldest first."""
+        index = end_year * 12 + end_month - 1 - (count - 1)
+        window = []
+        for i in range(index, index + count):
+            key = (i // 12, i % 12 + 1)
+            data = self.months.get(key)
+            window.append((key, data["total"][0] if data else 0.0))
+        return window
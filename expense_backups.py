@@ -0,0 +1,190 @@
+import calendar
+import csv
+import os
+import threading
+import time
+
+from expense_dates import parse_date
+from expense_stats import BYTES_WRITTEN, stats
+from expense_storage import FIELDNAMES, id_value
+
+
+def backup_filename(date_string):
+    """The <MonthName>.csv backup a row dated date_string goes to, or None if the date doesn't parse."""
+    dt = parse_date(date_string)
+    return f"{calendar.month_name[dt.month]}.csv" if dt else None
+
+
+class BackupReplicator:
+    """
+    Copies saved rows into the <MonthName>.csv backups off the insert path.
+    add() only queues rows in memory; a background thread, started by the
+    first add(), appends them, grouped per backup file with one open, write and fsync each, once
+    flush_rows are waiting, flush_seconds after the first of them was
+    queued, or when flush() or close() is called.
+
+    mark_filename holds the highest Id known to be in the backups. Rows are
+    saved with increasing Ids, so after a crash everything above the mark
+    is what never reached them, and recover() copies it over from the
+    ledger. Delivery is at least once: a crash between writing a batch and
+    moving the mark repeats that batch.
+    """
+
+    def __init__(self, directory=".", flush_rows=200, flush_seconds=1.0, mark_filename="backups.pending"):
+        self.directory = directory
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.mark_filename = os.path.join(directory, mark_filename)
+        self._cond = threading.Condition()
+        # filename -> rows waiting to be appended to it
+        self._pending = {}
+        self._count = 0
+        # monotonic time by which the waiting rows must be written
+        self._due = None
+        # Highest Id queued so far; the mark moves to it once it is written
+        self._high = None
+        # add() calls queued, and how many of them have been written out
+        self._queued = 0
+        self._written = 0
+        self._flush_now = False
+        self._closed = False
+        # Set after a failed write: the mark stays put so the next start replays from it
+        self._stuck = False
+        # Started on the first add(), so read-only users never pay for a thread
+        self._thread = None
+
+    def add(self, rows):
+        """Queue saved rows (with their Ids) for their monthly backups."""
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="expense-backups", daemon=True)
+                self._thread.start()
+            for row in rows:
+                self._high = max(self._high or 0, id_value(row["Id"]))
+                filename = backup_filename(row["Date"])
+                if filename is None:
+                    continue  # No month to file it under
+                self._pending.setdefault(filename, []).append(row)
+                self._count += 1
+            self._queued += 1
+            if self._due is None and self._count:
+                # First rows waiting: start the timer
+                self._due = time.monotonic() + self.flush_seconds
+                self._cond.notify_all()
+            elif self._count >= self.flush_rows:
+                self._cond.notify_all()
+
+    def flush(self):
+        """Write everything queued so far and wait until it is on disk."""
+        with self._cond:
+            if self._thread is None:
+                return  # Nothing was ever queued
+            target = self._queued
+            self._flush_now = True
+            self._cond.notify_all()
+            while self._written < target and self._thread.is_alive():
+                self._cond.wait()
+
+    def close(self):
+        """Flush and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def recover(self, last_id, rows_after):
+        """
+        Bring the backups up to last_id, the highest Id the ledger has handed
+        out, after a crash. rows_after(mark) yields the ledger rows whose Id
+        is above mark. Returns the number of rows replayed.
+        """
+        mark = self._read_mark()
+        if mark is None:
+            # No mark yet: backups used to be written with every save
+            self._store_mark(last_id)
+            return 0
+        if mark >= last_id:
+            return 0
+        rows = sorted(rows_after(mark), key=lambda row: id_value(row["Id"]))
+        with self._cond:
+            # Ids above the last surviving row were deleted before they were copied
+            self._high = max(self._high or 0, last_id)
+        if not rows:
+            self._store_mark(last_id)
+            return 0
+        self.add(rows)
+        self.flush()
+        return len(rows)
+
+    def skip_to(self, last_id):
+        """Count every Id up to last_id as backed up, e.g. rows merged in from the backups themselves."""
+        with self._cond:
+            self._high = max(self._high or 0, last_id)
+            if self._count:
+                return  # The writer moves the mark once the waiting rows are out
+            high = self._high
+        self._store_mark(high)
+
+    def _run(self):
+        """Background thread: write the queue whenever it is due."""
+        while True:
+            with self._cond:
+                while True:
+                    if self._count and (self._flush_now or self._closed or self._count >= self.flush_rows
+                                        or time.monotonic() >= self._due):
+                        break
+                    if self._flush_now or self._closed:
+                        # Nothing waiting: the flush or close is already done
+                        self._written = self._queued
+                        self._flush_now = False
+                        self._cond.notify_all()
+                        if self._closed:
+                            return
+                    timeout = None if not self._count else max(0.0, self._due - time.monotonic())
+                    self._cond.wait(timeout)
+                batch, high, queued = self._pending, self._high, self._queued
+                self._pending, self._count, self._due = {}, 0, None
+            self._write(batch, high)
+            with self._cond:
+                self._written = queued
+                self._cond.notify_all()
+
+    def _write(self, batch, high):
+        """Append each file's rows with one open and fsync, then move the mark."""
+        try:
+            for filename, rows in batch.items():
+                path = os.path.join(self.directory, filename)
+                file_exists = os.path.exists(path)
+                with open(path, "a", newline="") as f:
+                    start = f.tell()
+                    writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+                    if not file_exists or os.path.getsize(path) == 0:
+                        writer.writeheader()
+                    writer.writerows(rows)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    stats.add(BYTES_WRITTEN, f.tell() - start)
+        except (OSError, ValueError) as e:
+            print(f"Error writing monthly backups: {e}")
+            self._stuck = True
+            return
+        if not self._stuck:
+            self._store_mark(high)
+
+    def _read_mark(self):
+        try:
+            with open(self.mark_filename, "r") as f:
+                return int(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _store_mark(self, last_id):
+        tmp = self.mark_filename + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                f.write(f"{last_id}\n")
+            os.replace(tmp, self.mark_filename)
+        except OSError as e:
+            print(f"Error writing backup mark: {e}")
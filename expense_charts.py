@@ -0,0 +1,112 @@
+import math
+
+
+class BarChart:
+    """
+    Bars on a Matplotlib axes that are drawn once and then updated in place.
+    While the categories stay the same an update only changes bar heights,
+    colours and value labels; new categories replace the bars but keep the
+    axes and figure. The caller redraws with canvas.draw_idle().
+    """
+
+    def __init__(self, ax, value_labels=False, label_size=9, **bar_style):
+        self.ax = ax
+        self.value_labels = value_labels
+        self.label_size = label_size
+        self.bar_style = bar_style
+        self.labels = None
+        self.bars = []
+        self.texts = []
+
+    def update(self, labels, values, colors):
+        """Show values (one colour each) against the category labels."""
+        labels, values = list(labels), list(values)
+        if labels != self.labels:
+            for artist in self.bars + self.texts:
+                artist.remove()
+            # Numeric positions: a categorical axis would keep every label it has ever seen
+            positions = range(len(labels))
+            self.bars = list(self.ax.bar(positions, values, **self.bar_style))
+            self.ax.set_xticks(list(positions), labels)
+            self.texts = []
+            if self.value_labels:
+                for bar in self.bars:
+                    self.texts.append(self.ax.text(
+                        bar.get_x() + bar.get_width() / 2., 0, "",
+                        ha='center', va='bottom', color='white', fontsize=self.label_size))
+            self.labels = labels
+            layout_changed = True
+        else:
+            layout_changed = False
+        for i, (bar, value, color) in enumerate(zip(self.bars, values, colors)):
+            bar.set_height(value)
+            bar.set_facecolor(color)
+            if self.texts:
+                self.texts[i].set_y(value)
+                self.texts[i].set_text(f'${value:.0f}')
+        self.ax.relim()
+        self.ax.autoscale_view()
+        if layout_changed:
+            self.ax.figure.tight_layout()
+
+
+class PieChart:
+    """
+    A pie (with category and percentage labels) kept on one Matplotlib axes.
+    While the categories stay the same an update moves the existing wedges
+    and labels; otherwise the pie is redrawn on the same axes.
+    """
+
+    LABEL_DISTANCE = 1.1
+    PCT_DISTANCE = 0.6
+
+    def __init__(self, ax, colors, startangle=90, textprops=None):
+        self.ax = ax
+        self.colors = colors
+        self.startangle = startangle
+        self.textprops = textprops or {}
+        self.labels = None
+        self.wedges = []
+        self.texts = []
+        self.autotexts = []
+
+    def update(self, amounts):
+        """Show amounts, a {label: amount} dict."""
+        labels, values = list(amounts), list(amounts.values())
+        total = sum(values)
+        if labels != self.labels or total <= 0 or min(values) < 0:
+            self._draw(labels, values)
+            return
+        # Same walk round the circle as Axes.pie(), counter-clockwise in turns
+        theta1 = self.startangle / 360
+        for wedge, text, autotext, value in zip(self.wedges, self.texts, self.autotexts, values):
+            frac = value / total
+            theta2 = theta1 + frac
+            wedge.set_theta1(360. * theta1)
+            wedge.set_theta2(360. * theta2)
+            thetam = math.pi * (theta1 + theta2)
+            x, y = math.cos(thetam), math.sin(thetam)
+            text.set_position((self.LABEL_DISTANCE * x, self.LABEL_DISTANCE * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((self.PCT_DISTANCE * x, self.PCT_DISTANCE * y))
+            autotext.set_text('%1.1f%%' % (100. * frac))
+            theta1 = theta2
+
+    def _draw(self, labels, values):
+        for artist in self.wedges + self.texts + self.autotexts:
+            artist.remove()
+        self.labels = None
+        self.wedges, self.texts, self.autotexts = self.ax.pie(
+            values,
+            labels=labels,
+            autopct='%1.1f%%',
+            startangle=self.startangle,
+            labeldistance=self.LABEL_DISTANCE,
+            pctdistance=self.PCT_DISTANCE,
+            colors=self.colors[:len(values)],
+            textprops=self.textprops
+        )
+        for autotext in self.autotexts:
+            autotext.set_color('white')
+            autotext.set_weight('bold')
+        self.labels = labels
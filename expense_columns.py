@@ -0,0 +1,362 @@
+import bisect
+import datetime
+import math
+from array import array
+
+from expense_dates import parse_day
+
+# Optional: grouped totals fall back to pure Python. Imported on first use,
+# since it costs more than the rest of the app's own imports put together.
+np = None
+_numpy_checked = False
+
+
+def _numpy():
+    """The numpy module, or None if it isn't installed."""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            pass
+    return np
+
+# Same order as expense_storage.FIELDNAMES (not imported: storage imports this module)
+FIELDS = ("Id", "Description", "Expense_Type", "Amount", "Date")
+
+
+class LedgerColumns:
+    """
+    Column-oriented copy of the ledger.
+    Ids are int64, amounts float64 and dates int32 day ordinals; categories
+    and descriptions are dictionary-encoded into int32 codes. A value the
+    typed column can't reproduce exactly (say "99.0" rather than "99.00", or an
+    invalid date) keeps its original text in `odd`, so rows() gives back the
+    same strings that were put in.
+    """
+
+    def __init__(self, rows=()):
+        self.ids = array("q")
+        self.amounts = array("d")
+        self.days = array("i")
+        self.type_codes = array("i")
+        self.desc_codes = array("i")
+        self.types = []
+        self.descs = []
+        self._type_lookup = {}
+        self._desc_lookup = {}
+        # position -> {field: original text} for values the typed columns can't hold
+        self.odd = {}
+        self._iso_cache = {}
+        # Date index: valid day ordinals in sorted order and the row position of
+        # each. Built on first range query, kept sorted on append, and dropped
+        # when a delete or update shifts positions.
+        self._index_days = None
+        self._index_pos = None
+        # Whether ids is non-decreasing (None: not checked yet). Appending
+        # with fresh Ids keeps it so, which lets positions_of bisect.
+        self._ids_sorted = None
+        # Id index for when they are not (e.g. a ledger rewritten in date
+        # order): Ids in sorted order and the row position of each, built on
+        # first lookup and kept like the date index.
+        self._index_ids = None
+        self._index_id_pos = None
+        self.extend(rows)
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def _code(self, value, values, lookup):
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(values)
+            values.append(value)
+        return code
+
+    def _iso(self, day):
+        iso = self._iso_cache.get(day)
+        if iso is None:
+            iso = self._iso_cache[day] = datetime.date.fromordinal(day).isoformat()
+        return iso
+
+    def _encode(self, row):
+        """Typed values for a row plus the raw text of fields they can't reproduce."""
+        odd = {}
+        raw_id, desc, etype, raw_amount, raw_date = (
+            "" if v is None else str(v) for v in (row.get(k) for k in FIELDS))
+        try:
+            exp_id = int(raw_id)
+            if str(exp_id) != raw_id:
+                odd["Id"] = raw_id
+        except ValueError:
+            exp_id = -1
+            odd["Id"] = raw_id
+        try:
+            amount = float(raw_amount)
+            if f"{amount:.2f}" != raw_amount:
+                odd["Amount"] = raw_amount
+        except ValueError:
+            amount = math.nan
+            odd["Amount"] = raw_amount
+        day = parse_day(raw_date)
+        if not day or self._iso(day) != raw_date:
+            odd["Date"] = raw_date
+        type_code = self._type_lookup.get(etype)
+        if type_code is None:
+            type_code = self._code(etype, self.types, self._type_lookup)
+        desc_code = self._desc_lookup.get(desc)
+        if desc_code is None:
+            desc_code = self._code(desc, self.descs, self._desc_lookup)
+        return exp_id, amount, day, type_code, desc_code, odd
+
+    def append(self, row):
+        exp_id, amount, day, type_code, desc_code, odd = self._encode(row)
+        if odd:
+            self.odd[len(self.amounts)] = odd
+        pos = len(self.amounts)
+        if self._ids_sorted and pos and exp_id < self.ids[-1]:
+            self._ids_sorted = False
+        if self._index_ids is not None:
+            i = bisect.bisect_right(self._index_ids, exp_id)
+            self._index_ids.insert(i, exp_id)
+            self._index_id_pos.insert(i, pos)
+        self.ids.append(exp_id)
+        self.amounts.append(amount)
+        self.days.append(day)
+        self.type_codes.append(type_code)
+        self.desc_codes.append(desc_code)
+        if self._index_days is not None and day:
+            # Rows can be saved with any date, so insert rather than append
+            i = bisect.bisect_right(self._index_days, day)
+            self._index_days.insert(i, day)
+            self._index_pos.insert(i, pos)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def set_row(self, pos, row):
+        exp_id, amount, day, type_code, desc_code, odd = self._encode(row)
+        self.odd.pop(pos, None)
+        if odd:
+            self.odd[pos] = odd
+        if day != self.days[pos]:
+            self._index_days = self._index_pos = None
+        if exp_id != self.ids[pos]:
+            self._ids_sorted = None
+            self._index_ids = self._index_id_pos = None
+        self.ids[pos] = exp_id
+        self.amounts[pos] = amount
+        self.days[pos] = day
+        self.type_codes[pos] = type_code
+        self.desc_codes[pos] = desc_code
+
+    def delete(self, positions):
+        """Remove rows at the given positions."""
+        self._index_days = self._index_pos = None
+        self._index_ids = self._index_id_pos = None
+        for pos in sorted(positions, reverse=True):
+            for column in (self.ids, self.amounts, self.days, self.type_codes, self.desc_codes):
+                del column[pos]
+            self.odd.pop(pos, None)
+            if self.odd:
+                self.odd = {(p - 1 if p > pos else p): v for p, v in self.odd.items()}
+
+    def row(self, pos):
+        """The row at pos as a dict of strings, like csv.DictReader gives."""
+        odd = self.odd.get(pos)
+        row = {
+            "Id": str(self.ids[pos]),
+            "Description": self.descs[self.desc_codes[pos]],
+            "Expense_Type": self.types[self.type_codes[pos]],
+            "Amount": f"{self.amounts[pos]:.2f}",
+            "Date": self._iso(self.days[pos]) if self.days[pos] else "",
+        }
+        if odd:
+            row.update(odd)
+        return row
+
+    def rows(self, positions=None):
+        if positions is None:
+            positions = range(len(self))
+        return [self.row(pos) for pos in positions]
+
+    def select(self, first_day=None, last_day=None, types=None, min_amount=None):
+        """
+        Positions matching the filters, tested on the typed columns. With a
+        day bound the result is in date order and rows with invalid dates are
+        left out; otherwise it is in ledger order. types is a set of category
+        names; rows whose amount doesn't parse never pass min_amount.
+        """
+        if first_day is not None or last_day is not None:
+            positions = self.range_positions(
+                first_day if first_day is not None else 1,
+                last_day if last_day is not None else datetime.date.max.toordinal())
+        else:
+            positions = range(len(self))
+        if types is not None:
+            codes = {self._type_lookup[t] for t in types if t in self._type_lookup}
+            type_codes = self.type_codes
+            positions = (p for p in positions if type_codes[p] in codes)
+        if min_amount is not None:
+            amounts = self.amounts
+            positions = (p for p in positions if amounts[p] >= min_amount)
+        return positions
+
+    def iter_rows(self, positions, fields=FIELDS):
+        """Yield rows at positions one at a time, holding only the given fields."""
+        getters = {
+            "Id": lambda p: str(self.ids[p]),
+            "Description": lambda p: self.descs[self.desc_codes[p]],
+            "Expense_Type": lambda p: self.types[self.type_codes[p]],
+            "Amount": lambda p: f"{self.amounts[p]:.2f}",
+            "Date": lambda p: self._iso(self.days[p]) if self.days[p] else "",
+        }
+        wanted = [(f, getters[f]) for f in fields]
+        odd = self.odd
+        for pos in positions:
+            row = {f: get(pos) for f, get in wanted}
+            extra = odd.get(pos)
+            if extra:
+                row.update((f, v) for f, v in extra.items() if f in row)
+            yield row
+
+    def positions_of(self, expense_id):
+        """Positions of rows whose Id text equals expense_id."""
+        target = str(expense_id)
+        try:
+            exp_id = int(target)
+        except ValueError:
+            exp_id = None
+        if exp_id is not None and str(exp_id) == target:
+            odd = self.odd
+            ids = self.ids
+            if self._check_ids_sorted():
+                candidates = range(bisect.bisect_left(ids, exp_id), bisect.bisect_right(ids, exp_id))
+            else:
+                index_ids, index_pos = self._id_index()
+                candidates = index_pos[bisect.bisect_left(index_ids, exp_id):bisect.bisect_right(index_ids, exp_id)]
+            return [p for p in candidates if "Id" not in odd.get(p, ())]
+        return [p for p, odd in self.odd.items() if odd.get("Id", str(self.ids[p])) == target]
+
+    def _check_ids_sorted(self):
+        if self._ids_sorted is None:
+            ids = self.ids
+            self._ids_sorted = all(a <= b for a, b in zip(ids, ids[1:]))
+        return self._ids_sorted
+
+    def id_order(self):
+        """Positions sorted by Id (stable); a plain range when the Ids are already in order."""
+        if self._check_ids_sorted():
+            return range(len(self))
+        return self._id_index()[1]
+
+    def _id_index(self):
+        if self._index_ids is None:
+            ids = self.ids
+            order = sorted(range(len(ids)), key=ids.__getitem__)
+            self._index_id_pos = array("q", order)
+            self._index_ids = array("q", (ids[p] for p in order))
+        return self._index_ids, self._index_id_pos
+
+    def max_id(self):
+        """Largest integer Id; Ids that don't parse are stored as -1 and ignored."""
+        return max(max(self.ids, default=0), 0)
+
+    def _date_index(self):
+        if self._index_days is None:
+            if _numpy() is not None:
+                days = np.frombuffer(self.days, dtype=np.int32)
+                order = np.argsort(days, kind="stable")
+                order = order[days[order] > 0]
+                self._index_pos = array("q", order.astype(np.int64).tobytes())
+                self._index_days = array("i", days[order].tobytes())
+            else:
+                days = self.days
+                order = [p for p in sorted(range(len(days)), key=days.__getitem__) if days[p]]
+                self._index_pos = array("q", order)
+                self._index_days = array("i", (days[p] for p in order))
+        return self._index_days, self._index_pos
+
+    def invalid_date_positions(self):
+        """Positions of rows whose date doesn't parse."""
+        return [p for p, day in enumerate(self.days) if not day]
+
+    def range_positions(self, first_day, last_day):
+        """Positions of rows dated first_day..last_day (ordinals, inclusive), in date order."""
+        days, positions = self._date_index()
+        lo = bisect.bisect_left(days, first_day)
+        hi = bisect.bisect_right(days, last_day)
+        return positions[lo:hi]
+
+    def grouped_totals(self, use_numpy=None):
+        """
+        (date, expense_type, amount_sum, count) for every date/category pair,
+        sorted by date then category. Uses NumPy when it is installed unless
+        use_numpy=False; both paths add amounts in row order, so they return
+        identical sums.
+        """
+        if use_numpy is None:
+            use_numpy = _numpy() is not None
+        groups = self._grouped_numpy() if use_numpy and _numpy() is not None else self._grouped_python()
+        return sorted(groups, key=lambda g: (g[0], g[1]))
+
+    def _grouped_python(self):
+        groups = {}
+        odd = self.odd
+        for pos, (day, code, amount) in enumerate(zip(self.days, self.type_codes, self.amounts)):
+            if amount != amount:
+                continue  # NaN: amount didn't parse
+            raw_date = odd[pos].get("Date") if pos in odd else None
+            key = (day, code) if raw_date is None else (raw_date, code)
+            bucket = groups.get(key)
+            if bucket is None:
+                groups[key] = [amount, 1]
+            else:
+                bucket[0] += amount
+                bucket[1] += 1
+        return [
+            (self._iso(day) if isinstance(day, int) else day, self.types[code], total, count)
+            for (day, code), (total, count) in groups.items()
+        ]
+
+    def _grouped_numpy(self):
+        days = np.frombuffer(self.days, dtype=np.int32)
+        codes = np.frombuffer(self.type_codes, dtype=np.int32)
+        amounts = np.frombuffer(self.amounts, dtype=np.float64)
+        plain = ~np.isnan(amounts)
+        # Rows whose date text isn't a canonical day group by that text instead
+        odd_dates = [p for p, o in self.odd.items() if "Date" in o]
+        plain[odd_dates] = False
+        ntypes = max(len(self.types), 1)
+        keys = days[plain].astype(np.int64) * ntypes + codes[plain]
+        weights = amounts[plain]
+        if len(keys) and keys.max() - keys.min() < 4 * len(keys) + 4096:
+            # Dense (day, category) range: bin directly on the key offsets
+            base = keys.min()
+            sums = np.bincount(keys - base, weights=weights)
+            counts = np.bincount(keys - base)
+            present = np.nonzero(counts)[0]
+            uniq, sums, counts = present + base, sums[present], counts[present]
+        else:
+            uniq, inverse = np.unique(keys, return_inverse=True)
+            sums = np.bincount(inverse, weights=weights, minlength=len(uniq))
+            counts = np.bincount(inverse, minlength=len(uniq))
+        # bincount accumulates weights in input order, matching the Python loop
+        groups = [
+            (self._iso(int(key // ntypes)), self.types[int(key % ntypes)], float(total), int(count))
+            for key, total, count in zip(uniq.tolist(), sums.tolist(), counts.tolist())
+        ]
+        extra = {}
+        for pos in sorted(odd_dates):
+            amount = self.amounts[pos]
+            if amount != amount:
+                continue
+            key = (self.odd[pos]["Date"], self.types[self.type_codes[pos]])
+            bucket = extra.setdefault(key, [0.0, 0])
+            bucket[0] += amount
+            bucket[1] += 1
+        groups.extend((date, etype, total, count) for (date, etype), (total, count) in extra.items())
+        return groups
@@ -0,0 +1,48 @@
+import datetime
+import functools
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+@functools.lru_cache(maxsize=8192)
+def parse_day(date_string):
+    """
+    Day ordinal for a YYYY-MM-DD string, or 0 if it isn't a valid date.
+    Accepts exactly what strptime(date_string, "%Y-%m-%d") accepts, but
+    canonical strings are sliced directly, and results are memoized since a
+    ledger holds few distinct dates.
+    """
+    s = date_string
+    try:
+        if (len(s) == 10 and s.isascii() and s[4] == "-" and s[7] == "-"
+                and s[:4].isdigit() and s[5:7].isdigit() and s[8:].isdigit()):
+            return datetime.date(int(s[:4]), int(s[5:7]), int(s[8:])).toordinal()
+        return datetime.datetime.strptime(s, DATE_FORMAT).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_date(date_string):
+    """datetime.date for a YYYY-MM-DD string, or None if it isn't a valid date."""
+    try:
+        day = parse_day(date_string)
+    except TypeError:  # Unhashable input
+        return None
+    return datetime.date.fromordinal(day) if day else None
+
+
+def month_key(date_string):
+    """(year, month) for a YYYY-MM-DD string, or None if it isn't a valid date."""
+    dt = parse_date(date_string)
+    return (dt.year, dt.month) if dt else None
+
+
+@functools.lru_cache(maxsize=8192)
+def parse_with_format(date_string, date_format):
+    """datetime.date for date_string in an arbitrary strptime format, or None."""
+    if date_format == DATE_FORMAT:
+        return parse_date(date_string)
+    try:
+        return datetime.datetime.strptime(date_string, date_format).date()
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,73 @@
+import csv
+import itertools
+
+from expense_dates import parse_with_format
+from expense_storage import FIELDNAMES
+
+# Fields an imported row must end up with; Id is always assigned on save.
+IMPORT_FIELDS = FIELDNAMES[1:]
+
+
+def read_rows(path, encoding="utf-8-sig"):
+    """Yield (line_number, row dict) from a CSV file with a header row."""
+    with open(path, "r", newline="", encoding=encoding) as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def normalize(rows, mapping=None, date_format="%Y-%m-%d", default_type="Other", debit_sign="+"):
+    """
+    Map source columns onto Description/Expense_Type/Amount/Date and yield
+    (line_number, row, error), where error is None or why the row is not an
+    expense. mapping is {our_field: source_column}; unmapped fields keep
+    their own name. Amounts lose currency signs and thousands separators.
+    debit_sign is how the source shows money spent: "+" (positive amounts,
+    e.g. our own exports) or "-" (a leading minus, as most bank statements
+    do); amounts with the other sign are credits such as refunds or salary
+    and come back with an error. Dates are converted from date_format to
+    YYYY-MM-DD; unparseable ones are passed through for validation to reject.
+    """
+    if debit_sign not in ("+", "-"):
+        raise ValueError(f"debit_sign must be '+' or '-', not {debit_sign!r}")
+    mapping = mapping or {}
+    for line_no, row in rows:
+        out = {}
+        for field in IMPORT_FIELDS:
+            value = row.get(mapping.get(field, field))
+            out[field] = "" if value is None else str(value).strip()
+        if not out["Expense_Type"]:
+            out["Expense_Type"] = default_type
+        amount = out["Amount"].replace(",", "").replace("$", "").strip()
+        negative = amount.startswith("-")
+        out["Amount"] = amount[1:] if negative else amount
+        error = None
+        if amount and negative != (debit_sign == "-"):
+            error = f"Credit of {out['Amount']}, not an expense (debit_sign is '{debit_sign}')"
+        if date_format != "%Y-%m-%d" and out["Date"]:
+            dt = parse_with_format(out["Date"], date_format)
+            if dt is not None:
+                out["Date"] = dt.isoformat()
+        yield line_no, out, error
+
+
+def row_key(row):
+    """Create a normalized key for a row to detect duplicates."""
+    desc = str(row.get("Description", "")).strip()
+    etype = str(row.get("Expense_Type", "")).strip()
+    try:
+        amt = f"{float(row.get('Amount', 0)):.2f}"
+    except Exception:
+        amt = str(row.get("Amount", "")).strip()
+    date = str(row.get("Date", "")).strip()
+    return (desc, etype, amt, date)
+
+
+def chunked(items, size):
+    """Yield lists of at most size items."""
+    it = iter(items)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
@@ -2,91 +2,277 @@ import csv
 import os
 import datetime
 import calendar
+import itertools
+import time
+
+import expense_import
+import expense_migrate
+from expense_aggregates import LedgerAggregates
+from expense_backups import BackupReplicator
+from expense_dates import parse_date
+from expense_stats import BYTES_READ, BYTES_WRITTEN, ROWS_SCANNED, stats
+from expense_partitions import PartitionedStorage
+from expense_sort import date_key, date_order, external_sort
+from expense_storage import FIELDNAMES, CsvStorage, SqliteStorage, unique_id_rows
+
+
+def default_backend():
+    """
+    Storage backend used when ExpenseLogic isn't given one: EXPENSE_BACKEND
+    (csv, partitioned or sqlite) if set, else "partitioned" once a
+    partitioned ledger exists in the working directory, else "csv".
+    """
+    backend = os.environ.get("EXPENSE_BACKEND")
+    if backend:
+        return backend
+    if os.path.exists(os.path.join("ledger", "manifest.json")):
+        return "partitioned"
+    return "csv"
+
 
 class ExpenseLogic:
-    def __init__(self):
+    def __init__(self, backend=None, migrate=True):
         self.master_filename = "all_expenses.csv"
-        self.ensure_master_exists()
+        if backend is None:
+            backend = default_backend()
+        if backend == "sqlite":
+            self.storage = SqliteStorage("expenses.db")
+        elif backend == "csv":
+            self.storage = CsvStorage(self.master_filename)
+        elif backend == "partitioned":
+            self.storage = PartitionedStorage("ledger")
+        else:
+            raise ValueError(f"Unknown storage backend: {backend}")
+        # Running totals, rebuilt only when storage reports an outside change
+        self._aggregates = None
+        self._agg_generation = None
+        # Callables told about every write as (removed_rows, added_rows)
+        self._change_listeners = []
+        # Copies saved rows to the <Month>.csv backups in the background
+        self.backups = BackupReplicator() if self.storage.monthly_backups else None
+        # migrate=False leaves it to warm_up(), e.g. to run after the window paints
+        if migrate:
+            self.migrate_if_needed()
+            self._recover_backups()
+
+    def warm_up(self):
+        """Migrate if needed and build the caches and running totals ahead of first use."""
         self.migrate_if_needed()
+        self._recover_backups()
+        self.storage.warm_up()
+        self._get_aggregates()
 
     def ensure_master_exists(self):
         """Create master file if it doesn't exist."""
-        if not os.path.exists(self.master_filename):
-            with open(self.master_filename, "w", newline="") as file:
-                writer = csv.DictWriter(file, fieldnames=["Id", "Description", "Expense_Type", "Amount", "Date"])
-                writer.writeheader()
+        if isinstance(self.storage, CsvStorage):
+            self.storage.ensure_exists()
 
     def migrate_if_needed(self):
         """
         If master file is empty but monthly files exist, populate master from them.
         This runs once to transition the user.
         """
-        if os.path.exists(self.master_filename) and os.path.getsize(self.master_filename) > 50:
-            return  # Assume populated if > 50 bytes (header is ~45)
+        if not self.storage.is_empty():
+            return
 
-        all_rows = []
-        seen_keys = set()
-        
-        # Read from all potential month files
-        for m in range(1, 13):
-            mname = calendar.month_name[m]
-            fname = f"{mname}.csv"
-            if os.path.exists(fname):
-                try:
-                    with open(fname, "r", newline="") as f:
-                        reader = csv.DictReader(f)
-                        for row in reader:
-                            key = self._row_key(row)
-                            if key not in seen_keys:
-                                all_rows.append(row)
-                                seen_keys.add(key)
-                except Exception as e:
-                    print(f"Error reading {fname}: {e}")
-
-        if all_rows:
-            # Sort by date
-            all_rows.sort(key=lambda x: x.get("Date", ""))
-            # Re-assign IDs sequentially
-            for i, row in enumerate(all_rows):
-                row["Id"] = i + 1
-            
-            self._rewrite_file(all_rows, self.master_filename)
+        if not isinstance(self.storage, CsvStorage) and os.path.exists(self.master_filename):
+            # Switching an existing master file over: copy it, Ids and all, as
+            # convert_csv_to_sqlite does; the monthly files are only a fallback
+            rows, _ = unique_id_rows(CsvStorage(self.master_filename).load_all())
+            if rows:
+                self.storage.replace_all(rows)
+                self._aggregates = None
+                return
+
+        if expense_migrate.legacy_files():
+            self.merge_legacy_files()
+
+    def merge_legacy_files(self, directory=".", workers=None, chunk_size=5000, memory_budget=None):
+        """
+        Merge the legacy <MonthName>.csv files in directory into the ledger.
+        Files are parsed on a process pool and merged in date order straight
+        into storage, chunk_size rows at a time, so the ledger is never held
+        in memory; memory_budget caps the bytes the workers sort in memory
+        before spilling to disk. Rows already in the ledger (by _row_key) are
+        skipped, so this works on a populated ledger too: new rows get Ids
+        after the existing ones.
+        Returns (success, message, report) where report counts files, rows
+        read, duplicates and imported rows.
+        """
+        started = time.perf_counter()
+        report = {"files": 0, "read": 0, "duplicates": 0, "imported": 0, "errors": [], "seconds": 0.0}
+        existing = None
+        if not self.storage.is_empty():
+            existing = {hash(self._row_key(row)) for row in self.iter_expenses(columns=FIELDNAMES[1:])}
+        # Rows merged from our own backup files are already in the backups
+        own_backups = (self.backups is not None
+                       and os.path.abspath(directory) == os.path.abspath(self.backups.directory))
+        try:
+            rows = expense_migrate.iter_legacy_rows(directory, workers, existing, report, memory_budget)
+            for chunk in expense_import.chunked(rows, chunk_size):
+                ids = self.storage.append_many(chunk)
+                for row, new_id in zip(chunk, ids):
+                    row["Id"] = new_id
+                self._note_change(added=chunk)
+                if not own_backups:
+                    self._append_monthly_backups(chunk)
+                report["imported"] += len(chunk)
+        except Exception as e:
+            report["seconds"] = time.perf_counter() - started
+            return False, f"Error merging after {report['imported']} expenses: {str(e)}", report
+        finally:
+            if own_backups and report["imported"]:
+                self.backups.skip_to(self.storage.last_id())
+        report["seconds"] = time.perf_counter() - started
+
+        msg = f"Merged {report['imported']} expenses from {report['files']} monthly files"
+        if report["duplicates"]:
+            msg += f", {report['duplicates']} duplicates skipped"
+        if report["errors"]:
+            msg += f", {len(report['errors'])} files unreadable"
+        return not report["errors"], msg, report
+
+    def invalidate_cache(self):
+        """Force the next read to go back to storage."""
+        self.storage.invalidate()
+        self._aggregates = None
+
+    def _get_aggregates(self):
+        """Running totals; a full rebuild happens only on cold start or outside edits."""
+        generation = self.storage.generation()
+        if self._aggregates is None or generation != self._agg_generation:
+            self._aggregates = LedgerAggregates.from_groups(self.storage.grouped_totals())
+            self._agg_generation = generation
+        return self._aggregates
+
+    def _month_aggregates(self):
+        """Totals for the monthly views; a partitioned ledger answers from its manifest."""
+        totals = self.storage.month_totals()
+        if totals is None:
+            return self._get_aggregates()
+        return LedgerAggregates.from_month_totals(totals)
+
+    def add_change_listener(self, callback):
+        """
+        Call callback(removed_rows, added_rows) after every save, delete and
+        update made through this object; an update is its old row removed and
+        new row added. It runs on whichever thread made the change.
+        """
+        self._change_listeners.append(callback)
+
+    def _note_change(self, removed=(), added=()):
+        """Apply our own write to the running totals in O(rows changed)."""
+        for callback in self._change_listeners:
+            callback(removed, added)
+        if self._aggregates is None:
+            return
+        for row in removed:
+            self._aggregates.remove_row(row)
+        for row in added:
+            self._aggregates.add_row(row)
+
+    def get_expense(self, expense_id):
+        """A single expense by Id, or None."""
+        return self.storage.get(expense_id)
+
+    def close(self):
+        """Flush pending backups and release storage handles."""
+        if self.backups is not None:
+            self.backups.close()
+        self.storage.close()
 
     def load_expenses(self):
         """Load ALL expenses from master file."""
-        if os.path.exists(self.master_filename):
-            try:
-                with open(self.master_filename, "r", newline="") as file:
-                    reader = csv.DictReader(file)
-                    return list(reader)
-            except Exception as e:
-                print(f"Error loading expenses: {e}")
-                return []
-        return []
+        return list(self.iter_expenses())
+
+    def iter_expenses(self, date_from=None, date_to=None, types=None, min_amount=None, columns=None,
+                      offset=0, limit=None):
+        """
+        Lazily yield expenses matching every given filter.
+        date_from/date_to are inclusive datetime.date objects or YYYY-MM-DD
+        strings; when either is given rows come in date order and rows with
+        invalid dates are skipped. types is a category name or an iterable of
+        them, min_amount a number, and columns the fields each row should
+        hold (default: all of them). offset/limit pick one page of matches.
+        Filters are applied by the storage backend before rows are built, so
+        nothing is materialized up front.
+        """
+        if columns is not None:
+            columns = list(columns)
+            unknown = [c for c in columns if c not in FIELDNAMES]
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        filters = self._expense_filters(date_from, date_to, types, min_amount)
+        if filters is None:
+            return iter(())
+        return self.storage.iter_rows(*filters, columns, offset, limit)
+
+    def count_expenses(self, date_from=None, date_to=None, types=None, min_amount=None):
+        """Number of expenses iter_expenses() yields for the same filters."""
+        filters = self._expense_filters(date_from, date_to, types, min_amount)
+        if filters is None:
+            return 0
+        return self.storage.count_rows(*filters)
+
+    def _expense_filters(self, date_from, date_to, types, min_amount):
+        """Normalized (start, end, types, min_amount), or None if nothing can match."""
+        if isinstance(date_from, str):
+            date_from = parse_date(date_from)
+            if date_from is None:
+                raise ValueError("Invalid date format. Please use YYYY-MM-DD")
+        if isinstance(date_to, str):
+            date_to = parse_date(date_to)
+            if date_to is None:
+                raise ValueError("Invalid date format. Please use YYYY-MM-DD")
+        if isinstance(types, str):
+            types = {types}
+        elif types is not None:
+            types = set(types)
+        if min_amount is not None:
+            min_amount = float(min_amount)
+        if date_from and date_to and date_to < date_from:
+            return None
+        return date_from, date_to, types, min_amount
 
     def load_current_month_expenses(self):
         """Filter expenses for current month from master file."""
-        all_exp = self.load_expenses()
         today = datetime.date.today()
-        
-        filtered = []
-        for exp in all_exp:
-            try:
-                edate = exp["Date"]
-                dt = datetime.datetime.strptime(edate, "%Y-%m-%d")
-                if dt.month == today.month and dt.year == today.year:
-                    filtered.append(exp)
-            except ValueError:
-                pass  # Skip invalid dates
-        return filtered
+        first = today.replace(day=1)
+        last = today.replace(day=calendar.monthrange(today.year, today.month)[1])
+        return self.query_range(first, last)
+
+    def query_range(self, start, end):
+        """
+        Expenses dated from start to end inclusive, in date order.
+        start and end are datetime.date objects or YYYY-MM-DD strings.
+        """
+        if isinstance(start, str):
+            start = parse_date(start)
+        if isinstance(end, str):
+            end = parse_date(end)
+        if start is None or end is None:
+            raise ValueError("Invalid date format. Please use YYYY-MM-DD")
+        if end < start:
+            return []
+        return self.storage.range_rows(start, end)
+
+    def get_invalid_date_expenses(self):
+        """Expenses whose Date doesn't parse; date filters and monthly totals leave these out."""
+        return self.storage.invalid_date_rows()
+
+    def get_invalid_date_count(self):
+        """
+        How many expenses the monthly totals leave out for an unreadable
+        Date, read off the running totals without a scan. Like the totals, it
+        doesn't count rows whose Amount doesn't parse either.
+        """
+        return self._get_aggregates().undated[1]
 
     def validate_date(self, date_string):
         """Validate date format."""
-        try:
-            datetime.datetime.strptime(date_string, "%Y-%m-%d")
+        if isinstance(date_string, str) and parse_date(date_string):
             return True, "Valid date"
-        except ValueError:
-            return False, "Invalid date format. Please use YYYY-MM-DD"
+        return False, "Invalid date format. Please use YYYY-MM-DD"
 
     def validate_amount(self, amount_string):
         """Validate amount."""
@@ -98,9 +284,8 @@ class ExpenseLogic:
         except ValueError:
             return False, "Amount must be a valid number"
 
-    def save_expense(self, description, amount, expense_type, date):
-        """Save a new expense to the master file and monthly backup."""
-        # Validate inputs
+    def _build_expense(self, description, amount, expense_type, date):
+        """Validate inputs and return (True, row) or (False, error message)."""
         if not description.strip():
             return False, "Description cannot be empty"
         
@@ -115,58 +300,188 @@ class ExpenseLogic:
         if not valid_amount:
             return False, amount_value
         
-        expenses = self.load_expenses()
-        
-        # Calculate new ID
-        max_id = 0
-        if expenses:
-            try:
-                max_id = max(int(row["Id"]) for row in expenses)
-            except ValueError:
-                max_id = len(expenses) 
-        
-        new_id = max_id + 1
-        
-        new_expense = {
-            "Id": new_id,
+        return True, {
             "Description": description.strip(),
             "Expense_Type": expense_type.strip(),
             "Amount": f"{amount_value:.2f}",
             "Date": date
         }
+
+    def _append_monthly_backups(self, expenses):
+        """Queue saved rows for their <Month>.csv backups; they are written in the background."""
+        if self.backups is not None:
+            self.backups.add(expenses)
+
+    def _recover_backups(self):
+        """
+        Copy rows a crash kept out of the monthly backups over from the
+        ledger. Returns the number of rows copied.
+        """
+        if self.backups is None:
+            return 0
+
+        def rows_after(mark):
+            for row in self.storage.iter_rows():
+                try:
+                    if int(row["Id"]) > mark:
+                        yield row
+                except (TypeError, ValueError):
+                    continue
+
+        return self.backups.recover(self.storage.last_id(), rows_after)
+
+    def save_expense(self, description, amount, expense_type, date):
+        """Save a new expense to the master file and monthly backup."""
+        valid, new_expense = self._build_expense(description, amount, expense_type, date)
+        if not valid:
+            return False, new_expense
         
         try:
             # 1. Append to Master
-            with open(self.master_filename, "a", newline="") as file:
-                writer = csv.DictWriter(file, fieldnames=["Id", "Description", "Expense_Type", "Amount", "Date"])
-                if os.path.getsize(self.master_filename) == 0:
-                    writer.writeheader()
-                writer.writerow(new_expense)
-
-            # 2. Append to Monthly Backup
-            dt = datetime.datetime.strptime(date, "%Y-%m-%d")
-            month_file = f"{calendar.month_name[dt.month]}.csv"
-            
-            file_exists = os.path.exists(month_file)
-            with open(month_file, "a", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=["Id", "Description", "Expense_Type", "Amount", "Date"])
-                if not file_exists or os.path.getsize(month_file) == 0:
-                    writer.writeheader()
-                writer.writerow(new_expense)
+            new_expense["Id"] = self.storage.append(new_expense)
+            self._note_change(added=[new_expense])
+
+            # 2. Queue for the Monthly Backup
+            self._append_monthly_backups([new_expense])
                 
             return True, "Expense added successfully"
         except Exception as e:
             return False, f"Error saving expense: {str(e)}"
 
+    def _store_batch(self, rows):
+        """Append validated rows to storage and backups as one group commit."""
+        ids = self.storage.append_many(rows)
+        for row, new_id in zip(rows, ids):
+            row["Id"] = new_id
+        self._note_change(added=rows)
+        self._append_monthly_backups(rows)
+        return ids
+
+    def save_expenses(self, expenses, atomic=False):
+        """
+        Save many expenses at once (e.g. a card statement import).
+        Each item is a dict with Description, Amount, Expense_Type and Date keys,
+        or a (description, amount, expense_type, date) tuple.
+        The whole batch is validated first, valid rows get a contiguous block of
+        Ids, and every affected file is written and synced once.
+        With atomic=True nothing is saved if any row is invalid.
+        Returns (success, message, results) with one result dict per input row.
+        """
+        results = []
+        valid_rows = []
+        for index, item in enumerate(expenses):
+            try:
+                if isinstance(item, dict):
+                    fields = [item.get(k, "") for k in ("Description", "Amount", "Expense_Type", "Date")]
+                else:
+                    fields = list(item)
+                description, amount, expense_type, date = (str(f) for f in fields)
+                valid, row = self._build_expense(description, amount, expense_type, date)
+            except (TypeError, ValueError):
+                valid, row = False, "Expected description, amount, category and date"
+            if valid:
+                results.append({"row": index, "ok": True, "id": None, "message": ""})
+                valid_rows.append(row)
+            else:
+                results.append({"row": index, "ok": False, "id": None, "message": row})
+
+        rejected = len(results) - len(valid_rows)
+        if not valid_rows or (atomic and rejected):
+            return False, f"No expenses saved ({rejected} invalid)", results
+
+        try:
+            ids = self._store_batch(valid_rows)
+        except Exception as e:
+            for result in results:
+                if result["ok"]:
+                    result.update(ok=False, message=str(e))
+            return False, f"Error saving expenses: {str(e)}", results
+
+        saved = iter(ids)
+        for result in results:
+            if result["ok"]:
+                result["id"] = next(saved)
+                result["message"] = "Saved"
+        msg = f"Saved {len(ids)} expenses"
+        if rejected:
+            msg += f", {rejected} rejected"
+        return True, msg, results
+
+    def import_file(self, path, mapping=None, date_format="%Y-%m-%d", chunk_size=5000, max_rejects=1000,
+                    debit_sign="+", memory_budget=None):
+        """
+        Stream a CSV or bank statement export into the ledger.
+        Rows are read, normalized (see expense_import.normalize for mapping,
+        date_format and debit_sign), validated, sorted by date with
+        external_sort (within memory_budget bytes) and deduplicated one date
+        at a time against that day's ledger rows, so memory stays flat for
+        any input size. Rows already in the ledger or earlier in the file are
+        skipped; new rows are stored chunk_size at a time, oldest first.
+        Returns (success, message, report) where report holds counts, timing,
+        rows_per_second and up to max_rejects (line, reason) rejections.
+        """
+        report = {"read": 0, "imported": 0, "duplicates": 0, "rejected": 0,
+                  "rejections": [], "seconds": 0.0, "rows_per_second": 0.0}
+        started = time.perf_counter()
+
+        def valid_rows():
+            rows = expense_import.normalize(expense_import.read_rows(path), mapping, date_format,
+                                            debit_sign=debit_sign)
+            for line_no, row, error in rows:
+                report["read"] += 1
+                if error is None:
+                    valid, result = self._build_expense(
+                        row["Description"], row["Amount"], row["Expense_Type"], row["Date"])
+                else:
+                    valid, result = False, error
+                if not valid:
+                    report["rejected"] += 1
+                    if len(report["rejections"]) < max_rejects:
+                        report["rejections"].append((line_no, result))
+                    continue
+                yield result
+
+        try:
+            by_date = external_sort(valid_rows(), date_key, FIELDNAMES[1:], memory_budget)
+            batch = []
+            for date, rows in itertools.groupby(by_date, key=date_key):
+                # Duplicates share a date, so only that day's keys are needed
+                seen = {hash(self._row_key(row))
+                        for row in self.iter_expenses(date_from=date, date_to=date, columns=FIELDNAMES[1:])}
+                for row in rows:
+                    key = hash(self._row_key(row))
+                    if key in seen:
+                        report["duplicates"] += 1
+                        continue
+                    seen.add(key)
+                    batch.append(row)
+                if len(batch) >= chunk_size:
+                    self._store_batch(batch)
+                    report["imported"] += len(batch)
+                    batch = []
+            if batch:
+                self._store_batch(batch)
+                report["imported"] += len(batch)
+        except Exception as e:
+            report["seconds"] = time.perf_counter() - started
+            return False, f"Error importing after {report['imported']} expenses: {str(e)}", report
+
+        report["seconds"] = time.perf_counter() - started
+        stats.add(ROWS_SCANNED, report["read"])
+        stats.add(BYTES_READ, os.path.getsize(path) if stats.enabled else 0)
+        if report["seconds"] > 0:
+            report["rows_per_second"] = report["read"] / report["seconds"]
+        msg = (f"Imported {report['imported']} of {report['read']} rows "
+               f"({report['duplicates']} duplicates, {report['rejected']} rejected) "
+               f"at {report['rows_per_second']:.0f} rows/s")
+        return True, msg, report
+
     def delete_expense(self, expense_id):
         """Delete an expense from the master file."""
         try:
-            expenses = self.load_expenses()
-            initial_count = len(expenses)
-            expenses = [exp for exp in expenses if str(exp["Id"]) != str(expense_id)]
-            
-            if len(expenses) < initial_count:
-                self._rewrite_file(expenses, self.master_filename)
+            removed = self.storage.delete(expense_id)
+            if removed:
+                self._note_change(removed=removed)
                 return True, f"Expense ID {expense_id} deleted successfully"
             return False, "Expense ID not found"
         except Exception as e:
@@ -175,16 +490,10 @@ class ExpenseLogic:
     def update_expense(self, expense_id, new_data):
         """Update an existing expense."""
         try:
-            expenses = self.load_expenses()
-            updated = False
-            for exp in expenses:
-                if str(exp["Id"]) == str(expense_id):
-                    exp.update(new_data)
-                    updated = True
-                    break
-            
-            if updated:
-                self._rewrite_file(expenses, self.master_filename)
+            changed = self.storage.update(expense_id, new_data)
+            if changed:
+                old, new = changed
+                self._note_change(removed=[old], added=[new])
                 return True, "Expense updated successfully"
             return False, "Expense ID not found"
         except Exception as e:
@@ -192,105 +501,57 @@ class ExpenseLogic:
 
     def _rewrite_file(self, expenses, filename):
         """Rewrite entire CSV file with new data."""
+        if filename == self.master_filename:
+            self.storage.replace_all(expenses)
+            self._aggregates = None
+            return
         with open(filename, "w", newline="") as file:
-            writer = csv.DictWriter(file, fieldnames=["Id", "Description", "Expense_Type", "Amount", "Date"])
+            writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
             writer.writeheader()
             writer.writerows(expenses)
 
     def get_summary_data(self):
         """Get summary statistics for current month."""
-        expenses = self.load_current_month_expenses()
-        if not expenses:
+        today = datetime.date.today()
+        summary = self._get_aggregates().summary(today.year, today.month)
+        if not summary:
             return None
-            
-        amounts = [float(row["Amount"]) for row in expenses]
-        total_amount = sum(amounts)
-        
-        # Breakdown by Type
-        expense_by_type = {}
-        for row in expenses:
-            exp_type = row["Expense_Type"]
-            amount = float(row["Amount"])
-            expense_by_type[exp_type] = expense_by_type.get(exp_type, 0) + amount
-            
-        # Group by Date
-        expense_by_date = {} 
-        for row in expenses:
-            date_str = row["Date"]
-            amount = float(row["Amount"])
-            expense_by_date[date_str] = expense_by_date.get(date_str, 0) + amount
 
-        return {
-            "total_amount": total_amount,
-            "expense_by_type": expense_by_type,
-            "expense_by_date": expense_by_date,
-            "count": len(expenses),
-            "average": total_amount / len(expenses) if expenses else 0
-        }
+        summary["average"] = summary["total_amount"] / summary["count"]
+        return summary
 
     def get_all_time_summary(self):
         """Get summary statistics for all time."""
-        expenses = self.load_expenses()
-        if not expenses:
+        summary = self._get_aggregates().summary()
+        if not summary:
             return None
-            
-        amounts = [float(row["Amount"]) for row in expenses]
-        total_amount = sum(amounts)
-        
-        expense_by_type = {}
-        for row in expenses:
-            exp_type = row["Expense_Type"]
-            amount = float(row["Amount"])
-            expense_by_type[exp_type] = expense_by_type.get(exp_type, 0) + amount
 
-        return {
-            "total_amount": total_amount,
-            "expense_by_type": expense_by_type,
-            "count": len(expenses),
-            "average": total_amount / len(expenses) if expenses else 0
-        }
+        summary["average"] = summary["total_amount"] / summary["count"]
+        return summary
 
     def _row_key(self, row):
         """Create a normalized key for a row to detect duplicates."""
-        desc = str(row.get("Description", "")).strip()
-        etype = str(row.get("Expense_Type", "")).strip()
-        try:
-            amt = f"{float(row.get('Amount', 0)):.2f}"
-        except Exception:
-            amt = str(row.get("Amount", "")).strip()
-        date = str(row.get("Date", "")).strip()
-        return (desc, etype, amt, date)
+        return expense_import.row_key(row)
 
     def get_all_monthly_totals_from_master(self):
-        """Calculate totals per month from master file."""
-        expenses = self.load_expenses()
-        totals = {}
-        
-        for row in expenses:
-            try:
-                date_str = row["Date"]
-                dt = datetime.datetime.strptime(date_str, "%Y-%m-%d")
-                mname = calendar.month_name[dt.month]
-                amt = float(row["Amount"])
-                totals[mname] = totals.get(mname, 0) + amt
-            except ValueError:
-                pass
-                
-        return totals
+        """Calculate totals per (year, month) from master file, oldest first."""
+        return self._month_aggregates().monthly_totals()
 
-    def compare_months_master(self):
-        """Compare current month vs previous month using Master Data."""
-        totals = self.get_all_monthly_totals_from_master()
-        
-        today = datetime.date.today()
-        curr_month_name = calendar.month_name[today.month]
-        
-        prev_date = today.replace(day=1) - datetime.timedelta(days=1)
-        prev_month_name = calendar.month_name[prev_date.month]
-        
-        current_total = totals.get(curr_month_name, 0.0)
-        previous_total = totals.get(prev_month_name, 0.0)
-        prev_exists = prev_month_name in totals
+    def get_monthly_totals(self, months=12, end=None):
+        """
+        Totals for a window of months ending at end (a date, default today),
+        oldest first, as [((year, month), total), ...] with empty months as 0.0.
+        """
+        end = end or datetime.date.today()
+        return self._month_aggregates().month_window(end.year, end.month, months)
+
+    def _compare_totals(self, current, previous):
+        """Compare two (year, month) rollups."""
+        aggregates = self._month_aggregates()
+        current_total = aggregates.month_total(*current) or 0.0
+        previous_value = aggregates.month_total(*previous)
+        previous_total = previous_value or 0.0
+        prev_exists = previous_value is not None
         
         difference = current_total - previous_total
         percent_change = None
@@ -310,27 +571,72 @@ class ExpenseLogic:
             "previous_total": previous_total,
             "difference": difference,
             "percent_change": percent_change,
-            "prev_month_name": prev_month_name,
-            "curr_month_name": curr_month_name,
+            "prev_month_name": calendar.month_name[previous[1]],
+            "curr_month_name": calendar.month_name[current[1]],
+            "prev_period": previous,
+            "curr_period": current,
             "prev_exists": prev_exists,
             "status": status
         }
 
-    def export_to_csv(self, filename=None):
-        """Export all expenses to a CSV file."""
+    def compare_months_master(self):
+        """Compare current month vs previous month using Master Data."""
+        today = datetime.date.today()
+        prev_date = today.replace(day=1) - datetime.timedelta(days=1)
+        return self._compare_totals((today.year, today.month), (prev_date.year, prev_date.month))
+
+    def compare_year_over_year(self, year=None, month=None):
+        """Compare a month (default: current) with the same month a year earlier."""
+        today = datetime.date.today()
+        year = year or today.year
+        month = month or today.month
+        return self._compare_totals((year, month), (year - 1, month))
+
+    def sort_ledger_by_date(self, memory_budget=None):
+        """
+        Rewrite the CSV master file in date order, keeping every Id. The sort
+        runs on disk within memory_budget bytes, so it works on ledgers larger
+        than RAM. Returns (success, message).
+        """
+        if not isinstance(self.storage, CsvStorage):
+            return False, "Only the CSV ledger is stored in file order"
+        try:
+            self.storage.compact(by_date=True, memory_budget=memory_budget)
+        except (OSError, ValueError) as e:
+            return False, f"Error sorting ledger: {str(e)}"
+        return True, f"Sorted {self.count_expenses()} expenses by date"
+
+    def export_to_csv(self, filename=None, by_date=False, memory_budget=None):
+        """
+        Export all expenses to a CSV file, in ledger order or with by_date
+        oldest first (sorted on disk within memory_budget bytes).
+        """
         if filename is None:
             filename = f"expenses_export_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
         try:
-            expenses = self.load_expenses()
-            if not expenses:
+            expenses = self.iter_expenses()
+            if by_date:
+                expenses = external_sort(expenses, date_order, FIELDNAMES, memory_budget)
+            first = next(expenses, None)
+            if first is None:
                 return False, "No expenses to export"
             
+            count = 1
             with open(filename, "w", newline="") as file:
-                writer = csv.DictWriter(file, fieldnames=["Id", "Description", "Expense_Type", "Amount", "Date"])
+                writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
                 writer.writeheader()
-                writer.writerows(expenses)
+                writer.writerow(first)
+                for exp in expenses:
+                    writer.writerow(exp)
+                    count += 1
+                stats.add(BYTES_WRITTEN, file.tell())
             
-            return True, f"Exported {len(expenses)} expenses to {filename}"
+            return True, f"Exported {count} expenses to {filename}"
         except Exception as e:
             return False, f"Error exporting: {str(e)}"
+
+
+# Every public method, plus the cold rebuild of the running totals
+stats.watch(ExpenseLogic)
+stats.watch(ExpenseLogic, ["_get_aggregates"])
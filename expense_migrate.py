@@ -0,0 +1,169 @@
+import calendar
+import csv
+import heapq
+import os
+import sys
+
+from expense_import import IMPORT_FIELDS, row_key
+from expense_sort import DEFAULT_MEMORY_BUDGET, date_key, external_sort
+from expense_stats import BYTES_READ, ROWS_SCANNED, stats
+
+# Below this many bytes of legacy files, starting a process pool costs more than it saves
+POOL_MIN_BYTES = 1024 * 1024
+# A parsed row takes about ten times the bytes of its CSV line
+MEMORY_PER_FILE_BYTE = 10
+
+
+def legacy_files(directory="."):
+    """The <MonthName>.csv files in directory, January first."""
+    paths = [os.path.join(directory, f"{calendar.month_name[m]}.csv") for m in range(1, 13)]
+    return [path for path in paths if os.path.exists(path)]
+
+
+def _sort_file(path, memory_budget):
+    """
+    Pool worker: sort the complete rows of one legacy file by date. A file
+    that fits memory_budget comes back as a list; a larger one is sorted on
+    disk with external_sort into a temporary run file, returned by path.
+    Returns (path, rows or run_path, rows_read, bytes_read, error).
+    """
+    counts = {"read": 0}
+    run_path = None
+
+    def complete_rows(reader):
+        header = next(reader, [])
+        if any(k not in header for k in IMPORT_FIELDS):
+            # Headerless file: every row is incomplete
+            counts["read"] += sum(1 for rec in reader if rec)
+            return
+        columns = [header.index(k) for k in IMPORT_FIELDS]
+        width = max(columns) + 1
+        for rec in reader:
+            if not rec:
+                continue  # csv.DictReader skips blank lines too
+            counts["read"] += 1
+            if len(rec) < width:
+                continue  # Short row
+            yield dict(zip(IMPORT_FIELDS, [rec[c] for c in columns]))
+
+    try:
+        size = os.path.getsize(path)
+        with open(path, "r", newline="") as src:
+            rows = complete_rows(csv.reader(src))
+            if size * MEMORY_PER_FILE_BYTE <= memory_budget:
+                # Stable, so rows sharing a date keep their order in the file
+                return path, sorted(rows, key=date_key), counts["read"], size, None
+
+            import tempfile
+
+            fd, run_path = tempfile.mkstemp(prefix="expense-migrate-", suffix=".csv")
+            with open(fd, "w", newline="") as out:
+                writer = csv.DictWriter(out, fieldnames=IMPORT_FIELDS)
+                writer.writeheader()
+                writer.writerows(external_sort(rows, date_key, IMPORT_FIELDS, memory_budget))
+        return path, run_path, counts["read"], size, None
+    except Exception as e:
+        if run_path is not None and os.path.exists(run_path):
+            os.remove(run_path)
+        return path, None, counts["read"], 0, str(e)
+
+
+def _sort_files(paths, workers, memory_budget):
+    """Run _sort_file over paths, on a process pool when there are enough of them to pay off."""
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if sum(os.path.getsize(path) for path in paths) < POOL_MIN_BYTES:
+        workers = 1
+    # Sorted files are all held until the merge, so each gets an equal share
+    share = (memory_budget or DEFAULT_MEMORY_BUDGET) // len(paths)
+    if workers > 1:
+        # Imported here: the app only needs it once a migration runs
+        import concurrent.futures
+
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(_sort_file, paths, [share] * len(paths)))
+        except (OSError, concurrent.futures.process.BrokenProcessPool) as e:
+            print(f"Error starting migration workers, reading files one by one: {e}")
+    return [_sort_file(path, share) for path in paths]
+
+
+def iter_legacy_rows(directory=".", workers=None, exclude=None, report=None, memory_budget=None):
+    """
+    Yield the rows of every legacy monthly file in directory, oldest date
+    first, with only the Description/Expense_Type/Amount/Date fields.
+    The files are parsed and sorted on a process pool (workers processes,
+    default one per CPU) and the sorted files are k-way merged. They share
+    memory_budget bytes: a file within its share is sorted in memory, a
+    larger one on disk with external_sort, so memory stays within budget.
+    A row is dropped when another with the same _row_key was already
+    yielded or when its key hash is in exclude (e.g. the rows already in
+    the ledger). Duplicates share a date, so the merge only has to remember
+    the keys of the current date. Counts go into report if given.
+    """
+    if report is None:
+        report = {}
+    for name in ("files", "read", "duplicates"):
+        report.setdefault(name, 0)
+    report.setdefault("errors", [])
+    paths = legacy_files(directory)
+    if not paths:
+        return
+
+    streams, files, run_paths = [], [], []
+    try:
+        for path, sorted_rows, read, size, error in _sort_files(paths, workers, memory_budget):
+            report["read"] += read
+            stats.add(ROWS_SCANNED, read)
+            stats.add(BYTES_READ, size)
+            if error:
+                print(f"Error reading {path}: {error}")
+                report["errors"].append((path, error))
+                continue
+            report["files"] += 1
+            if isinstance(sorted_rows, list):
+                streams.append(sorted_rows)
+            else:
+                run_paths.append(sorted_rows)
+                files.append(open(sorted_rows, "r", newline=""))
+                streams.append(csv.DictReader(files[-1]))
+
+        # heapq.merge is stable across its inputs, so equal dates come out
+        # January's file first, as the old read-all-then-sort did
+        current_date, seen = None, set()
+        for row in heapq.merge(*streams, key=date_key):
+            date = date_key(row)
+            if date != current_date:
+                current_date, seen = date, set()
+            key = hash(row_key(row))
+            if key in seen or (exclude is not None and key in exclude):
+                report["duplicates"] += 1
+                continue
+            seen.add(key)
+            yield row
+    finally:
+        for f in files:
+            f.close()
+        for run_path in run_paths:
+            os.remove(run_path)
+
+
+if __name__ == "__main__":
+    # python expense_migrate.py [directory] [--backend csv|sqlite|partitioned] [--workers N] [--memory-mb MB]
+    import argparse
+
+    from expense_logic import ExpenseLogic
+
+    parser = argparse.ArgumentParser(description="Merge legacy <MonthName>.csv files into the ledger.")
+    parser.add_argument("directory", nargs="?", default=".")
+    parser.add_argument("--backend", choices=["csv", "sqlite", "partitioned"], default=None,
+                        help="default: the one the app uses (see EXPENSE_BACKEND)")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: one per CPU)")
+    parser.add_argument("--memory-mb", type=int, default=None, help="memory for sorting, shared by the workers")
+    args = parser.parse_args()
+
+    logic = ExpenseLogic(backend=args.backend, migrate=False)
+    budget = args.memory_mb * 1024 * 1024 if args.memory_mb else None
+    success, msg, _ = logic.merge_legacy_files(args.directory, workers=args.workers, memory_budget=budget)
+    logic.close()
+    print(msg)
+    sys.exit(0 if success else 1)
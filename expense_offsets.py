@@ -0,0 +1,211 @@
+import bisect
+import csv
+import io
+import locale
+import mmap
+import os
+from array import array
+
+from expense_stats import BYTES_READ, BYTES_WRITTEN, ROWS_SCANNED, stats
+
+# What open() uses for the ledger in text mode
+ENCODING = locale.getpreferredencoding(False)
+
+
+def _parse(record):
+    """Fields of one raw CSV record."""
+    return next(csv.reader(io.StringIO(record.decode(ENCODING), newline="")), [])
+
+
+def _canonical_id(text):
+    """Integer Id for text that is exactly str(int), else -1."""
+    try:
+        exp_id = int(text)
+    except ValueError:
+        return -1
+    return exp_id if str(exp_id) == text and exp_id >= 0 else -1
+
+
+class OffsetIndex:
+    """
+    Where each row of a CSV ledger starts, keyed by Id.
+    Built with one pass over an mmap of the file and saved to a sidecar
+    (e.g. all_expenses.idx) together with the file's stamp, so a restart
+    loads it instead of rescanning and any outside change forces a rebuild.
+    Rows are read back by slicing the mmap, so a point lookup parses one row.
+    """
+
+    MAGIC = "expense-offsets-1"
+
+    def __init__(self, filename, index_filename):
+        self.filename = filename
+        self.index_filename = index_filename
+        self._reset(None)
+        self.dirty = False
+
+    def _reset(self, stamp):
+        self.stamp = stamp
+        self.fields = []
+        # Row Ids in file order (-1 where the Id isn't a plain integer) and the
+        # byte offset each row starts at, plus the end offset of the last row
+        self.ids = array("q")
+        self.starts = array("q")
+        self._sorted = True
+        self._plain = True
+        self._lookup = None
+
+    def _scan_ids(self):
+        """Note whether Ids are strictly increasing and all plain integers."""
+        ids = self.ids
+        self._sorted = all(a < b for a, b in zip(ids, ids[1:]))
+        self._plain = -1 not in ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def build(self, stamp):
+        """Scan the whole file and index every row."""
+        self._reset(stamp)
+        self.dirty = True
+        with open(self.filename, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = _record_end(mm, 0, size)
+                self.fields = _parse(mm[:pos])
+                id_col = self.fields.index("Id") if "Id" in self.fields else None
+                ids, starts = self.ids, self.starts
+                while pos < size:
+                    end = _record_end(mm, pos, size)
+                    record = mm[pos:end]
+                    if record.strip(b"\r\n"):
+                        if id_col == 0 and not record.startswith(b'"'):
+                            comma = record.find(b",")
+                            text = record[:comma].decode(ENCODING) if comma >= 0 else ""
+                        else:
+                            values = _parse(record)
+                            text = values[id_col] if id_col is not None and id_col < len(values) else ""
+                        ids.append(_canonical_id(text))
+                        starts.append(pos)
+                    pos = end
+                starts.append(size)
+        stats.add(BYTES_READ, size)
+        stats.add(ROWS_SCANNED, len(self.ids))
+        self._scan_ids()
+
+    def load(self, stamp):
+        """Read the sidecar; True if it was saved for this exact file stamp."""
+        try:
+            with open(self.index_filename, "rb") as f:
+                header = f.readline().decode("ascii").split()
+                if header[0] != self.MAGIC or tuple(int(p) for p in header[1:4]) != stamp:
+                    return False
+                count = int(header[4])
+                fields = _parse(f.readline())
+                ids, starts = array("q"), array("q")
+                ids.fromfile(f, count)
+                starts.fromfile(f, count + 1 if count or header[5] == "1" else 0)
+                stats.add(BYTES_READ, f.tell())
+        except (OSError, ValueError, IndexError, EOFError, UnicodeDecodeError):
+            return False
+        self._reset(stamp)
+        self.fields, self.ids, self.starts = fields, ids, starts
+        self._scan_ids()
+        self.dirty = False
+        return True
+
+    def save(self):
+        """Write the sidecar atomically if anything changed since the last save."""
+        if not self.dirty or self.stamp is None:
+            return
+        tmp = self.index_filename + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                stamp = " ".join(str(p) for p in self.stamp)
+                f.write(f"{self.MAGIC} {stamp} {len(self.ids)} {int(bool(self.starts))}\n".encode("ascii"))
+                out = io.StringIO(newline="")
+                csv.writer(out, lineterminator="\n").writerow(self.fields)
+                f.write(out.getvalue().encode(ENCODING))
+                self.ids.tofile(f)
+                self.starts.tofile(f)
+                stats.add(BYTES_WRITTEN, f.tell())
+            os.replace(tmp, self.index_filename)
+            self.dirty = False
+        except OSError as e:
+            print(f"Error writing offset index: {e}")
+
+    def find(self, expense_id):
+        """Row number of expense_id, or None if absent or not uniquely indexed."""
+        exp_id = _canonical_id(str(expense_id))
+        if exp_id < 0:
+            return None
+        if self._sorted:
+            i = bisect.bisect_left(self.ids, exp_id)
+            return i if i < len(self.ids) and self.ids[i] == exp_id else None
+        if self._lookup is None:
+            lookup = {}
+            for i, value in enumerate(self.ids):
+                # A repeated Id can't be patched by position; leave it to a full scan
+                lookup[value] = None if value in lookup else i
+            self._lookup = lookup
+        return self._lookup.get(exp_id)
+
+    def covers(self, expense_id):
+        """True if a miss from find() proves expense_id isn't in the file."""
+        return self._plain and _canonical_id(str(expense_id)) >= 0
+
+    def span(self, i):
+        """(offset, length) in bytes of row number i, line ending included."""
+        return self.starts[i], self.starts[i + 1] - self.starts[i]
+
+    def read(self, i):
+        """Row number i as a dict of strings, read through an mmap."""
+        offset, length = self.span(i)
+        with open(self.filename, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                record = mm[offset:offset + length]
+        stats.add(BYTES_READ, length)
+        stats.add(ROWS_SCANNED, 1)
+        return dict(zip(self.fields, _parse(record)))
+
+    def encode(self, row, i):
+        """row as bytes in the file's column order, ending like row number i does."""
+        offset, length = self.span(i)
+        with open(self.filename, "rb") as f:
+            f.seek(offset + length - 2)
+            tail = f.read(2)
+        out = io.StringIO(newline="")
+        csv.writer(out, lineterminator="\r\n" if tail == b"\r\n" else "\n").writerow(
+            [row.get(k, "") for k in self.fields])
+        return out.getvalue().encode(ENCODING)
+
+    def extend(self, ids, lengths, stamp):
+        """Record rows just appended to the end of the file."""
+        end = self.starts.pop() if self.starts else 0
+        for exp_id, length in zip(ids, lengths):
+            exp_id = _canonical_id(str(exp_id))
+            if self.ids and exp_id <= self.ids[-1]:
+                self._sorted = False
+            if exp_id < 0:
+                self._plain = False
+            self.ids.append(exp_id)
+            self.starts.append(end)
+            end += length
+        self.starts.append(end)
+        self._lookup = None
+        self.stamp = stamp
+        self.dirty = True
+
+
+def _record_end(mm, pos, size):
+    """Offset just past the record starting at pos, spanning quoted newlines."""
+    end = pos
+    while True:
+        nl = mm.find(b"\n", end)
+        if nl < 0:
+            return size
+        end = nl + 1
+        # An even quote count means no quoted field is still open
+        if mm[pos:end].count(b'"') % 2 == 0:
+            return end
@@ -0,0 +1,229 @@
+import bisect
+
+
+class TreePager:
+    """
+    Virtual scrolling for a ttk.Treeview over a long, ordered list.
+    The tree only ever holds the rows in view. They are copied out of one
+    cached page, and a new page is fetched (on the background worker) when
+    the view scrolls past it. The scrollbar is driven by hand from the
+    total row count, so it behaves as if every row were loaded.
+
+    fetch(offset, limit) -> (total_count, rows) runs on the worker and
+    returns treeview value tuples, Id first; submit(fn, *args, on_done=...)
+    hands it to the worker. sort_key(values) gives the list's order and
+    accepts(values) whether a row belongs in it, so apply() can place saved
+    rows and drop deleted ones without fetching again.
+    """
+
+    def __init__(self, tree, scrollbar, fetch, submit, sort_key, accepts=None,
+                 page_size=300, row_height=35):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch = fetch
+        self.submit = submit
+        self.sort_key = sort_key
+        self.accepts = accepts or (lambda values: True)
+        self.page_size = page_size
+        self.row_height = row_height
+        self.count = 0
+        self.first = 0
+        self.visible = 20
+        self.page_start = 0
+        self.page_rows = []
+        # Id -> (tree item, values) for the rows currently in the tree
+        self.items = {}
+        self._loading = None
+
+        scrollbar.config(command=self.yview)
+        tree.bind("<Configure>", self._on_resize)
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        tree.bind("<Button-5>", lambda e: self.scroll(3))
+        tree.bind("<Up>", lambda e: self._on_arrow(-1))
+        tree.bind("<Down>", lambda e: self._on_arrow(1))
+        tree.bind("<Prior>", lambda e: self.scroll(-self.visible))
+        tree.bind("<Next>", lambda e: self.scroll(self.visible))
+
+    def refresh(self):
+        """Re-fetch the page around the current position (after data changed)."""
+        self._loading = None
+        self._request(max(0, self.first - self.page_size // 4))
+
+    def reset(self):
+        """Scroll back to the top and re-fetch."""
+        self.first = 0
+        self._loading = None
+        self._request(0)
+
+    def scroll(self, rows):
+        self.scroll_to(self.first + rows)
+        return "break"
+
+    def scroll_to(self, first):
+        """Make row number first the top visible row."""
+        self.first = max(0, min(first, self.count - self.visible))
+        self._render()
+        page_end = self.page_start + len(self.page_rows)
+        in_page = self.page_start <= self.first and min(self.first + self.visible, self.count) <= page_end
+        if not in_page and (self.page_rows or self.count):
+            # Centre the next page on the view so scrolling either way stays cached
+            self._request(max(0, self.first - (self.page_size - self.visible) // 2))
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"|"pages")."""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.count))
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def apply(self, removed=(), added=()):
+        """
+        Patch the cached page with deleted and saved rows (value tuples) and
+        update only the tree items that changed. An update is its old row in
+        removed and new row in added. Falls back to refresh() for big batches
+        or rows whose place in the list can't be worked out.
+        """
+        removed = [v for v in removed if self.accepts(v)]
+        added = [v for v in added if self.accepts(v)]
+        if not removed and not added:
+            return
+        if len(removed) + len(added) > self.page_size // 2:
+            self.refresh()
+            return
+        try:
+            keys = [self.sort_key(v) for v in self.page_rows]
+            if any(a >= b for a, b in zip(keys, keys[1:])):
+                raise ValueError("page isn't in key order")
+            replaced = {str(v[0]): v for v in added}
+            for values in removed:
+                if str(values[0]) in replaced and self._patch(replaced[str(values[0])], keys):
+                    del replaced[str(values[0])]
+                else:
+                    self._remove(values, keys)
+            for values in replaced.values():
+                self._insert(values, keys)
+        except ValueError:
+            self.refresh()
+            return
+        self.scroll_to(self.first)
+
+    def _patch(self, values, keys):
+        """Replace a cached row whose position doesn't change; False if it would move."""
+        for i, row in enumerate(self.page_rows):
+            if str(row[0]) == str(values[0]):
+                if self.sort_key(values) != keys[i]:
+                    return False
+                self.page_rows[i] = values
+                return True
+        return False
+
+    def _remove(self, values, keys):
+        key = self.sort_key(values)
+        self.count = max(0, self.count - 1)
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del self.page_rows[i]
+            del keys[i]
+            if self.page_start + i < self.first:
+                self.first -= 1
+        elif i == 0 and self.page_start > 0:
+            # Gone from before the cached page: everything after shifts up
+            self.page_start -= 1
+            self.first = max(0, self.first - 1)
+
+    def _insert(self, values, keys):
+        key = self.sort_key(values)
+        i = bisect.bisect_left(keys, key)
+        reaches_end = self.page_start + len(self.page_rows) >= self.count
+        self.count += 1
+        if i == 0 and self.page_start > 0:
+            # Lands before the cached page
+            self.page_start += 1
+            self.first += 1
+        elif i < len(keys) or reaches_end:
+            self.page_rows.insert(i, values)
+            keys.insert(i, key)
+            if self.page_start + i < self.first:
+                self.first += 1
+
+    def _request(self, start):
+        if self._loading == start:
+            return  # Already on its way
+        self._loading = start
+        self.submit(self.fetch, start, self.page_size, on_done=lambda result: self._on_page(start, result))
+
+    def _on_page(self, start, result):
+        self._loading = None
+        self.count, self.page_rows = result
+        self.page_start = start
+        self.scroll_to(self.first)
+
+    def _render(self):
+        """Bring the tree in line with the visible slice, touching only rows that changed."""
+        tree = self.tree
+        lo = self.first - self.page_start
+        rows = self.page_rows[max(lo, 0):lo + self.visible] if lo + self.visible > 0 else []
+        # Ids should be unique, but a hand-edited file may repeat one
+        seen = {}
+        keys = []
+        for values in rows:
+            exp_id = str(values[0])
+            seen[exp_id] = seen.get(exp_id, -1) + 1
+            keys.append(exp_id if not seen[exp_id] else (exp_id, seen[exp_id]))
+        wanted = set(keys)
+        for key in [k for k in self.items if k not in wanted]:
+            tree.delete(self.items.pop(key)[0])
+        children = list(tree.get_children())
+        for index, (exp_id, values) in enumerate(zip(keys, rows)):
+            entry = self.items.get(exp_id)
+            if entry is None:
+                item = tree.insert("", index, values=values)
+                children.insert(index, item)
+            else:
+                item, shown = entry
+                if children[index] != item:
+                    tree.move(item, "", index)
+                    children.remove(item)
+                    children.insert(index, item)
+                if shown != values:
+                    tree.item(item, values=values)
+            self.items[exp_id] = (item, values)
+        if self.count:
+            self.scrollbar.set(self.first / self.count, min(1.0, (self.first + self.visible) / self.count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_resize(self, event):
+        # Heading row takes about one row of height
+        visible = max(1, event.height // self.row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.scroll_to(self.first)
+
+    def _on_wheel(self, event):
+        if event.delta:
+            # Windows reports multiples of 120 per notch, macOS small deltas
+            notches = event.delta // 120 if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+            self.scroll(-3 * notches)
+        return "break"
+
+    def _on_arrow(self, step):
+        """Arrow keys move the selection, scrolling when it reaches the edge."""
+        items = self.tree.get_children()
+        if not items:
+            return "break"
+        selection = self.tree.selection()
+        index = items.index(selection[0]) + step if selection else 0
+        if 0 <= index < len(items):
+            self.tree.selection_set(items[index])
+            self.tree.see(items[index])
+            return "break"
+        before = self.first
+        self.scroll(step)
+        if self.first != before:
+            items = self.tree.get_children()
+            if items:
+                self.tree.selection_set(items[0] if step < 0 else items[-1])
+        return "break"
@@ -0,0 +1,581 @@
+import csv
+import datetime
+import heapq
+import json
+import os
+import sys
+from operator import itemgetter
+
+from expense_columns import LedgerColumns
+from expense_dates import parse_day
+from expense_stats import BYTES_READ, BYTES_WRITTEN, ROWS_SCANNED, stats
+from expense_storage import (
+    FIELDNAMES, CsvStorage, ExpenseStorage, check_fields, file_stamp, id_value, unique_id_rows,
+)
+
+# Partition for rows whose Date doesn't parse
+UNDATED = "undated"
+
+
+def partition_key(date_string):
+    """Partition a row dated date_string belongs in: "YYYY-MM", or UNDATED."""
+    day = parse_day(date_string) if isinstance(date_string, str) else 0
+    if not day:
+        return UNDATED
+    date = datetime.date.fromordinal(day)
+    return f"{date.year:04d}-{date.month:02d}"
+
+
+class PartitionedStorage(ExpenseStorage):
+    """
+    Ledger split into one CSV per calendar month, ledger/YYYY/MM.csv, plus
+    ledger/undated.csv for rows whose date doesn't parse.
+
+    ledger/manifest.json records each partition's row count, date and Id
+    range, amount total and file stamp. Date queries open only partitions
+    whose dates overlap the range, lookups by Id only those whose Id range
+    covers it, and monthly totals are read off the manifest. An append
+    touches only the month it lands in, and a delete or update rewrites
+    only that month, so older partitions stay as they are as the ledger
+    grows. A partition changed outside the app is noticed by its stamp and
+    rescanned on its own.
+
+    Rows come in Id order, or date order when a date bound is given, like
+    the other backends.
+    """
+
+    MANIFEST_VERSION = 1
+    ENTRY_FIELDS = ("rows", "dated", "min_date", "max_date", "min_id", "max_id", "total", "stamp")
+
+    # The partitions already are per-month files
+    monthly_backups = False
+
+    def __init__(self, directory="ledger"):
+        self.directory = directory
+        self.manifest_filename = os.path.join(directory, "manifest.json")
+        # key -> manifest entry (ENTRY_FIELDS); "total" is [sum, count] over dated rows
+        self.partitions = {}
+        self.next_id = 1
+        # key -> LedgerColumns matching the manifest entry's stamp
+        self._cache = {}
+        # Bumped whenever a partition is found changed on disk
+        self._generation = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_manifest()
+
+    # --- Partition files and manifest ---
+
+    def _path(self, key):
+        if key == UNDATED:
+            return os.path.join(self.directory, "undated.csv")
+        year, month = key.split("-")
+        return os.path.join(self.directory, year, f"{month}.csv")
+
+    def _discover(self):
+        """Keys of the partition files on disk."""
+        keys = []
+        if os.path.exists(self._path(UNDATED)):
+            keys.append(UNDATED)
+        for year in os.scandir(self.directory):
+            if not (year.is_dir() and len(year.name) == 4 and year.name.isdigit()):
+                continue
+            for month in os.scandir(year.path):
+                name = month.name
+                if len(name) == 6 and name.endswith(".csv") and name[:2].isdigit() and 1 <= int(name[:2]) <= 12:
+                    keys.append(f"{year.name}-{name[:2]}")
+        return keys
+
+    def _load_manifest(self):
+        """Read the manifest, then reconcile it with the files actually on disk."""
+        try:
+            with open(self.manifest_filename, "r") as f:
+                data = json.load(f)
+            if data.get("version") != self.MANIFEST_VERSION:
+                raise ValueError("unknown manifest version")
+            self.next_id = int(data["next_id"])
+            self.partitions = {}
+            for key, entry in data["partitions"].items():
+                if all(field in entry for field in self.ENTRY_FIELDS) and entry["stamp"]:
+                    self.partitions[key] = {**entry, "stamp": tuple(entry["stamp"])}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # Missing or unreadable: every partition is rescanned below
+            self.partitions, self.next_id = {}, 1
+        for key in self._discover():
+            if key not in self.partitions:
+                self.partitions[key] = {"stamp": None}
+        if self._refresh():
+            return
+        if not os.path.exists(self.manifest_filename):
+            self._save_manifest()
+
+    def _save_manifest(self):
+        data = {
+            "version": self.MANIFEST_VERSION,
+            "next_id": self.next_id,
+            "partitions": {
+                key: {**entry, "stamp": list(entry["stamp"])}
+                for key, entry in sorted(self.partitions.items())
+            },
+        }
+        tmp = self.manifest_filename + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp, self.manifest_filename)
+        except OSError as e:
+            print(f"Error writing partition manifest: {e}")
+
+    def _refresh(self):
+        """Rescan partitions whose file changed since the manifest saw it. True if any did."""
+        changed = False
+        for key in list(self.partitions):
+            stamp = file_stamp(self._path(key))
+            if stamp == self.partitions[key]["stamp"]:
+                continue
+            changed = True
+            if stamp is None:
+                del self.partitions[key]
+                self._cache.pop(key, None)
+            else:
+                self._track(key, *self._read(key))
+        if changed:
+            self._generation += 1
+            self._save_manifest()
+        return changed
+
+    def _read(self, key):
+        """(LedgerColumns, stamp) parsed from a partition file."""
+        path = self._path(key)
+        # Stamp taken before reading: a write racing the read forces a rescan next time
+        stamp = file_stamp(path)
+        with open(path, "r", newline="") as file:
+            columns = LedgerColumns(csv.DictReader(file))
+        stats.add(ROWS_SCANNED, len(columns))
+        stats.add(BYTES_READ, stamp[0] if stamp else 0)
+        return columns, stamp
+
+    def _track(self, key, columns, stamp):
+        """Cache a partition's columns and summarize them into its manifest entry."""
+        days = [d for d in columns.days if d]
+        priced = [a for a, d in zip(columns.amounts, columns.days) if d and a == a]
+        self.partitions[key] = {
+            "rows": len(columns),
+            "dated": len(days),
+            "min_date": datetime.date.fromordinal(min(days)).isoformat() if days else None,
+            "max_date": datetime.date.fromordinal(max(days)).isoformat() if days else None,
+            "min_id": min(columns.ids) if len(columns) else None,
+            "max_id": max(columns.ids) if len(columns) else None,
+            "total": [sum(priced), len(priced)],
+            "stamp": stamp,
+        }
+        self._cache[key] = columns
+        if len(columns):
+            self.next_id = max(self.next_id, columns.max_id() + 1)
+
+    def _account(self, entry, rows):
+        """Add appended rows to a manifest entry without rereading the partition."""
+        for row in rows:
+            exp_id = id_value(row["Id"])
+            entry["rows"] += 1
+            entry["min_id"] = exp_id if entry["min_id"] is None else min(entry["min_id"], exp_id)
+            entry["max_id"] = exp_id if entry["max_id"] is None else max(entry["max_id"], exp_id)
+            day = parse_day(row["Date"]) if isinstance(row["Date"], str) else 0
+            if not day:
+                continue
+            date = datetime.date.fromordinal(day).isoformat()
+            entry["dated"] += 1
+            entry["min_date"] = min(entry["min_date"] or date, date)
+            entry["max_date"] = max(entry["max_date"] or date, date)
+            try:
+                amount = float(row["Amount"])
+            except (TypeError, ValueError):
+                continue
+            if amount == amount:
+                entry["total"][0] += amount
+                entry["total"][1] += 1
+
+    def _columns(self, key):
+        """A partition's rows as LedgerColumns, read on first use."""
+        columns = self._cache.get(key)
+        if columns is None:
+            columns, stamp = self._read(key)
+            if stamp == self.partitions[key]["stamp"]:
+                self._cache[key] = columns
+            else:
+                self._track(key, columns, stamp)
+        return columns
+
+    def _write(self, key, rows):
+        """Rewrite one partition with rows, removing it if there are none."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write aside and swap in, so a crash never leaves a half-written month
+        tmp = path + ".tmp"
+        columns = LedgerColumns()
+        with open(tmp, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                columns.append(row)
+            file.flush()
+            os.fsync(file.fileno())
+            stats.add(BYTES_WRITTEN, file.tell())
+        if not len(columns):
+            os.remove(tmp)
+            self._drop(key)
+            return
+        os.replace(tmp, path)
+        self._track(key, columns, file_stamp(path))
+
+    def _drop(self, key):
+        """Delete a partition file and forget it."""
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+        self.partitions.pop(key, None)
+        self._cache.pop(key, None)
+        if key != UNDATED:
+            try:
+                os.rmdir(os.path.dirname(path))  # Only succeeds once the year is empty
+            except OSError:
+                pass
+
+    def _append(self, key, rows):
+        """Append rows to one partition with one open, one write and one fsync."""
+        path = self._path(key)
+        before = file_stamp(path)
+        if key not in self.partitions and before is not None:
+            self._track(key, *self._read(key))  # File the manifest hadn't seen
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", newline="") as file:
+            start = file.tell()
+            writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+            if not before or before[0] == 0:
+                writer.writeheader()
+            writer.writerows(rows)
+            file.flush()
+            os.fsync(file.fileno())
+            stats.add(BYTES_WRITTEN, file.tell() - start)
+        entry = self.partitions.get(key)
+        if entry is None:
+            entry = self.partitions[key] = {
+                "rows": 0, "dated": 0, "min_date": None, "max_date": None,
+                "min_id": None, "max_id": None, "total": [0.0, 0],
+            }
+            self._cache[key] = LedgerColumns()
+        columns = self._cache.get(key)
+        if columns is not None:
+            columns.extend(rows)
+        self._account(entry, rows)
+        entry["stamp"] = file_stamp(path)
+
+    # --- Pruning ---
+
+    def _runs(self, keys, low, high):
+        """
+        keys ordered by their manifest low..high span and grouped into runs
+        of partitions whose spans overlap; runs never overlap each other, so
+        only partitions within a run need merging.
+        """
+        runs = []
+        end = None
+        for key in sorted(keys, key=lambda k: (self.partitions[k][low], k)):
+            entry = self.partitions[key]
+            if runs and entry[low] <= end:
+                runs[-1].append(key)
+                end = max(end, entry[high])
+            else:
+                runs.append([key])
+                end = entry[high]
+        return runs
+
+    def _dated_keys(self, first, last):
+        """Partitions holding rows dated first..last (day ordinals, inclusive)."""
+        return [
+            key for key, entry in self.partitions.items()
+            if entry["dated"] and parse_day(entry["min_date"]) <= last and parse_day(entry["max_date"]) >= first
+        ]
+
+    def _id_keys(self, expense_id):
+        """Partitions that may hold this Id, lowest Ids first."""
+        target = str(expense_id)
+        try:
+            exp_id = int(target)
+        except ValueError:
+            exp_id = None
+        keys = [
+            key for key, entry in self.partitions.items()
+            if entry["rows"] and (exp_id is None or str(exp_id) != target
+                                  or entry["min_id"] <= exp_id <= entry["max_id"])
+        ]
+        return sorted(keys, key=lambda k: self.partitions[k]["min_id"])
+
+    def _find(self, expense_id):
+        """(key, columns, positions) for every partition holding rows with this Id."""
+        found = []
+        for key in self._id_keys(expense_id):
+            columns = self._columns(key)
+            positions = columns.positions_of(expense_id)
+            if positions:
+                found.append((key, columns, positions))
+        return found
+
+    # --- Queries ---
+
+    def load_all(self):
+        return list(self.iter_rows())
+
+    def is_empty(self):
+        self._refresh()
+        return not any(entry["rows"] for entry in self.partitions.values())
+
+    def get(self, expense_id):
+        self._refresh()
+        found = self._find(expense_id)
+        if not found:
+            return None
+        key, columns, positions = found[0]
+        return columns.row(positions[0])
+
+    def last_id(self):
+        self._refresh()
+        return self.next_id - 1
+
+    def invalidate(self):
+        """Drop every cached partition and re-read the manifest."""
+        self._cache.clear()
+        self._generation += 1
+        self._load_manifest()
+
+    def generation(self):
+        self._refresh()
+        return self._generation
+
+    def warm_up(self):
+        """Reconcile the manifest with the partition files on disk."""
+        self._refresh()
+
+    def month_totals(self):
+        self._refresh()
+        totals = {}
+        for key, entry in self.partitions.items():
+            if not entry["dated"]:
+                continue
+            # A row edited into the wrong month's file would be counted under the
+            # wrong month; leave those ledgers to the row-level totals
+            if key == UNDATED or entry["min_date"][:7] != key or entry["max_date"][:7] != key:
+                return None
+            if entry["total"][1]:
+                totals[(int(key[:4]), int(key[5:]))] = tuple(entry["total"])
+        return dict(sorted(totals.items()))
+
+    def grouped_totals(self):
+        self._refresh()
+        groups = []
+        for key in sorted(self.partitions):
+            groups.extend(self._columns(key).grouped_totals())
+        return groups
+
+    def range_rows(self, start, end):
+        return list(self.iter_rows(start, end))
+
+    def invalid_date_rows(self):
+        self._refresh()
+        rows = []
+        for key, entry in self.partitions.items():
+            if entry["dated"] < entry["rows"]:  # Normally only the undated partition
+                columns = self._columns(key)
+                rows.extend(columns.rows(columns.invalid_date_positions()))
+        return sorted(rows, key=lambda row: id_value(row["Id"]))
+
+    def _positions(self, columns, first, last, types, min_amount):
+        """Matching positions: in date order with a day bound, otherwise in Id order."""
+        positions = columns.select(first, last, types, min_amount)
+        if first is None and last is None:
+            order = columns.id_order()
+            if not isinstance(order, range):
+                keep = set(positions)
+                positions = [p for p in order if p in keep]
+        return positions
+
+    def iter_rows(self, start=None, end=None, types=None, min_amount=None, fields=None,
+                  offset=0, limit=None):
+        # Only overlapping partitions are opened; within each, filters run on the typed columns
+        fields = fields or FIELDNAMES
+        self._refresh()
+        if start or end:
+            first = start.toordinal() if start else 1
+            last = end.toordinal() if end else datetime.date.max.toordinal()
+            runs = self._runs(self._dated_keys(first, last), "min_date", "max_date")
+            order_by = "days"
+        else:
+            first = last = None
+            runs = self._runs([k for k, e in self.partitions.items() if e["rows"]], "min_id", "max_id")
+            order_by = "ids"
+        skip, remaining = offset, limit
+        for run in runs:
+            if remaining is not None and remaining <= 0:
+                return
+            parts = [(columns, self._positions(columns, first, last, types, min_amount))
+                     for columns in map(self._columns, run)]
+            if all(hasattr(positions, "__len__") for _, positions in parts):
+                size = sum(len(positions) for _, positions in parts)
+                if size <= skip:
+                    skip -= size  # Runs before the requested page are skipped unread
+                    continue
+                if len(parts) == 1:
+                    columns, positions = parts[0]
+                    stop = None if remaining is None else skip + remaining
+                    positions = positions[skip:stop]
+                    skip = 0
+                    if remaining is not None:
+                        remaining -= len(positions)
+                    yield from columns.iter_rows(positions, fields)
+                    continue
+            rows = parts[0][0].iter_rows(parts[0][1], fields) if len(parts) == 1 else self._merge(parts, fields, order_by)
+            for row in rows:
+                if skip:
+                    skip -= 1
+                    continue
+                if remaining is not None:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                yield row
+
+    def _merge(self, parts, fields, order_by):
+        """Rows of overlapping partitions interleaved by Id or by day."""
+        streams = []
+        for columns, positions in parts:
+            positions = list(positions)
+            keys = getattr(columns, order_by)
+            streams.append(zip(map(keys.__getitem__, positions), columns.iter_rows(positions, fields)))
+        for _, row in heapq.merge(*streams, key=itemgetter(0)):
+            yield row
+
+    def count_rows(self, start=None, end=None, types=None, min_amount=None):
+        self._refresh()
+        if start or end:
+            first = start.toordinal() if start else 1
+            last = end.toordinal() if end else datetime.date.max.toordinal()
+            keys = self._dated_keys(first, last)
+        else:
+            first = last = None
+            keys = [k for k, e in self.partitions.items() if e["rows"]]
+        count = 0
+        for key in keys:
+            entry = self.partitions[key]
+            if types is None and min_amount is None:
+                # Answered from the manifest when the partition lies wholly inside the range
+                if first is None:
+                    count += entry["rows"]
+                    continue
+                if first <= parse_day(entry["min_date"]) and parse_day(entry["max_date"]) <= last:
+                    count += entry["dated"]
+                    continue
+            positions = self._columns(key).select(first, last, types, min_amount)
+            count += len(positions) if hasattr(positions, "__len__") else sum(1 for _ in positions)
+        return count
+
+    # --- Writes ---
+
+    def append(self, row):
+        return self.append_many([row])[0]
+
+    def append_many(self, rows):
+        """Append rows under a contiguous block of new Ids, opening each month once."""
+        self._refresh()
+        first_id = self.next_id
+        rows = [{**row, "Id": first_id + i} for i, row in enumerate(rows)]
+        by_key = {}
+        for row in rows:
+            by_key.setdefault(partition_key(row["Date"]), []).append(row)
+        for key, group in by_key.items():
+            self._append(key, group)
+        self.next_id = max(self.next_id, first_id + len(rows))
+        self._save_manifest()
+        return [row["Id"] for row in rows]
+
+    def delete(self, expense_id):
+        self._refresh()
+        removed = []
+        for key, columns, positions in self._find(expense_id):
+            gone = set(positions)
+            removed.extend(columns.rows(positions))
+            self._write(key, [row for p, row in enumerate(columns.rows()) if p not in gone])
+        if removed:
+            self._save_manifest()
+        return removed
+
+    def update(self, expense_id, new_data):
+        check_fields(new_data)
+        self._refresh()
+        found = self._find(expense_id)
+        if not found:
+            return None
+        key, columns, positions = found[0]
+        pos = positions[0]
+        old = columns.row(pos)
+        row = {**old, **{k: str(v) for k, v in new_data.items()}}
+        rows = columns.rows()
+        new_key = partition_key(row["Date"])
+        if new_key == key:
+            rows[pos] = row
+            if row["Id"] != old["Id"]:
+                rows.sort(key=lambda r: id_value(r["Id"]))
+            self._write(key, rows)
+        else:
+            # Moved to another month: out of this partition, into that one in Id order
+            del rows[pos]
+            self._write(key, rows)
+            target = self._columns(new_key).rows() if new_key in self.partitions else []
+            target.append(row)
+            target.sort(key=lambda r: id_value(r["Id"]))
+            self._write(new_key, target)
+        self._save_manifest()
+        return old, row
+
+    def replace_all(self, rows):
+        """Rewrite every partition from rows (keeping their Ids) and drop the rest."""
+        groups = {}
+        for row in rows:
+            groups.setdefault(partition_key(row["Date"]), []).append(row)
+        for key in list(self.partitions):
+            if key not in groups:
+                self._drop(key)
+        for key, group in groups.items():
+            group.sort(key=lambda r: id_value(r["Id"]))
+            self._write(key, group)
+        self._save_manifest()
+
+
+def convert_csv_to_partitions(csv_filename="all_expenses.csv", directory="ledger"):
+    """
+    One-shot copy of a CSV ledger into a new partitioned ledger directory.
+    Rows whose Id is not a unique integer get a fresh Id after the existing ones.
+    Returns (success, message).
+    """
+    if not os.path.exists(csv_filename):
+        return False, f"{csv_filename} not found"
+    if os.path.exists(directory) and os.listdir(directory):
+        return False, f"{directory} already exists"
+
+    kept, renumbered = unique_id_rows(CsvStorage(csv_filename).load_all())
+    try:
+        target = PartitionedStorage(directory)
+        target.replace_all(kept)
+        target.close()
+    except (OSError, ValueError) as e:
+        return False, f"Error converting: {str(e)}"
+    msg = f"Converted {len(kept)} expenses into {len(target.partitions)} partitions in {directory}"
+    if renumbered:
+        msg += f" ({renumbered} given new Ids)"
+    return True, msg
+
+
+if __name__ == "__main__":
+    # python expense_partitions.py [all_expenses.csv] [ledger]
+    success, msg = convert_csv_to_partitions(*sys.argv[1:3])
+    print(msg)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,98 @@
+import csv
+import heapq
+import itertools
+import os
+
+# How many bytes of rows external_sort keeps in memory by default
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+# Rough size of a row dict and its strings beyond the characters themselves
+ROW_OVERHEAD = 400
+# Most runs merged at once; more are merged in passes to stay under the open file limit
+MAX_OPEN_RUNS = 128
+
+
+def _row_size(row):
+    return ROW_OVERHEAD + sum(len(str(v)) for v in row.values())
+
+
+def date_key(row):
+    """Sort key for rows without Ids (imports, legacy files): the date text."""
+    return str(row.get("Date", "")).strip()
+
+
+def date_order(row):
+    """Sort key for ledger rows: date text, then Id as a number."""
+    try:
+        exp_id = int(row["Id"])
+    except (TypeError, ValueError):
+        exp_id = -1
+    return str(row["Date"]).strip(), exp_id
+
+
+def _spill(rows, fieldnames, spill_dir, number):
+    """Write already sorted rows to a numbered run file and return its path."""
+    path = os.path.join(spill_dir, f"run{number:06d}.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def _merge_files(paths, key):
+    """heapq.merge over run files; yields rows and closes the files when done."""
+    files = [open(path, "r", newline="") for path in paths]
+    try:
+        yield from heapq.merge(*(csv.DictReader(f) for f in files), key=key)
+    finally:
+        for f in files:
+            f.close()
+
+
+def external_sort(rows, key, fieldnames, memory_budget=None, directory=None):
+    """
+    Yield rows sorted by key while holding only about memory_budget bytes
+    of them (default DEFAULT_MEMORY_BUDGET). Rows are gathered until the
+    budget is used up, sorted and spilled as a CSV run to a temporary
+    directory (inside directory if given); the runs are then merged with
+    heapq.merge. Input that fits the budget is sorted in memory and never
+    touches disk. The sort is stable. Only fieldnames survive a spill and
+    they come back as strings, so key must accept string values.
+    """
+    budget = memory_budget or DEFAULT_MEMORY_BUDGET
+    batch, size = [], 0
+    runs = []
+    numbers = itertools.count()
+    spill_dir = None
+    try:
+        for row in rows:
+            batch.append(row)
+            size += _row_size(row)
+            if size >= budget:
+                if spill_dir is None:
+                    # Imported on first spill; most sorts fit in memory
+                    import shutil
+                    import tempfile
+
+                    spill_dir = tempfile.mkdtemp(prefix="expense-sort-", dir=directory)
+                batch.sort(key=key)
+                runs.append(_spill(batch, fieldnames, spill_dir, next(numbers)))
+                batch, size = [], 0
+        batch.sort(key=key)
+        if not runs:
+            yield from batch
+            return
+        if batch:
+            runs.append(_spill(batch, fieldnames, spill_dir, next(numbers)))
+            batch = []
+        # Merge the oldest runs into one until the rest can be opened together;
+        # runs stay in input order, which keeps the sort stable
+        while len(runs) > MAX_OPEN_RUNS:
+            merged = _spill(_merge_files(runs[:MAX_OPEN_RUNS], key), fieldnames, spill_dir, next(numbers))
+            for path in runs[:MAX_OPEN_RUNS]:
+                os.remove(path)
+            runs = [merged] + runs[MAX_OPEN_RUNS:]
+        yield from _merge_files(runs, key)
+    finally:
+        if spill_dir is not None:
+            shutil.rmtree(spill_dir, ignore_errors=True)
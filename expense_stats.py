@@ -0,0 +1,184 @@
+import functools
+import os
+import threading
+import time
+import types
+
+# Counters that storage and logic code feed with stats.add()
+ROWS_SCANNED = "rows_scanned"
+BYTES_READ = "bytes_read"
+BYTES_WRITTEN = "bytes_written"
+COUNTERS = (ROWS_SCANNED, BYTES_READ, BYTES_WRITTEN)
+
+
+class Stats:
+    """
+    Opt-in call counts, wall time and I/O counters for the app's hot paths.
+    Classes register the methods to watch with watch(); enable() swaps in
+    timing wrappers and disable() puts the originals back, so with stats off
+    the methods run exactly as written. Storage code reports rows scanned and
+    bytes read/written with add(), which returns at once when disabled.
+    Counters are charged to every watched call running on that thread, so
+    like the wall times they are inclusive of nested calls.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # (cls, method names, label prefix) to instrument on enable()
+        self._watched = []
+        # (cls, name) -> original attribute while wrappers are installed
+        self._originals = {}
+        self.reset()
+
+    def reset(self):
+        """Zero every counter."""
+        with self._lock:
+            # name -> {"calls", "total_s", "max_s", plus COUNTERS}
+            self.methods = {}
+            self.totals = dict.fromkeys(COUNTERS, 0)
+            self.started = time.time()
+
+    def watch(self, cls, names=None, prefix=None):
+        """Instrument cls.names (default: its public methods) whenever stats are enabled."""
+        if names is None:
+            names = [n for n, v in vars(cls).items() if not n.startswith("_") and isinstance(v, types.FunctionType)]
+        self._watched.append((cls, list(names), prefix or cls.__name__))
+        if self.enabled:
+            self._install(cls, names, prefix or cls.__name__)
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        for cls, names, prefix in self._watched:
+            self._install(cls, names, prefix)
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        self._originals.clear()
+
+    def add(self, counter, amount):
+        """Add amount to a counter (ROWS_SCANNED, BYTES_READ or BYTES_WRITTEN)."""
+        if not self.enabled or not amount:
+            return
+        stack = self._stack()
+        with self._lock:
+            self.totals[counter] += amount
+            for name in set(stack):
+                self._entry(name)[counter] += amount
+
+    def snapshot(self):
+        """Plain-dict copy of every counter, slowest methods first."""
+        with self._lock:
+            methods = {
+                name: {**entry, "mean_ms": entry["total_s"] * 1000 / entry["calls"] if entry["calls"] else 0.0}
+                for name, entry in sorted(self.methods.items(), key=lambda kv: -kv[1]["total_s"])
+            }
+            return {
+                "enabled": self.enabled,
+                "since": self.started,
+                "seconds": time.time() - self.started,
+                "totals": dict(self.totals),
+                "methods": methods,
+            }
+
+    def export_json(self, filename):
+        """Write snapshot() to filename. Returns (success, message)."""
+        import json
+
+        try:
+            tmp = filename + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(tmp, filename)
+            return True, f"Statistics exported to {filename}"
+        except (OSError, TypeError) as e:
+            return False, f"Error exporting statistics: {str(e)}"
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _entry(self, name):
+        entry = self.methods.get(name)
+        if entry is None:
+            entry = self.methods[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0, **dict.fromkeys(COUNTERS, 0)}
+        return entry
+
+    def record(self, name, seconds):
+        """Count one call of name taking seconds, for timings the wrappers can't see."""
+        if not self.enabled:
+            return
+        self._record(name, seconds)
+
+    def _record(self, name, seconds):
+        with self._lock:
+            entry = self._entry(name)
+            entry["calls"] += 1
+            entry["total_s"] += seconds
+            if seconds > entry["max_s"]:
+                entry["max_s"] = seconds
+
+    def _install(self, cls, names, prefix):
+        for name in names:
+            if (cls, name) in self._originals:
+                continue
+            original = vars(cls).get(name)
+            if not isinstance(original, types.FunctionType):
+                continue
+            self._originals[(cls, name)] = original
+            setattr(cls, name, self._wrap(f"{prefix}.{name}", original))
+
+    def _wrap(self, name, fn):
+        stats = self
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            stack = stats._stack()
+            stack.append(name)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                stats._record(name, time.perf_counter() - start)
+                raise
+            finally:
+                stack.pop()
+            if isinstance(result, types.GeneratorType):
+                # Streaming calls do their work as they are consumed
+                return stats._timed_iter(name, result, time.perf_counter() - start)
+            stats._record(name, time.perf_counter() - start)
+            return result
+
+        return timed
+
+    def _timed_iter(self, name, iterator, elapsed):
+        stack = self._stack()
+        try:
+            while True:
+                stack.append(name)
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+                    stack.pop()
+                yield item
+        finally:
+            self._record(name, elapsed)
+
+
+# The app's one set of counters
+stats = Stats()
+if os.environ.get("EXPENSE_STATS") == "1":
+    stats.enable()
@@ -0,0 +1,902 @@
+import csv
+import io
+import itertools
+import os
+import sys
+import datetime
+import sqlite3
+from array import array
+
+from expense_columns import LedgerColumns
+from expense_dates import parse_day
+from expense_offsets import ENCODING, OffsetIndex
+from expense_sort import date_order, external_sort
+from expense_stats import BYTES_READ, BYTES_WRITTEN, ROWS_SCANNED, stats
+
+FIELDNAMES = ["Id", "Description", "Expense_Type", "Amount", "Date"]
+
+
+def file_stamp(filename):
+    """Return a (size, mtime, inode) stamp for a file, or None if missing."""
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def id_value(value):
+    """Integer Id as LedgerColumns stores it: -1 if it doesn't parse."""
+    try:
+        return int(str(value))
+    except ValueError:
+        return -1
+
+
+def check_fields(new_data):
+    """Raise ValueError, as csv.DictWriter would, if new_data has keys outside FIELDNAMES."""
+    unknown = [k for k in new_data if k not in FIELDNAMES]
+    if unknown:
+        raise ValueError("dict contains fields not in fieldnames: " + ", ".join(repr(k) for k in unknown))
+
+
+class ExpenseStorage:
+    """
+    Storage interface used by ExpenseLogic.
+    Rows are dicts keyed by FIELDNAMES with string values, as csv.DictReader
+    yields them. Query methods have pure-Python defaults built on load_all();
+    backends override them when they can answer more cheaply.
+    """
+
+    # Whether ExpenseLogic also copies saved rows into <Month>.csv backups
+    monthly_backups = True
+
+    def load_all(self):
+        """Return every stored row."""
+        raise NotImplementedError
+
+    def get(self, expense_id):
+        """The row with this Id, or None."""
+        target = str(expense_id)
+        for row in self.load_all():
+            if str(row["Id"]) == target:
+                return row
+        return None
+
+    def append(self, row):
+        """Store a new row, assigning its Id. Returns the new Id."""
+        raise NotImplementedError
+
+    def append_many(self, rows):
+        """Store rows under a contiguous block of new Ids. Returns the Ids."""
+        return [self.append(row) for row in rows]
+
+    def delete(self, expense_id):
+        """Delete rows by Id. Returns the removed rows (empty if none matched)."""
+        raise NotImplementedError
+
+    def update(self, expense_id, new_data):
+        """Update fields of a row by Id. Returns (old_row, new_row), or None if not found."""
+        raise NotImplementedError
+
+    def replace_all(self, rows):
+        """Replace the whole ledger with rows, keeping their Ids."""
+        raise NotImplementedError
+
+    def is_empty(self):
+        """True if the ledger holds no expenses yet."""
+        return not self.load_all()
+
+    def last_id(self):
+        """Highest Id handed out so far, deleted rows included (0 if none)."""
+        ids = []
+        for row in self.iter_rows(fields=["Id"]):
+            try:
+                ids.append(int(row["Id"]))
+            except (TypeError, ValueError):
+                continue
+        return max(ids, default=0)
+
+    def invalidate(self):
+        """Drop any cached state so the next read goes to disk."""
+
+    def generation(self):
+        """
+        A value that changes whenever the data changed other than through
+        this object, so derived state (aggregates, indexes) knows to rebuild.
+        """
+        return 0
+
+    def close(self):
+        """Release any open handles."""
+
+    def warm_up(self):
+        """Load caches and indexes now rather than on the first query."""
+
+    def range_rows(self, start, end):
+        """Rows dated from start to end (datetime.date, inclusive), in date order."""
+        first, last = start.toordinal(), end.toordinal()
+        matched = []
+        for row in self.load_all():
+            day = parse_day(row["Date"])
+            if day and first <= day <= last:
+                matched.append((day, row))
+        matched.sort(key=lambda item: item[0])
+        return [row for day, row in matched]
+
+    def invalid_date_rows(self):
+        """Rows whose Date isn't a valid YYYY-MM-DD date (left out of date queries)."""
+        return [row for row in self.load_all() if not parse_day(row["Date"])]
+
+    def iter_rows(self, start=None, end=None, types=None, min_amount=None, fields=None,
+                  offset=0, limit=None):
+        """
+        Lazily yield rows matching every given filter, holding only fields
+        (default FIELDNAMES). start/end are inclusive datetime.date bounds;
+        when either is given rows come in date order and rows with invalid
+        dates are skipped. types is a set of categories, min_amount a float.
+        offset and limit select one page of the matches.
+        """
+        fields = fields or FIELDNAMES
+        if start or end:
+            rows = self.range_rows(start or datetime.date.min, end or datetime.date.max)
+        else:
+            rows = self.load_all()
+        matched = (row for row in rows if self._matches(row, types, min_amount))
+        stop = None if limit is None else offset + limit
+        for row in itertools.islice(matched, offset, stop):
+            yield {f: row[f] for f in fields}
+
+    def _matches(self, row, types, min_amount):
+        if types is not None and row["Expense_Type"] not in types:
+            return False
+        if min_amount is not None:
+            try:
+                return float(row["Amount"]) >= min_amount
+            except (TypeError, ValueError):
+                return False
+        return True
+
+    def count_rows(self, start=None, end=None, types=None, min_amount=None):
+        """Number of rows iter_rows() would yield for the same filters."""
+        return sum(1 for _ in self.iter_rows(start, end, types, min_amount, fields=["Id"]))
+
+    def month_totals(self):
+        """
+        {(year, month): (amount_sum, count)} for every month, oldest first,
+        if the backend keeps them without reading rows; None otherwise.
+        """
+        return None
+
+    def grouped_totals(self):
+        """(date, expense_type, amount_sum, count) for every date/category pair."""
+        groups = {}
+        for row in self.load_all():
+            try:
+                amount = float(row["Amount"])
+            except (TypeError, ValueError):
+                continue
+            key = (row["Date"], row["Expense_Type"])
+            bucket = groups.get(key)
+            if bucket is None:
+                groups[key] = [amount, 1]
+            else:
+                bucket[0] += amount
+                bucket[1] += 1
+        return [(date, etype, total, count) for (date, etype), (total, count) in groups.items()]
+
+
+class CsvStorage(ExpenseStorage):
+    """
+    The original all_expenses.csv ledger.
+    Parsed rows are cached until the file's (size, mtime, inode) stamp changes,
+    and the next free Id is kept in a .seq sidecar next to the file.
+
+    With use_journal, deletes and updates are appended to a .journal file as
+    tombstone (D) or patch (U) records instead of rewriting the ledger.
+    Readers replay the journal on load, and it is folded back into the base
+    file once it grows past journal_min_bytes and journal_max_ratio of the base.
+
+    An .idx sidecar maps Ids to byte offsets in the base file (see
+    expense_offsets.OffsetIndex): get() reads single rows through it, and
+    update() overwrites a row in place when its new text is the same length.
+    """
+
+    JOURNAL_FIELDS = ["Op"] + FIELDNAMES
+
+    def __init__(self, filename="all_expenses.csv", use_journal=True,
+                 journal_min_bytes=64 * 1024, journal_max_ratio=0.25):
+        self.filename = filename
+        self.journal_filename = os.path.splitext(filename)[0] + ".journal"
+        self._offsets = OffsetIndex(filename, os.path.splitext(filename)[0] + ".idx")
+        # Ids the journal has records for, as of the journal stamp alongside
+        self._journal_ids = set()
+        self._journal_ids_stamp = None
+        self.use_journal = use_journal
+        self.journal_min_bytes = journal_min_bytes
+        self.journal_max_ratio = journal_max_ratio
+        # Columnar copy of the ledger plus the (base, journal) stamps it was
+        # read at. Row dicts are only built when asked for, and then shared,
+        # so treat them as read-only.
+        self._columns = None
+        self._rows = None
+        self._cache_stamp = None
+        # Bumped each time rows are (re)read from disk rather than edited by us
+        self._generation = 0
+        self.ensure_exists()
+
+    def ensure_exists(self):
+        """Create the file with a header if it doesn't exist."""
+        if not os.path.exists(self.filename):
+            with open(self.filename, "w", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+                writer.writeheader()
+
+    def is_empty(self):
+        """Assume populated if > 50 bytes (header is ~45)."""
+        return not (os.path.exists(self.filename) and os.path.getsize(self.filename) > 50)
+
+    def _stamp(self):
+        return (file_stamp(self.filename), file_stamp(self.journal_filename))
+
+    def columns(self):
+        """Cached LedgerColumns, re-reading only if the file or journal changed on disk."""
+        stamp = self._stamp()
+        if stamp[0] is None:
+            self.invalidate()
+            return LedgerColumns()
+        if self._columns is not None and stamp == self._cache_stamp:
+            return self._columns
+        try:
+            with open(self.filename, "r", newline="") as file:
+                rows = csv.DictReader(file)
+                if stamp[1] is not None:
+                    rows = self._apply_journal(rows, self._read_journal())
+                columns = LedgerColumns(rows)
+        except Exception as e:
+            print(f"Error loading expenses: {e}")
+            return LedgerColumns()
+        # Stamp taken before reading: a write racing the read forces a reload next time.
+        self._columns, self._rows, self._cache_stamp = columns, None, stamp
+        stats.add(ROWS_SCANNED, len(columns))
+        stats.add(BYTES_READ, stamp[0][0])
+        self._generation += 1
+        return columns
+
+    def load_all(self):
+        """Return all rows, built from the cached columns on first use."""
+        columns = self.columns()
+        if self._rows is None or self._columns is not columns:
+            rows = columns.rows()
+            if self._columns is not columns:
+                return rows  # Load failed or file missing; nothing to cache
+            self._rows = rows
+        return self._rows
+
+    def invalidate(self):
+        """Force the next read to re-parse the file."""
+        self._columns, self._rows, self._cache_stamp = None, None, None
+
+    def close(self):
+        self._offsets.save()
+
+    def warm_up(self):
+        """Parse the ledger into the column cache and load or build the offset index."""
+        self.columns()
+        self._offset_index()
+
+    def get(self, expense_id):
+        """One row by Id: from the cache if it is current, else read through the offset index."""
+        key = str(expense_id)
+        if self._columns is not None and self._cache_stamp == self._stamp():
+            positions = self._columns.positions_of(key)
+            return self._columns.row(positions[0]) if positions else None
+        index = self._offset_index()
+        if index is not None and key not in self._journaled_ids():
+            i = index.find(key)
+            if i is not None:
+                row = index.read(i)
+                return {k: row.get(k) or "" for k in FIELDNAMES}
+            if index.covers(key):
+                return None
+        return super().get(expense_id)
+
+    def _offset_index(self):
+        """The offset index for the base file as it is now, loaded or rebuilt as needed."""
+        stamp = file_stamp(self.filename)
+        if stamp is None:
+            return None
+        index = self._offsets
+        if index.stamp != stamp:
+            try:
+                if not index.load(stamp):
+                    index.build(stamp)
+                    index.save()
+            except (OSError, ValueError) as e:
+                print(f"Error indexing expenses: {e}")
+                return None
+        return index
+
+    def _restamp(self, before):
+        """Carry the offset index and Id sequence across our own write to the base file."""
+        after = file_stamp(self.filename)
+        if self._offsets.stamp == before:
+            self._offsets.stamp = after
+            self._offsets.dirty = True
+        seq = self._read_seq()
+        if seq is not None and seq[1] == before:
+            self._store_seq(seq[0])
+
+    def _journaled_ids(self):
+        """Ids with a journal record; their rows in the base file are stale."""
+        stamp = file_stamp(self.journal_filename)
+        if stamp is None:
+            return ()
+        if stamp != self._journal_ids_stamp:
+            self._journal_ids = {rec["Id"] for rec in self._read_journal()}
+            self._journal_ids_stamp = stamp
+        return self._journal_ids
+
+    def _patch_in_place(self, row):
+        """
+        Overwrite row's line in the base file if its new text is exactly as
+        long as the old, so every other offset stays valid. False otherwise.
+        """
+        if row["Id"] in self._journaled_ids():
+            return False  # Replaying the journal would undo the patch
+        index = self._offset_index()
+        i = index.find(row["Id"]) if index is not None else None
+        if i is None:
+            return False
+        offset, length = index.span(i)
+        line = index.encode(row, i)
+        if len(line) != length:
+            return False
+        before = index.stamp
+        with open(self.filename, "r+b") as file:
+            file.seek(offset)
+            file.write(line)
+            file.flush()
+            os.fsync(file.fileno())
+        stats.add(BYTES_WRITTEN, len(line))
+        self._restamp(before)
+        return True
+
+    def generation(self):
+        self.columns()
+        return self._generation
+
+    def last_id(self):
+        return self._next_id() - 1
+
+    def _after_write(self):
+        """Record that the file/journal now match our in-memory columns."""
+        self._cache_stamp = self._stamp()
+
+    def append(self, row):
+        """Append one row to the end of the file."""
+        return self.append_many([row])[0]
+
+    def append_many(self, rows):
+        """Append rows with one open, one write and one fsync."""
+        # Bring the cache up to date before appending to it below
+        columns = self.columns()
+        first_id = self._next_id()
+        rows = [{**row, "Id": first_id + i} for i, row in enumerate(rows)]
+        # Encode row by row so the offset index learns where each one lands
+        before = file_stamp(self.filename)
+        buffer = io.StringIO(newline="")
+        writer = csv.DictWriter(buffer, fieldnames=FIELDNAMES)
+        header = b""
+        if not before or before[0] == 0:
+            writer.writeheader()
+            header = buffer.getvalue().encode(ENCODING)
+        lines = []
+        for row in rows:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            lines.append(buffer.getvalue().encode(ENCODING))
+        data = header + b"".join(lines)
+        with open(self.filename, "ab") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        stats.add(BYTES_WRITTEN, len(data))
+        if not header and self._offsets.stamp == before:
+            self._offsets.extend([row["Id"] for row in rows], [len(line) for line in lines],
+                                 file_stamp(self.filename))
+        # Keep the cache and sequence in step with our own append
+        if columns is self._columns:
+            start = len(columns)
+            columns.extend(rows)
+            if self._rows is not None:
+                self._rows.extend(columns.rows(range(start, len(columns))))
+        self._after_write()
+        self._store_seq(first_id + len(rows))
+        return [row["Id"] for row in rows]
+
+    def delete(self, expense_id):
+        columns = self.columns()
+        positions = columns.positions_of(expense_id)
+        if not positions:
+            return []
+        removed = columns.rows(positions)
+        if not self.use_journal:
+            remaining = set(positions)
+            self.replace_all(r for p, r in enumerate(columns.rows()) if p not in remaining)
+            return removed
+        self._append_journal({"Op": "D", "Id": removed[0]["Id"]})
+        columns.delete(positions)
+        self._rows = None
+        self._after_write()
+        self._maybe_compact()
+        return removed
+
+    def update(self, expense_id, new_data):
+        # Checked up front: the in-place patch would silently drop unknown keys
+        check_fields(new_data)
+        columns = self.columns()
+        positions = columns.positions_of(expense_id)
+        if not positions:
+            return None
+        pos = positions[0]
+        old = columns.row(pos)
+        row = {**old, **{k: str(v) for k, v in new_data.items()}}
+        if row["Id"] == old["Id"] and len(positions) == 1 and self._patch_in_place(row):
+            columns.set_row(pos, row)
+            self._rows = None
+            self._after_write()
+            return old, row
+        # Patches are keyed by Id, so an Id change, or an Id shared by several
+        # rows (a patch would overwrite all of them), still needs a full rewrite
+        if not self.use_journal or row["Id"] != old["Id"] or len(positions) > 1:
+            rows = columns.rows()
+            rows[pos] = row
+            self.replace_all(rows)
+            return old, row
+        # A patch record carries the whole new row
+        self._append_journal({"Op": "U", **row})
+        columns.set_row(pos, row)
+        self._rows = None
+        self._after_write()
+        self._maybe_compact()
+        return old, row
+
+    def range_rows(self, start, end):
+        columns = self.columns()
+        return columns.rows(columns.range_positions(start.toordinal(), end.toordinal()))
+
+    def grouped_totals(self):
+        return self.columns().grouped_totals()
+
+    def invalid_date_rows(self):
+        columns = self.columns()
+        return columns.rows(columns.invalid_date_positions())
+
+    def _positions(self, columns, start, end, types, min_amount):
+        return columns.select(
+            start.toordinal() if start else None,
+            end.toordinal() if end else None,
+            types, min_amount)
+
+    def iter_rows(self, start=None, end=None, types=None, min_amount=None, fields=None,
+                  offset=0, limit=None):
+        # Filters run on the typed columns; dicts are built only for matches
+        columns = self.columns()
+        positions = self._positions(columns, start, end, types, min_amount)
+        if offset or limit is not None:
+            stop = None if limit is None else offset + limit
+            if isinstance(positions, (range, array)):
+                positions = positions[offset:stop]  # Unfiltered or date-only: slice directly
+            else:
+                positions = itertools.islice(positions, offset, stop)
+        return columns.iter_rows(positions, fields or FIELDNAMES)
+
+    def count_rows(self, start=None, end=None, types=None, min_amount=None):
+        positions = self._positions(self.columns(), start, end, types, min_amount)
+        if isinstance(positions, (range, array)):
+            return len(positions)
+        return sum(1 for _ in positions)
+
+    def replace_all(self, rows):
+        """Rewrite entire CSV file with new data, then drop the journal it supersedes."""
+        next_id = self._next_id()
+        # Write aside and swap in, so a crash never leaves a half-written ledger
+        tmp = self.filename + ".tmp"
+        columns = LedgerColumns()
+        with open(tmp, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            # rows may be a one-shot iterable, so build the new columns as we write
+            for row in rows:
+                writer.writerow(row)
+                columns.append(row)
+            file.flush()
+            os.fsync(file.fileno())
+            stats.add(BYTES_WRITTEN, file.tell())
+        os.replace(tmp, self.filename)
+        # Replaying a leftover journal over the new base is harmless: tombstones
+        # and patches are idempotent, and _next_id counts journaled Ids, so no
+        # new row can take the Id of a leftover tombstone.
+        if os.path.exists(self.journal_filename):
+            os.remove(self.journal_filename)
+        self._columns, self._rows = columns, None
+        self._after_write()
+        # Never hand out an Id again, even if its row was deleted
+        self._store_seq(max(next_id, columns.max_id() + 1))
+
+    def _append_journal(self, record):
+        """Durably append one tombstone/patch record."""
+        new_file = not os.path.exists(self.journal_filename)
+        known = not new_file and self._journal_ids_stamp == file_stamp(self.journal_filename)
+        with open(self.journal_filename, "a", newline="") as f:
+            start = f.tell()
+            writer = csv.DictWriter(f, fieldnames=self.JOURNAL_FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerow(record)
+            f.flush()
+            os.fsync(f.fileno())
+            stats.add(BYTES_WRITTEN, f.tell() - start)
+        if new_file or known:
+            if new_file:
+                self._journal_ids = set()
+            self._journal_ids.add(str(record["Id"]))
+            self._journal_ids_stamp = file_stamp(self.journal_filename)
+
+    def _read_journal(self):
+        """Journal records, ignoring a torn last line left by a crash."""
+        with open(self.journal_filename, "r", newline="") as f:
+            text = f.read()
+        stats.add(BYTES_READ, len(text))
+        if not text.endswith("\n"):
+            text = text[:text.rfind("\n") + 1]
+        return list(csv.DictReader(io.StringIO(text)))
+
+    def _apply_journal(self, rows, records):
+        """Replay tombstones and patches over the base rows."""
+        deleted = set()
+        patched = {}
+        for rec in records:
+            exp_id = rec["Id"]
+            if rec["Op"] == "D":
+                deleted.add(exp_id)
+                patched.pop(exp_id, None)
+            elif rec["Op"] == "U":
+                patched[exp_id] = {k: rec[k] for k in FIELDNAMES}
+        if not deleted and not patched:
+            return rows
+        return (patched.get(row["Id"], row) for row in rows if row["Id"] not in deleted)
+
+    def _maybe_compact(self):
+        """Fold the journal into the base file once it is large enough."""
+        journal_size = os.path.getsize(self.journal_filename)
+        base_size = os.path.getsize(self.filename)
+        if journal_size >= self.journal_min_bytes and journal_size >= self.journal_max_ratio * base_size:
+            self.compact()
+
+    def compact(self, by_date=False, memory_budget=None):
+        """
+        Rewrite the base file with the journal applied and remove the journal.
+        by_date=True rewrites it in date order (Ids kept) even without a
+        journal, sorting on disk within memory_budget bytes.
+        """
+        if not by_date and not os.path.exists(self.journal_filename):
+            return
+        columns = self.columns()
+        rows = columns.iter_rows(range(len(columns)), FIELDNAMES)
+        if by_date:
+            rows = external_sort(rows, date_order, FIELDNAMES, memory_budget)
+        self.replace_all(rows)
+
+    def _seq_filename(self):
+        """Sidecar holding the next free Id, e.g. all_expenses.seq."""
+        return os.path.splitext(self.filename)[0] + ".seq"
+
+    def _read_seq(self):
+        """Return (next_id, file_stamp) from the sidecar, or None if unusable."""
+        try:
+            with open(self._seq_filename(), "r") as f:
+                parts = f.read().split()
+            return int(parts[0]), tuple(int(p) for p in parts[1:4])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _store_seq(self, next_id):
+        """Persist next_id together with the file's current stamp."""
+        stamp = file_stamp(self.filename)
+        if stamp is None:
+            return
+        tmp = self._seq_filename() + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                f.write(f"{next_id} {stamp[0]} {stamp[1]} {stamp[2]}\n")
+            os.replace(tmp, self._seq_filename())
+        except OSError as e:
+            print(f"Error writing Id sequence: {e}")
+
+    def _next_id(self):
+        """
+        Next free Id in O(1) from the sequence sidecar.
+        If the sidecar is missing, or the file was changed without it, recover
+        from the highest parseable Id in the ledger or the journal. The journal
+        counts because the ledger columns have its tombstones applied: reusing
+        a deleted Id would let the next replay delete the new row too.
+        """
+        seq = self._read_seq()
+        if seq is not None and seq[1] == file_stamp(self.filename):
+            return seq[0]
+        journaled = (id_value(exp_id) for exp_id in self._journaled_ids())
+        next_id = max(self.columns().max_id(), max(journaled, default=0)) + 1
+        if seq is not None:
+            next_id = max(next_id, seq[0])
+        # Remember it, so the next start doesn't parse the ledger again
+        self._store_seq(next_id)
+        return next_id
+
+
+class SqliteStorage(ExpenseStorage):
+    """
+    Ledger kept in an SQLite database (standard-library sqlite3).
+    Month filters and group-bys run as SQL over indexed columns, and
+    deletes/updates are single statements instead of file rewrites.
+    """
+
+    # Only strings shaped like YYYY-MM-DD take part in month queries,
+    # mirroring the strptime filter of the CSV backend.
+    DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+
+    def __init__(self, filename="expenses.db"):
+        self.filename = filename
+        # The GUI may call in from a worker thread; access is serialized by the caller.
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.ensure_schema()
+
+    def ensure_schema(self):
+        """Create the table and indexes if they don't exist."""
+        # AUTOINCREMENT keeps deleted Ids from being reused, like the CSV .seq file.
+        # Id is the rowid, so it is already indexed by the primary key.
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS expenses (
+                Id INTEGER PRIMARY KEY AUTOINCREMENT,
+                Description TEXT NOT NULL,
+                Expense_Type TEXT NOT NULL,
+                Amount REAL NOT NULL,
+                Date TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(Date);
+            CREATE INDEX IF NOT EXISTS idx_expenses_type ON expenses(Expense_Type);
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _to_row(self, record):
+        """Convert a result tuple to the string dict shape CSV rows have."""
+        exp_id, desc, etype, amount, date = record
+        return {
+            "Id": str(exp_id),
+            "Description": desc,
+            "Expense_Type": etype,
+            "Amount": f"{amount:.2f}",
+            "Date": date,
+        }
+
+    def _select(self, where="", params=(), order="Id"):
+        sql = f"SELECT Id, Description, Expense_Type, Amount, Date FROM expenses {where} ORDER BY {order}"
+        rows = [self._to_row(r) for r in self.conn.execute(sql, params)]
+        stats.add(ROWS_SCANNED, len(rows))
+        return rows
+
+    def load_all(self):
+        return self._select()
+
+    def get(self, expense_id):
+        exp_id = self._id_param(expense_id)
+        rows = self._select("WHERE Id = ?", (exp_id,)) if exp_id is not None else []
+        return rows[0] if rows else None
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM expenses LIMIT 1").fetchone() is None
+
+    def append(self, row):
+        cur = self.conn.execute(
+            "INSERT INTO expenses (Description, Expense_Type, Amount, Date) VALUES (?, ?, ?, ?)",
+            (row["Description"], row["Expense_Type"], float(row["Amount"]), row["Date"]),
+        )
+        self.conn.commit()
+        return cur.lastrowid
+
+    def append_many(self, rows):
+        """Insert rows in one transaction under a contiguous block of Ids."""
+        with self.conn:
+            # Take the write lock before reading the sequence so the block stays ours
+            self.conn.execute("BEGIN IMMEDIATE")
+            seq = self.last_id()
+            ids = list(range(seq + 1, seq + 1 + len(rows)))
+            self.conn.executemany(
+                "INSERT INTO expenses (Id, Description, Expense_Type, Amount, Date) VALUES (?, ?, ?, ?, ?)",
+                [(i, r["Description"], r["Expense_Type"], float(r["Amount"]), r["Date"]) for i, r in zip(ids, rows)],
+            )
+        return ids
+
+    def last_id(self):
+        return self.conn.execute(
+            "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'expenses'), 0),"
+            " COALESCE((SELECT MAX(Id) FROM expenses), 0))"
+        ).fetchone()[0]
+
+    def _id_param(self, expense_id):
+        try:
+            return int(expense_id)
+        except (TypeError, ValueError):
+            return None
+
+    def delete(self, expense_id):
+        exp_id = self._id_param(expense_id)
+        if exp_id is None:
+            return []
+        with self.conn:
+            removed = self._select("WHERE Id = ?", (exp_id,))
+            self.conn.execute("DELETE FROM expenses WHERE Id = ?", (exp_id,))
+        return removed
+
+    def update(self, expense_id, new_data):
+        check_fields(new_data)
+        exp_id = self._id_param(expense_id)
+        fields = list(new_data)
+        if exp_id is None or not fields:
+            return None
+        values = [float(new_data[k]) if k == "Amount" else new_data[k] for k in fields]
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self.conn:
+            old = self._select("WHERE Id = ?", (exp_id,))
+            if not old:
+                return None
+            self.conn.execute(f"UPDATE expenses SET {assignments} WHERE Id = ?", (*values, exp_id))
+            new = self._select("WHERE Id = ?", (new_data.get("Id", exp_id),))
+        return old[0], new[0]
+
+    def generation(self):
+        # data_version moves only when another connection commits a change
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def replace_all(self, rows):
+        with self.conn:
+            self.conn.execute("DELETE FROM expenses")
+            self.conn.executemany(
+                "INSERT INTO expenses (Id, Description, Expense_Type, Amount, Date) VALUES (?, ?, ?, ?, ?)",
+                [(int(r["Id"]), r["Description"], r["Expense_Type"], float(r["Amount"]), r["Date"]) for r in rows],
+            )
+
+    def range_rows(self, start, end):
+        # Inclusive ISO bounds make this an index range scan on idx_expenses_date
+        return self._select(
+            "WHERE Date >= ? AND Date <= ? AND Date GLOB ?",
+            (start.isoformat(), end.isoformat(), self.DATE_GLOB),
+            order="Date, Id",
+        )
+
+    def invalid_date_rows(self):
+        # Validate each distinct date once, then fetch the rows carrying bad ones
+        dates = [d for (d,) in self.conn.execute("SELECT DISTINCT Date FROM expenses") if not parse_day(d)]
+        if not dates:
+            return []
+        marks = ", ".join("?" * len(dates))
+        return self._select(f"WHERE Date IN ({marks})", dates)
+
+    def grouped_totals(self):
+        groups = self.conn.execute(
+            "SELECT Date, Expense_Type, SUM(Amount), COUNT(*) FROM expenses GROUP BY Date, Expense_Type"
+        ).fetchall()
+        stats.add(ROWS_SCANNED, sum(g[3] for g in groups))
+        return groups
+
+    def _filter(self, start, end, types, min_amount):
+        """WHERE clause and parameters for iter_rows filters, or None if nothing can match."""
+        clauses, params = [], []
+        if start or end:
+            clauses.append("Date >= ? AND Date <= ? AND Date GLOB ?")
+            params += [(start or datetime.date.min).isoformat(),
+                       (end or datetime.date.max).isoformat(), self.DATE_GLOB]
+        if types is not None:
+            types = list(types)
+            if not types:
+                return None
+            clauses.append(f"Expense_Type IN ({', '.join('?' * len(types))})")
+            params += types
+        if min_amount is not None:
+            clauses.append("Amount >= ?")
+            params.append(min_amount)
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def iter_rows(self, start=None, end=None, types=None, min_amount=None, fields=None,
+                  offset=0, limit=None):
+        # Filters become the WHERE clause and rows stream off the cursor
+        fields = list(fields or FIELDNAMES)
+        where = self._filter(start, end, types, min_amount)
+        if where is None:
+            return
+        where, params = where
+        order = "Date, Id" if start or end else "Id"
+        sql = f"SELECT {', '.join(fields)} FROM expenses {where} ORDER BY {order}"
+        if offset or limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+        amount_at = fields.index("Amount") if "Amount" in fields else None
+        id_at = fields.index("Id") if "Id" in fields else None
+        scanned = 0
+        try:
+            for record in self.conn.execute(sql, params):
+                scanned += 1
+                record = list(record)
+                if amount_at is not None:
+                    record[amount_at] = f"{record[amount_at]:.2f}"
+                if id_at is not None:
+                    record[id_at] = str(record[id_at])
+                yield dict(zip(fields, record))
+        finally:
+            stats.add(ROWS_SCANNED, scanned)
+
+    def count_rows(self, start=None, end=None, types=None, min_amount=None):
+        where = self._filter(start, end, types, min_amount)
+        if where is None:
+            return 0
+        return self.conn.execute(f"SELECT COUNT(*) FROM expenses {where[0]}", where[1]).fetchone()[0]
+
+
+def unique_id_rows(rows):
+    """
+    rows with integer Ids, for copying a ledger into another backend.
+    Rows whose Id is not a unique integer get a fresh Id after the existing
+    ones. Returns (rows, number renumbered).
+    """
+    seen = set()
+    kept, renumbered = [], []
+    for row in rows:
+        try:
+            exp_id = int(row["Id"])
+        except (TypeError, ValueError):
+            exp_id = None
+        if exp_id is None or exp_id in seen:
+            renumbered.append(row)
+        else:
+            seen.add(exp_id)
+            kept.append({**row, "Id": exp_id})
+    next_id = max(seen, default=0) + 1
+    for i, row in enumerate(renumbered):
+        kept.append({**row, "Id": next_id + i})
+    return kept, len(renumbered)
+
+
+def convert_csv_to_sqlite(csv_filename="all_expenses.csv", db_filename="expenses.db"):
+    """
+    One-shot copy of a CSV ledger into a new SQLite database.
+    Rows whose Id is not a unique integer get a fresh Id after the existing ones.
+    Returns (success, message).
+    """
+    if not os.path.exists(csv_filename):
+        return False, f"{csv_filename} not found"
+    if os.path.exists(db_filename):
+        return False, f"{db_filename} already exists"
+
+    kept, renumbered = unique_id_rows(CsvStorage(csv_filename).load_all())
+    try:
+        target = SqliteStorage(db_filename)
+        target.replace_all(kept)
+        target.close()
+    except (sqlite3.Error, ValueError) as e:
+        return False, f"Error converting: {str(e)}"
+    msg = f"Converted {len(kept)} expenses to {db_filename}"
+    if renumbered:
+        msg += f" ({renumbered} given new Ids)"
+    return True, msg
+
+
+if __name__ == "__main__":
+    # python expense_storage.py [all_expenses.csv] [expenses.db]
+    success, msg = convert_csv_to_sqlite(*sys.argv[1:3])
+    print(msg)
+    sys.exit(0 if success else 1)
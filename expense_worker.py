@@ -0,0 +1,125 @@
+import queue
+import threading
+
+
+class BackgroundWorker:
+    """
+    Runs ExpenseLogic calls off the Tk main loop.
+    Calls run one at a time on a single worker thread, since ExpenseLogic and
+    its storage caches aren't thread-safe, and results are handed back on the
+    Tk thread by polling with root.after(). Each call names a channel (e.g.
+    the frame it loads): submitting again on that channel, or cancel(), drops
+    the earlier call, so a slow load never overwrites a newer one.
+    """
+
+    def __init__(self, root, on_busy=None, poll_ms=25):
+        self.root = root
+        self.on_busy = on_busy
+        self.poll_ms = poll_ms
+        # A plain thread rather than concurrent.futures, which costs ~15 ms to import
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        # channel -> token of the one call whose result is still wanted
+        self._latest = {}
+        # token -> started? for calls whose result hasn't been handed back yet
+        self._pending = {}
+        self._next_token = 0
+        self._polling = False
+        self._busy = False
+        self._thread = threading.Thread(target=self._run, name="expense-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, channel, fn, *args, on_done=None, on_error=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the worker thread, then call on_done(result),
+        or on_error(exception), on the Tk thread. Pass channel=None for calls
+        that must never be dropped, such as saves.
+        """
+        self._next_token += 1
+        token = self._next_token
+        if channel is not None:
+            self.cancel(channel)
+            self._latest[channel] = token
+
+        with self._lock:
+            self._pending[token] = False
+        self._jobs.put((token, channel, fn, args, kwargs, on_done, on_error))
+        self._update_busy()
+        self._schedule()
+        return token
+
+    def cancel(self, channel):
+        """Drop the pending call on channel: skipped if it hasn't started, ignored if it has."""
+        token = self._latest.pop(channel, None)
+        with self._lock:
+            if self._pending.get(token) is False:
+                del self._pending[token]
+        self._update_busy()
+
+    def busy(self):
+        """True while any call is queued or running."""
+        return bool(self._pending)
+
+    def shutdown(self):
+        """Wait for queued calls (pending saves included) to finish; results are not delivered."""
+        self._jobs.put(None)
+        self._thread.join()
+        self._latest.clear()
+        self._pending.clear()
+
+    def _run(self):
+        """Worker thread: run queued calls in order, skipping cancelled ones."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            token, channel, fn, args, kwargs, on_done, on_error = job
+            with self._lock:
+                if token not in self._pending:
+                    continue  # Cancelled before it started
+                self._pending[token] = True
+            try:
+                outcome = (True, fn(*args, **kwargs))
+            except Exception as e:
+                outcome = (False, e)
+            self._results.put((token, channel, outcome, on_done, on_error))
+
+    def _update_busy(self):
+        busy = self.busy()
+        if busy != self._busy:
+            self._busy = busy
+            if self.on_busy:
+                self.on_busy(busy)
+
+    def _schedule(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        try:
+            while True:
+                try:
+                    token, channel, (ok, value), on_done, on_error = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                with self._lock:
+                    self._pending.pop(token, None)
+                if channel is not None:
+                    if self._latest.get(channel) != token:
+                        continue  # Superseded or cancelled
+                    del self._latest[channel]
+                if ok:
+                    if on_done:
+                        on_done(value)
+                elif on_error:
+                    on_error(value)
+                else:
+                    print(f"Error in background task: {value}")
+        finally:
+            # Keep polling even if a callback raised
+            self._update_busy()
+            if self._pending:
+                self._schedule()
@@ -0,0 +1,89 @@
+import csv
+
+from expense_backups import BackupReplicator
+from expense_logic import ExpenseLogic
+
+
+def row(exp_id, date="2026-10-05"):
+    return {"Id": str(exp_id), "Description": f"e{exp_id}", "Expense_Type": "Food", "Amount": "1.00", "Date": date}
+
+
+def backup_ids(path):
+    with open(path, newline="") as f:
+        return [r["Id"] for r in csv.DictReader(f)]
+
+
+def test_no_thread_until_the_first_add(tmp_path):
+    backups = BackupReplicator(str(tmp_path), flush_seconds=60)
+    backups.flush()
+    assert backups._thread is None
+    backups.add([row(1)])
+    assert backups._thread is not None
+    backups.close()
+
+
+def test_read_only_logic_starts_no_thread(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    logic = ExpenseLogic()
+    logic.load_expenses()
+    assert logic.backups._thread is None
+    logic.close()
+
+
+def test_flush_writes_the_rows_and_moves_the_mark(tmp_path):
+    backups = BackupReplicator(str(tmp_path), flush_seconds=60)
+    backups.add([row(1), row(2, "2026-09-30")])
+    backups.flush()
+    assert backup_ids(tmp_path / "October.csv") == ["1"]
+    assert backup_ids(tmp_path / "September.csv") == ["2"]
+    assert backups._read_mark() == 2
+
+    backups.add([row(3)])
+    backups.flush()
+    assert backup_ids(tmp_path / "October.csv") == ["1", "3"]
+    assert backups._read_mark() == 3
+    backups.close()
+
+
+def test_close_flushes_rows_that_are_not_due_yet(tmp_path):
+    backups = BackupReplicator(str(tmp_path), flush_rows=1000, flush_seconds=60)
+    backups.add([row(1)])
+    backups.add([row(2)])
+    backups.close()
+    assert backup_ids(tmp_path / "October.csv") == ["1", "2"]
+    assert backups._read_mark() == 2
+
+
+def test_recover_without_a_mark_trusts_the_backups(tmp_path):
+    backups = BackupReplicator(str(tmp_path))
+    assert backups.recover(5, lambda mark: [row(i) for i in range(1, 6)]) == 0
+    assert backups._read_mark() == 5
+    assert not (tmp_path / "October.csv").exists()
+
+
+def test_recover_replays_only_rows_above_the_mark(tmp_path):
+    (tmp_path / "backups.pending").write_text("2\n")
+    backups = BackupReplicator(str(tmp_path))
+    ledger = [row(i) for i in (5, 1, 4, 2, 3)]
+    assert backups.recover(6, lambda mark: [r for r in ledger if int(r["Id"]) > mark]) == 3
+    # In Id order; Id 6 was deleted before it was copied, but the mark still passes it
+    assert backup_ids(tmp_path / "October.csv") == ["3", "4", "5"]
+    assert backups._read_mark() == 6
+    assert backups.recover(6, lambda mark: []) == 0
+    backups.close()
+
+
+def test_logic_recovers_backups_left_behind_by_a_crash(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "backups.pending").write_text("2\n")
+    logic = ExpenseLogic()
+    # Crash stand-in: the saves reach the ledger but never the backups
+    logic.backups = None
+    for i in range(5):
+        assert logic.save_expense(f"e{i}", "1.00", "Food", "2026-10-05")[0]
+    logic.close()
+
+    logic = ExpenseLogic(migrate=False)
+    assert logic._recover_backups() == 3
+    assert backup_ids(tmp_path / "October.csv") == ["3", "4", "5"]
+    logic.close()
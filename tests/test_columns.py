@@ -0,0 +1,71 @@
+import datetime
+import random
+
+import pytest
+
+import expense_columns
+from expense_columns import LedgerColumns
+
+CATEGORIES = ["Food", "Housing", "Transport", "Other"]
+# Dates that don't parse, or parse but aren't written the canonical way
+ODD_DATES = ["", "2026-13-01", "01/02/2026", "2026-2-3", "someday"]
+
+
+def ledger(dates, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for i, date in enumerate(dates, 1):
+        rows.append({"Id": str(i), "Description": "x", "Expense_Type": rng.choice(CATEGORIES),
+                     "Amount": rng.choice([f"{rng.uniform(0, 500):.2f}", "0.1", "99.0", "oops"]), "Date": date})
+    return LedgerColumns(rows)
+
+
+def dense_dates(n, rng):
+    start = datetime.date(2026, 1, 1).toordinal()
+    return [datetime.date.fromordinal(start + rng.randrange(60)).isoformat() for _ in range(n)]
+
+
+def sparse_dates(n, rng):
+    # Days centuries apart: too wide a key range to bin directly
+    return [datetime.date.fromordinal(rng.randrange(1, 3_000_000)).isoformat() for _ in range(n)]
+
+
+def with_odd_dates(dates, rng):
+    return [rng.choice(ODD_DATES) if rng.random() < 0.1 else date for date in dates]
+
+
+@pytest.mark.parametrize("make_dates", [dense_dates, sparse_dates])
+@pytest.mark.parametrize("odd", [False, True])
+def test_numpy_and_python_grouped_totals_match(monkeypatch, make_dates, odd):
+    pytest.importorskip("numpy")
+    rng = random.Random(1)
+    dates = make_dates(5000, rng)
+    if odd:
+        dates = with_odd_dates(dates, rng)
+    columns = ledger(dates)
+
+    with_numpy = columns.grouped_totals()
+    assert with_numpy == columns.grouped_totals(use_numpy=True)
+    # Without NumPy installed the default falls back to pure Python
+    monkeypatch.setattr(expense_columns, "_numpy", lambda: None)
+    assert columns.grouped_totals() == with_numpy
+    assert columns.grouped_totals(use_numpy=False) == with_numpy
+    assert sum(count for _, _, _, count in with_numpy) == sum(
+        1 for row in columns.rows() if row["Amount"] != "oops")
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_grouped_totals_group_invalid_dates_by_their_text(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    columns = LedgerColumns([
+        {"Id": "1", "Description": "a", "Expense_Type": "Food", "Amount": "1.50", "Date": "2026-10-01"},
+        {"Id": "2", "Description": "b", "Expense_Type": "Food", "Amount": "2.00", "Date": "bad"},
+        {"Id": "3", "Description": "c", "Expense_Type": "Food", "Amount": "3.00", "Date": "bad"},
+        {"Id": "4", "Description": "d", "Expense_Type": "Other", "Amount": "oops", "Date": "2026-10-01"},
+        {"Id": "5", "Description": "e", "Expense_Type": "Food", "Amount": "4.0", "Date": "2026-10-01"},
+    ])
+    assert columns.grouped_totals(use_numpy=use_numpy) == [
+        ("2026-10-01", "Food", 5.5, 2),
+        ("bad", "Food", 5.0, 2),
+    ]
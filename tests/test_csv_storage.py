@@ -0,0 +1,124 @@
+import csv
+
+import pytest
+
+from expense_storage import FIELDNAMES, CsvStorage, file_stamp, id_value
+
+
+def write_master(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_update_with_duplicate_id_changes_only_that_row(tmp_path):
+    master = tmp_path / "all_expenses.csv"
+    write_master(master, [
+        {"Id": "1", "Description": "a", "Expense_Type": "Food", "Amount": "1.00", "Date": "2026-10-01"},
+        {"Id": "1", "Description": "b", "Expense_Type": "Food", "Amount": "2.00", "Date": "2026-10-02"},
+    ])
+    storage = CsvStorage(str(master))
+    storage.update("1", {"Description": "zzzzzz"})
+
+    # A fresh load replays the journal from disk
+    storage.invalidate()
+    rows = storage.load_all()
+    assert [(r["Description"], r["Amount"], r["Date"]) for r in rows] == [
+        ("zzzzzz", "1.00", "2026-10-01"),
+        ("b", "2.00", "2026-10-02"),
+    ]
+
+    storage.compact()
+    assert CsvStorage(str(master)).load_all() == rows
+
+
+def test_update_with_unknown_field_fails_on_every_path(tmp_path):
+    master = tmp_path / "all_expenses.csv"
+    write_master(master, [
+        {"Id": "11", "Description": "lunch", "Expense_Type": "Food", "Amount": "9.00", "Date": "2026-10-01"},
+    ])
+    for use_journal in (True, False):
+        storage = CsvStorage(str(master), use_journal=use_journal)
+        with pytest.raises(ValueError, match="not in fieldnames"):
+            storage.update("11", {"Category": "Food"})
+        # Same length as the old line, so the in-place patch would have applied
+        with pytest.raises(ValueError, match="not in fieldnames"):
+            storage.update("11", {"Description": "LUNCH", "Category": "Food"})
+        assert storage.load_all()[0]["Description"] == "lunch"
+
+
+def test_shared_helpers(tmp_path):
+    assert [id_value(v) for v in ("12", 7, " 3 ", "x", "")] == [12, 7, 3, -1, -1]
+    assert file_stamp(tmp_path / "missing.csv") is None
+    master = tmp_path / "all_expenses.csv"
+    write_master(master, [])
+    assert file_stamp(master)[0] == master.stat().st_size
+
+
+def test_deleted_max_id_is_not_reused_after_losing_the_seq_file(tmp_path):
+    master = tmp_path / "all_expenses.csv"
+    storage = CsvStorage(str(master))
+    for desc in ("a", "b", "c"):
+        storage.append({"Description": desc, "Expense_Type": "Food", "Amount": "1.00", "Date": "2026-10-01"})
+    storage.delete(3)
+    (tmp_path / "all_expenses.seq").unlink()
+
+    assert storage.append({"Description": "B", "Expense_Type": "Food", "Amount": "2.00", "Date": "2026-10-02"}) == 4
+    # After a restart the old tombstone for Id 3 is replayed; it must not hide "B"
+    rows = CsvStorage(str(master)).load_all()
+    assert [(r["Id"], r["Description"]) for r in rows] == [("1", "a"), ("2", "b"), ("4", "B")]
+
+
+def seeded_ledger(tmp_path, ids=(1, 2, 7)):
+    master = tmp_path / "all_expenses.csv"
+    write_master(master, [
+        {"Id": str(i), "Description": f"e{i}", "Expense_Type": "Food", "Amount": "1.00", "Date": "2026-10-01"}
+        for i in ids
+    ])
+    return master
+
+
+NEW_ROW = {"Description": "new", "Expense_Type": "Food", "Amount": "3.00", "Date": "2026-10-03"}
+
+
+def test_missing_seq_recovers_from_the_ledger(tmp_path):
+    master = seeded_ledger(tmp_path)
+    storage = CsvStorage(str(master))
+    assert storage.append(NEW_ROW) == 8
+    # The recovered value is stored for the next start
+    assert (tmp_path / "all_expenses.seq").read_text().split()[0] == "9"
+
+
+def test_stale_seq_below_the_ledger_max_is_ignored(tmp_path):
+    master = seeded_ledger(tmp_path)
+    # Written for an older version of the file: stamp doesn't match, Id too low
+    (tmp_path / "all_expenses.seq").write_text("3 10 0 0\n")
+    assert CsvStorage(str(master)).append(NEW_ROW) == 8
+
+
+def test_stale_seq_above_the_ledger_max_is_kept(tmp_path):
+    master = seeded_ledger(tmp_path)
+    (tmp_path / "all_expenses.seq").write_text("20 10 0 0\n")
+    assert CsvStorage(str(master)).append(NEW_ROW) == 20
+
+
+@pytest.mark.parametrize("text", ["", "garbage\n", "12 x y z\n"])
+def test_corrupt_seq_recovers_from_the_ledger(tmp_path, text):
+    master = seeded_ledger(tmp_path)
+    (tmp_path / "all_expenses.seq").write_text(text)
+    assert CsvStorage(str(master)).append(NEW_ROW) == 8
+
+
+def test_journaled_delete_of_the_max_id_survives_a_stale_seq(tmp_path):
+    master = seeded_ledger(tmp_path)
+    storage = CsvStorage(str(master))
+    storage.delete(7)
+    # The ledger was touched outside the app, so the .seq stamp no longer matches
+    with open(master, "a", newline="") as f:
+        f.write("\r\n")
+    (tmp_path / "all_expenses.seq").write_text("5 10 0 0\n")
+
+    assert CsvStorage(str(master)).append(NEW_ROW) == 8
+    rows = CsvStorage(str(master)).load_all()
+    assert [r["Id"] for r in rows] == ["1", "2", "8"]
@@ -0,0 +1,50 @@
+import pytest
+
+from expense_logic import ExpenseLogic
+
+STATEMENT = """Posted,Payee,Amount
+05/10/2026,Grocer,"-1,234.50"
+06/10/2026,Employer,2500.00
+07/10/2026,Cafe,-4.20
+07/10/2026,Cafe,-4.20
+"""
+
+
+@pytest.fixture
+def logic(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "statement.csv").write_text(STATEMENT)
+    logic = ExpenseLogic()
+    yield logic
+    logic.close()
+
+
+MAPPING = {"Description": "Payee", "Date": "Posted"}
+
+
+def test_credits_are_rejected_not_imported_as_expenses(logic):
+    ok, msg, report = logic.import_file("statement.csv", mapping=MAPPING, date_format="%d/%m/%Y",
+                                        debit_sign="-")
+    assert ok, msg
+    assert [(e["Description"], e["Amount"]) for e in logic.load_expenses()] == [
+        ("Grocer", "1234.50"), ("Cafe", "4.20")]
+    assert report["duplicates"] == 1
+    assert report["rejected"] == 1
+    line, reason = report["rejections"][0]
+    assert line == 3 and "Credit" in reason
+
+
+def test_positive_amounts_are_expenses_by_default(logic):
+    ok, msg, report = logic.import_file("statement.csv", mapping=MAPPING, date_format="%d/%m/%Y")
+    assert ok, msg
+    assert [e["Description"] for e in logic.load_expenses()] == ["Employer"]
+    assert report["rejected"] == 3
+
+
+def test_rows_already_in_the_ledger_are_skipped(logic):
+    assert logic.save_expense("Cafe", "4.20", "Other", "2026-10-07")[0]
+    ok, msg, report = logic.import_file("statement.csv", mapping=MAPPING, date_format="%d/%m/%Y",
+                                        debit_sign="-", memory_budget=1)
+    assert ok, msg
+    assert report["imported"] == 1 and report["duplicates"] == 2
+    assert [e["Description"] for e in logic.load_expenses()] == ["Cafe", "Grocer"]
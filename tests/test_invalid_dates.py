@@ -0,0 +1,41 @@
+import csv
+
+import pytest
+
+from expense_logic import ExpenseLogic
+from expense_storage import FIELDNAMES
+
+ROWS = [
+    {"Id": "1", "Description": "ok", "Expense_Type": "Food", "Amount": "5.00", "Date": "2026-10-01"},
+    {"Id": "2", "Description": "typo", "Expense_Type": "Food", "Amount": "7.00", "Date": "2026-10-32"},
+    {"Id": "3", "Description": "us style", "Expense_Type": "Food", "Amount": "3.00", "Date": "10/02/2026"},
+    {"Id": "4", "Description": "blank", "Expense_Type": "Food", "Amount": "1.00", "Date": ""},
+]
+
+
+@pytest.fixture(params=["csv", "partitioned", "sqlite"])
+def logic(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("all_expenses.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(ROWS)
+    logic = ExpenseLogic(backend=request.param)
+    yield logic
+    logic.close()
+
+
+def test_count_matches_the_listed_rows(logic):
+    assert logic.get_invalid_date_count() == 3
+    assert sorted(r["Description"] for r in logic.get_invalid_date_expenses()) == ["blank", "typo", "us style"]
+    # Left out of the months, but still part of the all-time figures
+    assert logic.get_all_monthly_totals_from_master() == {(2026, 10): 5.0}
+    assert logic.get_all_time_summary()["invalid_date_count"] == 3
+
+
+def test_count_follows_fixes_and_deletes(logic):
+    assert logic.update_expense("2", {"Date": "2026-10-31"})[0]
+    assert logic.get_invalid_date_count() == 2
+    assert logic.delete_expense("4")[0]
+    assert logic.get_invalid_date_count() == 1
+    assert [r["Description"] for r in logic.get_invalid_date_expenses()] == ["us style"]
@@ -0,0 +1,58 @@
+import csv
+
+import pytest
+
+import expense_migrate
+from expense_logic import ExpenseLogic
+from expense_storage import FIELDNAMES
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+MASTER = [
+    {"Id": "1", "Description": "rent", "Expense_Type": "Housing", "Amount": "900.00", "Date": "2025-12-01"},
+    {"Id": "2", "Description": "lunch", "Expense_Type": "Food", "Amount": "12.50", "Date": "2026-01-15"},
+    {"Id": "2", "Description": "bus", "Expense_Type": "Transport", "Amount": "2.00", "Date": "2026-02-03"},
+]
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "partitioned"])
+def test_new_backend_copies_the_master_not_the_backups(tmp_path, monkeypatch, backend):
+    monkeypatch.chdir(tmp_path)
+    write_csv("all_expenses.csv", MASTER)
+    # An older December backup that the master no longer matches
+    write_csv("December.csv", [
+        {"Id": "1", "Description": "old", "Expense_Type": "Other", "Amount": "5.00", "Date": "2024-12-24"},
+    ])
+
+    logic = ExpenseLogic(backend=backend)
+    rows = logic.load_expenses()
+    logic.close()
+
+    assert [(r["Description"], r["Date"]) for r in rows] == [(r["Description"], r["Date"]) for r in MASTER]
+    # The repeated Id gets a fresh one after the existing Ids
+    assert [int(r["Id"]) for r in rows] == [1, 2, 3]
+
+
+def test_legacy_files_merge_the_same_in_memory_and_on_disk(tmp_path):
+    write_csv(tmp_path / "January.csv", [
+        {"Id": str(i), "Description": f"jan{i}", "Expense_Type": "Food", "Amount": "1.00",
+         "Date": f"2026-01-{28 - i % 28:02d}"} for i in range(200)
+    ])
+    write_csv(tmp_path / "March.csv", [
+        {"Id": "1", "Description": "jan0", "Expense_Type": "Food", "Amount": "1", "Date": "2026-01-28"},
+        {"Id": "2", "Description": "mar", "Expense_Type": "Food", "Amount": "3.00", "Date": "2025-03-01"},
+    ])
+    in_memory = list(expense_migrate.iter_legacy_rows(str(tmp_path), workers=1))
+    report = {}
+    on_disk = list(expense_migrate.iter_legacy_rows(str(tmp_path), workers=1, report=report, memory_budget=1))
+
+    assert on_disk == in_memory
+    assert [r["Date"] for r in in_memory] == sorted(r["Date"] for r in in_memory)
+    assert in_memory[0]["Description"] == "mar"
+    assert report["duplicates"] == 1 and len(in_memory) == 201
@@ -0,0 +1,109 @@
+import os
+
+import pytest
+
+from expense_offsets import OffsetIndex
+from expense_storage import CsvStorage
+
+HEADER = "Id,Description,Expense_Type,Amount,Date"
+
+
+def write_ledger(path, lines, eol="\r\n"):
+    path.write_bytes((eol.join([HEADER] + lines) + eol).encode())
+
+
+@pytest.fixture
+def master(tmp_path):
+    path = tmp_path / "all_expenses.csv"
+    write_ledger(path, [
+        "1,coffee,Food,3.50,2026-10-01",
+        '2,"rent, October",Housing,900.00,2026-10-01',
+        "3,bus,Transport,2.00,2026-10-02",
+    ])
+    return path
+
+
+def no_full_reads(storage, monkeypatch):
+    """Make any fallback to parsing the whole ledger fail the test."""
+    def load_all():
+        raise AssertionError("read the whole ledger")
+    monkeypatch.setattr(storage, "load_all", load_all)
+
+
+def test_get_reads_through_the_saved_index(master, monkeypatch):
+    storage = CsvStorage(str(master))
+    assert storage.get(2)["Description"] == "rent, October"
+    storage.close()
+    assert os.path.exists(str(master)[:-4] + ".idx")
+
+    # A restart loads the sidecar instead of scanning the file
+    monkeypatch.setattr(OffsetIndex, "build", lambda self, stamp: pytest.fail("rebuilt the index"))
+    storage = CsvStorage(str(master))
+    no_full_reads(storage, monkeypatch)
+    assert storage.get(3)["Amount"] == "2.00"
+    assert storage.get(4) is None
+
+
+def test_index_is_rebuilt_after_an_outside_edit(tmp_path, master, monkeypatch):
+    storage = CsvStorage(str(master))
+    storage.get(1)
+    storage.close()
+    saved = (tmp_path / "all_expenses.idx").read_bytes()
+    # Edited by hand: the first row grows, so every later offset moves
+    write_ledger(master, [
+        "1,coffee and a pastry,Food,7.25,2026-10-01",
+        '2,"rent, October",Housing,900.00,2026-10-01',
+        "3,bus,Transport,2.00,2026-10-02",
+        "4,taxi,Transport,15.00,2026-10-03",
+    ])
+    storage = CsvStorage(str(master))
+    no_full_reads(storage, monkeypatch)
+    assert storage.get(3)["Description"] == "bus"
+    assert storage.get(4)["Description"] == "taxi"
+    assert storage.get(1)["Amount"] == "7.25"
+    storage.close()
+    assert (tmp_path / "all_expenses.idx").read_bytes() != saved
+
+
+@pytest.mark.parametrize("eol", ["\r\n", "\n"])
+def test_same_length_update_is_patched_in_place(tmp_path, eol):
+    master = tmp_path / "all_expenses.csv"
+    write_ledger(master, ["1,coffee,Food,3.50,2026-10-01", "2,bus,Transport,2.00,2026-10-02"], eol)
+    inode = os.stat(master).st_ino
+    storage = CsvStorage(str(master))
+
+    storage.update("1", {"Description": "COFFEE", "Amount": "4.25"})
+    assert master.read_bytes() == eol.join(
+        [HEADER, "1,COFFEE,Food,4.25,2026-10-01", "2,bus,Transport,2.00,2026-10-02", ""]).encode()
+    assert os.stat(master).st_ino == inode
+    assert not os.path.exists(tmp_path / "all_expenses.journal")
+    assert CsvStorage(str(master)).get(1)["Description"] == "COFFEE"
+
+
+@pytest.mark.parametrize("eol", ["\r\n", "\n"])
+def test_longer_update_goes_to_the_journal(tmp_path, eol):
+    master = tmp_path / "all_expenses.csv"
+    write_ledger(master, ["1,coffee,Food,3.50,2026-10-01", "2,bus,Transport,2.00,2026-10-02"], eol)
+    before = master.read_bytes()
+    storage = CsvStorage(str(master))
+
+    storage.update("1", {"Description": "coffee with friends"})
+    assert master.read_bytes() == before
+    assert os.path.exists(tmp_path / "all_expenses.journal")
+    assert CsvStorage(str(master)).get(1)["Description"] == "coffee with friends"
+
+
+def test_get_prefers_the_journal_over_the_indexed_row(master):
+    storage = CsvStorage(str(master))
+    storage.update("2", {"Description": "rent, October (paid late)"})
+    storage.delete(3)
+
+    # Cold instances, so get() can't answer from the column cache
+    assert CsvStorage(str(master)).get(2)["Description"] == "rent, October (paid late)"
+    assert CsvStorage(str(master)).get(3) is None
+    assert CsvStorage(str(master)).get(1)["Description"] == "coffee"
+
+    # A journaled row is not patched in place either, or replay would undo it
+    storage = CsvStorage(str(master))
+    storage.update("2", {"Description": "rent, October"})
+    assert CsvStorage(str(master)).get(2)["Description"] == "rent, October"
@@ -0,0 +1,226 @@
+import itertools
+
+import pytest
+
+from expense_pager import TreePager
+
+
+class FakeTree:
+    """The parts of ttk.Treeview TreePager uses, kept as plain lists."""
+
+    def __init__(self):
+        self.order = []
+        self.values = {}
+        self.inserted = 0
+        self._ids = itertools.count()
+
+    def bind(self, *args):
+        pass
+
+    def insert(self, parent, index, values):
+        item = f"I{next(self._ids)}"
+        self.order.insert(index, item)
+        self.values[item] = values
+        self.inserted += 1
+        return item
+
+    def delete(self, item):
+        self.order.remove(item)
+        del self.values[item]
+
+    def move(self, item, parent, index):
+        self.order.remove(item)
+        self.order.insert(index, item)
+
+    def item(self, item, values):
+        self.values[item] = values
+
+    def get_children(self):
+        return tuple(self.order)
+
+    def shown(self):
+        return [self.values[item] for item in self.order]
+
+
+class FakeScrollbar:
+    def config(self, **kwargs):
+        pass
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+def expense(exp_id, date="2026-10-01", desc=None):
+    return (exp_id, desc or f"e{exp_id}", "Food", "1.00", date)
+
+
+class Ledger:
+    """Rows the pager pages over, fetched synchronously as the worker would."""
+
+    def __init__(self, rows, sort_key):
+        self.rows = sorted(rows, key=sort_key)
+        self.sort_key = sort_key
+        self.fetches = 0
+
+    def fetch(self, offset, limit):
+        self.fetches += 1
+        return len(self.rows), self.rows[offset:offset + limit]
+
+    def submit(self, fn, *args, on_done):
+        on_done(fn(*args))
+
+    def change(self, removed=(), added=()):
+        gone = {v[0] for v in removed}
+        self.rows = sorted([v for v in self.rows if v[0] not in gone] + list(added), key=self.sort_key)
+
+
+def by_id(values):
+    return values[0]
+
+
+@pytest.fixture
+def pager():
+    # Odd Ids 1..199, so even Ids can be saved between any two of them
+    ledger = Ledger([expense(i) for i in range(1, 200, 2)], by_id)
+    tree = FakeTree()
+    pager = TreePager(tree, FakeScrollbar(), ledger.fetch, ledger.submit, by_id, page_size=20)
+    pager.visible = 5
+    pager.reset()
+    pager.scroll_to(40)
+    ledger.fetches = 0
+    pager.ledger = ledger
+    return pager
+
+
+def check(pager):
+    """The tree shows exactly what a fresh fetch at the same position would."""
+    ledger = pager.ledger
+    assert pager.count == len(ledger.rows)
+    assert pager.tree.shown() == ledger.rows[pager.first:pager.first + pager.visible]
+
+
+def test_view_starts_on_the_requested_row(pager):
+    assert pager.page_start == 33 and pager.first == 40
+    check(pager)
+
+
+def test_tree_holds_only_the_visible_rows(pager):
+    assert len(pager.tree.order) == pager.visible
+    assert len(pager.page_rows) == pager.page_size
+    assert pager.scrollbar.position == (0.4, 0.45)
+
+
+def test_scrolling_within_the_page_moves_items_without_fetching(pager):
+    inserted = pager.tree.inserted
+    pager.scroll(3)
+    check(pager)
+    assert pager.ledger.fetches == 0
+    # Two of the five rows are still in view and keep their items
+    assert pager.tree.inserted == inserted + 3
+
+
+def test_scrolling_past_the_page_fetches_one_page_around_the_view(pager):
+    pager.scroll(30)
+    check(pager)
+    assert pager.ledger.fetches == 1
+    assert pager.page_start <= pager.first and pager.first + pager.visible <= pager.page_start + pager.page_size
+
+
+def test_scrollbar_moves_as_if_every_row_were_loaded(pager):
+    pager.yview("moveto", "0.5")
+    check(pager)
+    assert pager.first == 50
+    assert pager.scrollbar.position == (0.5, 0.55)
+    pager.yview("scroll", "1", "pages")
+    assert pager.first == 55
+    pager.yview("moveto", "1.0")
+    check(pager)
+    assert pager.first == 95
+
+
+def test_refresh_keeps_the_position(pager):
+    pager.ledger.change(added=[expense(84)])
+    pager.refresh()
+    check(pager)
+    assert pager.first == 40 and pager.ledger.fetches == 1
+
+
+def apply(pager, removed=(), added=()):
+    pager.ledger.change(removed, added)
+    pager.apply(removed, added)
+
+
+@pytest.mark.parametrize("new_id", [2, 84, 94, 150])
+def test_insert_before_inside_and_after_the_page_needs_no_fetch(pager, new_id):
+    # 2 is before the cached page, 84 before the view but in the page,
+    # 94 inside the view, 150 after the page
+    top = pager.tree.shown()[0]
+    apply(pager, added=[expense(new_id)])
+    check(pager)
+    assert pager.ledger.fetches == 0
+    if new_id != 94:
+        assert pager.tree.shown()[0] == top  # The view doesn't jump
+
+
+def test_insert_at_the_end_when_the_page_reaches_it(pager):
+    pager.scroll_to(200)
+    pager.ledger.fetches = 0
+    apply(pager, added=[expense(500)])
+    pager.scroll_to(200)
+    check(pager)
+    assert pager.tree.shown()[-1][0] == 500
+    assert pager.ledger.fetches == 0
+
+
+@pytest.mark.parametrize("gone_id", [1, 85, 83, 95, 199])
+def test_remove_before_inside_and_after_the_page_needs_no_fetch(pager, gone_id):
+    apply(pager, removed=[expense(gone_id)])
+    check(pager)
+    assert pager.ledger.fetches == 0
+
+
+def test_update_in_place_keeps_the_tree_item(pager):
+    item = pager.tree.order[1]
+    old = pager.tree.values[item]
+    new = expense(old[0], desc="renamed")
+    inserted = pager.tree.inserted
+    apply(pager, removed=[old], added=[new])
+    check(pager)
+    assert pager.tree.order[1] == item and pager.tree.values[item] == new
+    assert pager.tree.inserted == inserted
+
+
+def test_update_that_moves_the_row_is_a_remove_and_insert():
+    def by_date(values):
+        return values[4], values[0]
+
+    ledger = Ledger([expense(i, f"2026-10-{i:02d}") for i in range(1, 29)], by_date)
+    pager = TreePager(FakeTree(), FakeScrollbar(), ledger.fetch, ledger.submit, by_date, page_size=30)
+    pager.ledger = ledger
+    pager.visible = 10
+    pager.reset()
+    old, new = expense(5, "2026-10-05"), expense(5, "2026-10-07")
+    apply(pager, removed=[old], added=[new])
+    check(pager)
+    assert [v[0] for v in pager.tree.shown()[:8]] == [1, 2, 3, 4, 6, 5, 7, 8]
+    assert ledger.fetches == 1  # Only the first page
+
+
+def test_rows_the_list_does_not_accept_are_ignored(pager):
+    pager.accepts = lambda values: values[4].startswith("2026-10")
+    pager.apply(added=[expense(94, "2026-09-30")])
+    check(pager)
+    assert pager.count == 100 and pager.ledger.fetches == 0
+
+
+def test_out_of_order_page_falls_back_to_a_refresh(pager):
+    pager.page_rows[3], pager.page_rows[4] = pager.page_rows[4], pager.page_rows[3]
+    apply(pager, added=[expense(94)])
+    check(pager)
+    assert pager.ledger.fetches == 1
+
+
+def test_big_batch_falls_back_to_a_refresh(pager):
+    apply(pager, added=[expense(i) for i in range(300, 322, 2)])
+    check(pager)
+    assert pager.ledger.fetches == 1
@@ -0,0 +1,128 @@
+import csv
+import json
+
+import pytest
+
+from expense_logic import ExpenseLogic, default_backend
+from expense_partitions import PartitionedStorage, convert_csv_to_partitions
+from expense_storage import FIELDNAMES, CsvStorage
+
+DATES = ["2025-11-03", "2025-12-24", "2026-01-05", "2026-01-20", "2026-02-14", "bad date"]
+
+
+def new_row(date, desc="x", amount="10.00"):
+    return {"Description": desc, "Expense_Type": "Food", "Amount": amount, "Date": date}
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    storage = PartitionedStorage(str(tmp_path / "ledger"))
+    storage.append_many([new_row(date, f"e{i}") for i, date in enumerate(DATES, 1)])
+    storage.close()
+    return tmp_path / "ledger"
+
+
+def add_line(path, *rows):
+    with open(path, "a", newline="") as f:
+        csv.DictWriter(f, fieldnames=FIELDNAMES).writerows(rows)
+
+
+def test_backend_comes_from_the_environment_or_an_existing_ledger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("EXPENSE_BACKEND", raising=False)
+    assert default_backend() == "csv"
+
+    CsvStorage("all_expenses.csv").append(new_row("2026-01-05"))
+    assert convert_csv_to_partitions()[0]
+    assert default_backend() == "partitioned"
+    logic = ExpenseLogic()
+    assert isinstance(logic.storage, PartitionedStorage)
+    assert [e["Date"] for e in logic.load_expenses()] == ["2026-01-05"]
+    logic.close()
+
+    monkeypatch.setenv("EXPENSE_BACKEND", "csv")
+    assert default_backend() == "csv"
+    monkeypatch.setenv("EXPENSE_BACKEND", "nosuch")
+    with pytest.raises(ValueError):
+        ExpenseLogic()
+
+
+def test_first_start_with_the_variable_copies_the_master(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    CsvStorage("all_expenses.csv").append(new_row("2026-01-05", "old"))
+    monkeypatch.setenv("EXPENSE_BACKEND", "partitioned")
+    logic = ExpenseLogic()
+    assert [e["Description"] for e in logic.load_expenses()] == ["old"]
+    logic.close()
+    assert (tmp_path / "ledger" / "2026" / "01.csv").exists()
+
+
+def test_manifest_follows_partitions_edited_outside_the_app(ledger):
+    # A row added by hand, a month deleted and a new month created
+    add_line(ledger / "2026" / "01.csv", {"Id": "40", **new_row("2026-01-31", "by hand", "5.00")})
+    (ledger / "2025" / "11.csv").unlink()
+    (ledger / "2024").mkdir()
+    with open(ledger / "2024" / "07.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerow({"Id": "41", **new_row("2024-07-01", "restored")})
+
+    storage = PartitionedStorage(str(ledger))
+    assert storage.partitions["2026-01"]["rows"] == 3
+    assert storage.partitions["2026-01"]["max_date"] == "2026-01-31"
+    assert storage.partitions["2026-01"]["total"] == [25.0, 3]
+    assert "2025-11" not in storage.partitions
+    assert storage.partitions["2024-07"]["min_id"] == 41
+    assert storage.get(40)["Description"] == "by hand"
+    assert storage.get(1) is None
+    # New Ids continue after the hand-written ones
+    assert storage.append(new_row("2026-02-01")) == 42
+
+    manifest = json.loads((ledger / "manifest.json").read_text())
+    assert sorted(manifest["partitions"]) == ["2024-07", "2025-12", "2026-01", "2026-02", "undated"]
+    assert manifest["next_id"] == 43
+
+
+def test_running_instance_notices_an_outside_edit(ledger):
+    storage = PartitionedStorage(str(ledger))
+    generation = storage.generation()
+    add_line(ledger / "2026" / "02.csv", {"Id": "50", **new_row("2026-02-20", "by hand")})
+    assert storage.generation() != generation
+    assert [r["Id"] for r in storage.iter_rows(fields=["Id"])][-1] == "50"
+
+
+def test_lost_or_corrupt_manifest_is_rebuilt(ledger):
+    expected = PartitionedStorage(str(ledger)).partitions
+    (ledger / "manifest.json").write_text("{not json")
+    storage = PartitionedStorage(str(ledger))
+    assert storage.partitions == expected
+    assert storage.last_id() == len(DATES)
+    (ledger / "manifest.json").unlink()
+    assert PartitionedStorage(str(ledger)).partitions == expected
+
+
+def test_query_range_opens_only_overlapping_partitions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    logic = ExpenseLogic(backend="partitioned")
+    for i, date in enumerate(DATES[:-1]):
+        assert logic.save_expense(f"e{i}", "10.00", "Food", date)[0]
+    logic.storage.append(new_row("bad date"))  # save_expense would reject it
+    logic.storage.invalidate()
+
+    opened = []
+    read = PartitionedStorage._read
+
+    def tracking_read(self, key):
+        opened.append(key)
+        return read(self, key)
+
+    monkeypatch.setattr(PartitionedStorage, "_read", tracking_read)
+    rows = logic.query_range("2026-01-10", "2026-02-28")
+    assert [r["Date"] for r in rows] == ["2026-01-20", "2026-02-14"]
+    assert sorted(opened) == ["2026-01", "2026-02"]
+
+    opened.clear()
+    assert logic.query_range("2030-01-01", "2030-12-31") == []
+    assert logic.get_all_monthly_totals_from_master()
+    assert opened == []
+    logic.close()
@@ -0,0 +1,120 @@
+import csv
+import os
+import random
+
+import pytest
+
+import expense_sort
+from expense_logic import ExpenseLogic
+from expense_sort import date_key, date_order, external_sort
+
+FIELDS = ["Seq", "Date"]
+
+
+def dated_rows(n, seed=3):
+    rng = random.Random(seed)
+    # Few distinct dates, so most rows tie with others
+    return [{"Seq": str(i), "Date": f"2026-10-{rng.randrange(1, 8):02d}"} for i in range(n)]
+
+
+@pytest.fixture
+def spills(monkeypatch):
+    """Count the run files external_sort writes."""
+    paths = []
+    spill = expense_sort._spill
+
+    def counting_spill(*args):
+        paths.append(spill(*args))
+        return paths[-1]
+
+    monkeypatch.setattr(expense_sort, "_spill", counting_spill)
+    return paths
+
+
+def test_input_within_the_budget_is_sorted_in_memory(tmp_path, spills):
+    rows = dated_rows(100)
+    assert list(external_sort(rows, date_key, FIELDS, directory=tmp_path)) == sorted(rows, key=date_key)
+    assert spills == [] and os.listdir(tmp_path) == []
+
+
+def test_spilled_runs_merge_stably_in_several_passes(tmp_path, monkeypatch, spills):
+    monkeypatch.setattr(expense_sort, "MAX_OPEN_RUNS", 3)
+    rows = dated_rows(500)
+    # A budget of about ten rows: 50 runs, merged three at a time
+    budget = 10 * expense_sort._row_size(rows[0])
+    result = list(external_sort(rows, date_key, FIELDS, budget, directory=tmp_path))
+
+    # sorted() is stable, so equal dates must keep their input order
+    assert result == sorted(rows, key=date_key)
+    assert len(spills) > 50  # the runs plus the intermediate merges
+    assert os.listdir(tmp_path) == []
+
+
+def test_spill_directory_is_removed_when_the_caller_stops_early(tmp_path):
+    sorted_rows = external_sort(dated_rows(200), date_key, FIELDS, 1, directory=tmp_path)
+    next(sorted_rows)
+    assert len(os.listdir(tmp_path)) == 1
+    sorted_rows.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_spill_directory_is_removed_when_the_input_fails(tmp_path):
+    def failing_rows():
+        yield from dated_rows(50)
+        raise OSError("disk went away")
+
+    with pytest.raises(OSError):
+        list(external_sort(failing_rows(), date_key, FIELDS, 1, directory=tmp_path))
+    assert os.listdir(tmp_path) == []
+
+
+def test_date_order_breaks_ties_by_numeric_id():
+    rows = [{"Id": "10", "Date": "2026-10-01"}, {"Id": "9", "Date": "2026-10-01"},
+            {"Id": "x", "Date": "2026-10-01"}, {"Id": "1", "Date": "2026-09-30"}]
+    assert [r["Id"] for r in sorted(rows, key=date_order)] == ["1", "x", "9", "10"]
+
+
+DATES = ["2026-10-05", "2026-01-20", "2026-10-05", "2025-12-31", "2026-03-01", "2026-01-20"]
+
+
+@pytest.fixture
+def logic(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    logic = ExpenseLogic()
+    for i, date in enumerate(DATES):
+        assert logic.save_expense(f"e{i}", "1.00", "Food", date)[0]
+    yield logic
+    logic.close()
+
+
+def ledger_file_rows(path="all_expenses.csv"):
+    with open(path, newline="") as f:
+        return [(r["Id"], r["Date"]) for r in csv.DictReader(f)]
+
+
+def test_sort_ledger_by_date_keeps_ids_and_the_sequence(logic):
+    assert logic.delete_expense(6)[0]  # The highest Id, journaled
+    before = {e["Id"]: e for e in logic.load_expenses()}
+
+    ok, msg = logic.sort_ledger_by_date(memory_budget=1)
+    assert ok, msg
+    assert ledger_file_rows() == [("4", "2025-12-31"), ("2", "2026-01-20"), ("5", "2026-03-01"),
+                                  ("1", "2026-10-05"), ("3", "2026-10-05")]
+    assert not os.path.exists("all_expenses.journal")
+    assert {e["Id"]: e for e in logic.load_expenses()} == before
+    assert logic.get_expense(2)["Description"] == "e1"
+
+    # Id 6 was deleted before the rewrite; it is still never handed out again
+    assert logic.save_expense("new", "2.00", "Food", "2026-02-01")[0]
+    assert ledger_file_rows()[-1] == ("7", "2026-02-01")
+    reopened = ExpenseLogic()
+    assert reopened.get_expense(7)["Description"] == "new"
+    reopened.close()
+
+
+def test_export_by_date_leaves_the_ledger_alone(logic):
+    before = ledger_file_rows()
+    ok, msg = logic.export_to_csv("export.csv", by_date=True, memory_budget=1)
+    assert ok, msg
+    assert ledger_file_rows("export.csv") == sorted(before, key=lambda r: (r[1], int(r[0])))
+    assert ledger_file_rows() == before
@@ -0,0 +1,139 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from expense_logic import ExpenseLogic
+from expense_stats import BYTES_READ, BYTES_WRITTEN, ROWS_SCANNED, Stats, stats
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Screen:
+    def redraw(self, n):
+        return list(self.rows(n))
+
+    def rows(self, n):
+        for i in range(n):
+            yield i
+
+    def _helper(self):
+        return 1
+
+
+@pytest.fixture
+def logic(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    logic = ExpenseLogic()
+    yield logic
+    logic.close()
+
+
+@pytest.fixture
+def collecting():
+    stats.reset()
+    stats.enable()
+    yield stats
+    stats.disable()
+    stats.reset()
+
+
+def test_disabled_stats_leave_the_methods_alone(logic):
+    assert not stats.enabled
+    for name in ("save_expense", "load_expenses", "iter_expenses", "_get_aggregates"):
+        assert not hasattr(vars(ExpenseLogic)[name], "__wrapped__")
+    stats.reset()
+    logic.save_expense("coffee", "3.50", "Food", "2026-10-01")
+    logic.load_expenses()
+    assert stats.snapshot()["methods"] == {}
+    assert set(stats.snapshot()["totals"].values()) == {0}
+
+
+def test_fresh_process_installs_nothing_unless_asked():
+    code = ("import expense_logic, expense_stats; "
+            "print(expense_stats.stats.enabled, hasattr(expense_logic.ExpenseLogic.load_expenses, '__wrapped__'))")
+    env = {k: v for k, v in os.environ.items() if k != "EXPENSE_STATS"}
+    off = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    on = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env={**env, "EXPENSE_STATS": "1"},
+                        capture_output=True, text=True)
+    assert off.stdout.split() == ["False", "False"]
+    assert on.stdout.split() == ["True", "True"]
+
+
+def test_enabled_stats_count_calls_time_and_io(logic, collecting):
+    logic.save_expense("coffee", "3.50", "Food", "2026-10-01")
+    logic.save_expense("bus", "2.00", "Transport", "2026-10-02")
+    logic.invalidate_cache()
+    assert len(logic.load_expenses()) == 2
+    methods = stats.snapshot()["methods"]
+
+    save = methods["ExpenseLogic.save_expense"]
+    assert save["calls"] == 2 and save["total_s"] > 0 and save["max_s"] <= save["total_s"]
+    assert save[BYTES_WRITTEN] > 0
+    load = methods["ExpenseLogic.load_expenses"]
+    assert load["calls"] == 1 and load[ROWS_SCANNED] >= 2 and load[BYTES_READ] > 0
+    # Nested calls are charged to the caller too
+    assert methods["ExpenseLogic.iter_expenses"][ROWS_SCANNED] <= load[ROWS_SCANNED]
+    totals = stats.snapshot()["totals"]
+    assert totals[BYTES_WRITTEN] >= save[BYTES_WRITTEN]
+
+
+def test_disable_puts_the_originals_back():
+    original = vars(ExpenseLogic)["load_expenses"]
+    stats.enable()
+    try:
+        assert vars(ExpenseLogic)["load_expenses"].__wrapped__ is original
+    finally:
+        stats.disable()
+        stats.reset()
+    assert vars(ExpenseLogic)["load_expenses"] is original
+
+
+def test_watch_wraps_public_methods_and_times_generators():
+    local = Stats()
+    original = Screen.redraw
+    local.watch(Screen, prefix="GUI")
+    assert Screen.redraw is original
+    local.enable()
+    try:
+        assert Screen().redraw(3) == [0, 1, 2]
+        assert Screen()._helper() == 1
+        methods = local.snapshot()["methods"]
+        assert methods["GUI.redraw"]["calls"] == 1
+        assert methods["GUI.rows"]["calls"] == 1  # Counted once, when the generator finishes
+        assert "GUI._helper" not in methods
+        local.add(ROWS_SCANNED, 5)
+        assert local.totals[ROWS_SCANNED] == 5
+    finally:
+        local.disable()
+    assert Screen.redraw is original
+    local.add(ROWS_SCANNED, 5)
+    assert local.totals[ROWS_SCANNED] == 5
+
+
+def test_export_json(tmp_path, collecting):
+    stats.record("Worker.dashboard", 0.25)
+    ok, msg = stats.export_json(str(tmp_path / "stats.json"))
+    assert ok, msg
+    data = json.loads((tmp_path / "stats.json").read_text())
+    assert data["enabled"] is True
+    assert data["methods"]["Worker.dashboard"]["mean_ms"] == 250.0
+
+
+def test_gui_redraws_are_watched_only_while_enabled():
+    pytest.importorskip("customtkinter")
+    from Expense_Tracker_GUI import ExpenseTrackerApp
+
+    names = ["update_dashboard", "refresh_expense_list", "refresh_current_list", "update_monthly_view"]
+    originals = {name: vars(ExpenseTrackerApp)[name] for name in names}
+    assert not any(hasattr(fn, "__wrapped__") for fn in originals.values())
+    stats.enable()
+    try:
+        for name in names:
+            assert vars(ExpenseTrackerApp)[name].__wrapped__ is originals[name]
+    finally:
+        stats.disable()
+        stats.reset()
+    assert {name: vars(ExpenseTrackerApp)[name] for name in names} == originals